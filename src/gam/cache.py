@@ -0,0 +1,49 @@
+"""Cache files gam keeps under the stacks root, in a hidden .gam directory.
+
+Everything in here can be deleted at any time; it is rebuilt on demand.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+CACHE_DIR = ".gam"
+
+
+def cache_path(root_dir: Path, name: str) -> Path:
+    """Return the path of a cache file for the given stacks root."""
+    return Path(root_dir) / CACHE_DIR / name
+
+
+def load_json(path: Path) -> dict | None:
+    """Read a JSON cache file, returning None if missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def save_json(path: Path, data: dict) -> bool:
+    """Atomically replace a JSON cache file.
+
+    Returns False instead of raising if it can't be written (e.g. the root
+    is read-only); callers simply run uncached then.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}."
+        )
+        try:
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    except OSError:
+        return False
+    return True
@@ -3,56 +3,119 @@
 gam - Docker Compose Stack Manager with Metadata Support
 
 Usage:
-    gam autostart
+    gam [--max-depth N] [--status-ttl SECS] [--no-daemon] <command> ...
+    gam autostart [-j N]
     gam category list
     gam category rename <old-category> <new-category>
     gam category set <stack> <category> [subcategory]
-    gam down <stack|--all> [-c CAT] [-t TAG]
-    gam logs [stack...] [--all] [-c CAT] [-t TAG] [-f] [--since TIME]
-             [-n NUM] [-T] [--until TIME]
-    gam ls [-c|--category=CAT] [-t|--tag=TAG]
-    gam restart <stack|--all> [-c CAT] [-t TAG]
+    gam daemon
+    gam down <stack|--all> [-s EXPR] [-c CAT] [-t TAG] [-j N]
+             [--timeout SECS]
+    gam index rebuild
+    gam logs [stack...] [--all] [-s EXPR] [-c CAT] [-t TAG] [-f]
+             [--since TIME]
+             [--since-last]
+             [-n NUM] [-T] [--until TIME] [-m] [-j N]
+             [-g PATTERN] [-i] [-l LEVEL] [--rate N]
+             [-o DIR [--compress gzip|zstd|none] [--max-size SIZE]]
+    gam ls [-s EXPR] [-c|--category=CAT] [-t|--tag=TAG]
+    gam restart <stack|--all> [-s EXPR] [-c CAT] [-t TAG]
     gam search <term>
     gam show <stack>
-    gam status [-c|--category=CAT] [-t|--tag=TAG]
+    gam status [-s EXPR] [-c|--category=CAT] [-t|--tag=TAG] [-w]
     gam tag add <stack> <tag> [<tag> ...]
     gam tag ls
     gam tag remove <stack> <tag> [<tag> ...]
     gam tag rename <old-tag> <new-tag>
-    gam up <stack|--all> [-c CAT] [-t TAG] [--priority]
+    gam up <stack|--all> [-s EXPR] [-c CAT] [-t TAG] [--priority] [-j N]
     gam validate [<stack>]
+
+Stack statuses are reused across runs for --status-ttl seconds (0 turns
+this off); gam up/down/restart drop those of the stacks they change.
+
+With `gam daemon` running in the stacks root, ls, show, search and status
+are answered by it from memory; without it, or when run with another
+--max-depth or --status-ttl than the daemon's, they run as usual. The
+daemon and `gam status --watch` follow Docker events to keep statuses
+current instead of asking docker about every stack.
+
+Selectors (-s) combine terms that must all hold, e.g.
+    -s 'category=data,tag=prod,!tag=staging,priority<=2,critical'
 """
 
 import argparse
 import sys
 
-from .commands import (
-    cmd_autostart,
-    cmd_category,
-    cmd_down,
-    cmd_logs,
-    cmd_ls,
-    cmd_restart,
-    cmd_search,
-    cmd_show,
-    cmd_status,
-    cmd_tag,
-    cmd_up,
-    cmd_validate,
-)
-from .stack_manager import StackManager
-
-
-def main():
+from . import commands
+from .defaults import DEFAULT_JOBS, DEFAULT_STATUS_TTL
+
+SELECT_HELP = "Select stacks by expression, e.g. 'tag=prod,!critical'"
+
+
+def _selector(text: str):
+    """Compile a --select expression while parsing arguments."""
+    from .selector import Selector, SelectorError
+    try:
+        return Selector(text)
+    except SelectorError as e:
+        raise argparse.ArgumentTypeError(str(e)) from None
+
+
+# Handler of each command, by name.
+HANDLERS = {
+    'autostart': 'cmd_autostart',
+    'category': 'cmd_category',
+    'cat': 'cmd_category', # Alias for category
+    'daemon': 'cmd_daemon',
+    'down': 'cmd_down',
+    'index': 'cmd_index',
+    'list': 'cmd_ls',  # Alias for ls
+    'logs': 'cmd_logs',
+    'ls': 'cmd_ls',
+    'restart': 'cmd_restart',
+    'search': 'cmd_search',
+    'show': 'cmd_show',
+    'status': 'cmd_status',
+    'tag': 'cmd_tag',
+    'up': 'cmd_up',
+    'validate': 'cmd_validate',
+}
+
+# Commands that only read state, which a running `gam daemon` answers.
+DAEMON_COMMANDS = frozenset({'list', 'ls', 'search', 'show', 'status'})
+
+
+def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Docker Compose Stack Manager",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
 
+    parser.add_argument(
+        '--max-depth', type=int, metavar='N',
+        help='Only look for stacks up to N directories below the root'
+    )
+    parser.add_argument(
+        '--status-ttl', type=float, default=DEFAULT_STATUS_TTL,
+        metavar='SECS',
+        help='Reuse stack statuses this recent from earlier runs '
+             f'(default {DEFAULT_STATUS_TTL:g}, 0 to always query docker)'
+    )
+    parser.add_argument(
+        '--no-daemon', action='store_true',
+        help="Run in this process even if 'gam daemon' is running"
+    )
+
     subparsers = parser.add_subparsers(dest='command', help='Commands')
 
     # autostart
-    subparsers.add_parser('autostart', help='Start all auto-start stacks')
+    autostart_parser = subparsers.add_parser(
+        'autostart', help='Start all auto-start stacks'
+    )
+    autostart_parser.add_argument(
+        '-j', '--jobs', type=int, default=DEFAULT_JOBS,
+        help=f'Stacks to start at once (default {DEFAULT_JOBS})'
+    )
 
     # category
     category_parser = subparsers.add_parser(
@@ -88,6 +151,11 @@ def main():
         'subcategory', nargs='?', help='Subcategory name (optional)'
     )
 
+    # daemon
+    subparsers.add_parser(
+        'daemon', help='Keep stacks and their state in memory for queries'
+    )
+
     # down
     down_parser = subparsers.add_parser('down', help='Stop stack(s)')
     down_parser.add_argument(
@@ -96,12 +164,36 @@ def main():
     down_parser.add_argument(
         '--all', action='store_true', help='Stop all stacks'
     )
+    down_parser.add_argument(
+        '-s', '--select', type=_selector, metavar='EXPR', help=SELECT_HELP
+    )
     down_parser.add_argument(
         '-c', '--category', help='Stop all stacks in category'
     )
     down_parser.add_argument(
         '-t', '--tag', help='Stop all stacks with tag'
     )
+    down_parser.add_argument(
+        '-j', '--jobs', type=int, default=DEFAULT_JOBS,
+        help=f'Stacks to stop at once (default {DEFAULT_JOBS})'
+    )
+    down_parser.add_argument(
+        '--timeout', type=float,
+        help='Give up on a stack after this many seconds'
+    )
+
+    # index
+    index_parser = subparsers.add_parser(
+        'index', help='Manage the stack discovery index'
+    )
+    index_subparsers = index_parser.add_subparsers(
+        dest='index_action', help='Index actions'
+    )
+
+    # index rebuild
+    index_subparsers.add_parser(
+        'rebuild', help='Rescan the whole tree and rewrite the index'
+    )
 
     # logs
     logs_parser = subparsers.add_parser('logs', help='View stack logs')
@@ -111,6 +203,9 @@ def main():
     logs_parser.add_argument(
         '--all', action='store_true', help='Show logs from all stacks'
     )
+    logs_parser.add_argument(
+        '-s', '--select', type=_selector, metavar='EXPR', help=SELECT_HELP
+    )
     logs_parser.add_argument(
         '-c', '--category', help='Show logs from stacks in category'
     )
@@ -123,6 +218,10 @@ def main():
     logs_parser.add_argument(
         '--since', help='Show logs since timestamp'
     )
+    logs_parser.add_argument(
+        '--since-last', action='store_true',
+        help='Only show lines newer than the last --since-last run saw'
+    )
     logs_parser.add_argument(
         '-n', '--tail', help='Number of lines to show from end'
     )
@@ -132,11 +231,50 @@ def main():
     logs_parser.add_argument(
         '--until', help='Show logs before timestamp'
     )
+    logs_parser.add_argument(
+        '-m', '--merge', action='store_true',
+        help='Interleave all streams in timestamp order'
+    )
+    logs_parser.add_argument(
+        '-j', '--jobs', type=int, default=DEFAULT_JOBS,
+        help=f'Historical log streams read at once (default {DEFAULT_JOBS})'
+    )
+    logs_parser.add_argument(
+        '-g', '--grep', metavar='PATTERN',
+        help='Only show lines matching a regex or substring'
+    )
+    logs_parser.add_argument(
+        '-i', '--ignore-case', action='store_true',
+        help='Match --grep case-insensitively'
+    )
+    logs_parser.add_argument(
+        '-l', '--level', choices=['debug', 'info', 'warn', 'error', 'fatal'],
+        help='Only show lines logged at this level or above'
+    )
+    logs_parser.add_argument(
+        '--rate', type=float, metavar='N',
+        help='With -f, show at most N lines per second per stack'
+    )
+    logs_parser.add_argument(
+        '-o', '--output-dir', metavar='DIR',
+        help='Write each stack\'s logs to its own file in DIR'
+    )
+    logs_parser.add_argument(
+        '--compress', choices=['gzip', 'zstd', 'none'], default='gzip',
+        help='Compression of exported files (default gzip)'
+    )
+    logs_parser.add_argument(
+        '--max-size', metavar='SIZE',
+        help='Start a new exported file after SIZE bytes (e.g. 100M)'
+    )
 
     # ls (with 'list' alias)
     ls_parser = subparsers.add_parser(
         'ls', aliases=['list'], help='List stacks'
     )
+    ls_parser.add_argument(
+        '-s', '--select', type=_selector, metavar='EXPR', help=SELECT_HELP
+    )
     ls_parser.add_argument(
         '-c', '--category', help='Filter by category'
     )
@@ -150,6 +288,9 @@ def main():
     restart_parser.add_argument(
         '--all', action='store_true', help='Restart all stacks'
     )
+    restart_parser.add_argument(
+        '-s', '--select', type=_selector, metavar='EXPR', help=SELECT_HELP
+    )
     restart_parser.add_argument(
         '-c', '--category', help='Restart all stacks in category'
     )
@@ -169,10 +310,17 @@ def main():
     status_parser = subparsers.add_parser(
         'status', help='Show status of stacks'
     )
+    status_parser.add_argument(
+        '-s', '--select', type=_selector, metavar='EXPR', help=SELECT_HELP
+    )
     status_parser.add_argument(
         '-c', '--category', help='Filter by category'
     )
     status_parser.add_argument('-t', '--tag', help='Filter by tag')
+    status_parser.add_argument(
+        '-w', '--watch', action='store_true',
+        help='Keep the table updated as containers change (Ctrl-C to stop)'
+    )
 
     # tag
     tag_parser = subparsers.add_parser('tag', help='Manage tags')
@@ -216,6 +364,9 @@ def main():
     up_parser.add_argument(
         '--all', action='store_true', help='Start all stacks'
     )
+    up_parser.add_argument(
+        '-s', '--select', type=_selector, metavar='EXPR', help=SELECT_HELP
+    )
     up_parser.add_argument(
         '-c', '--category', help='Start all stacks in category'
     )
@@ -223,7 +374,12 @@ def main():
         '-t', '--tag', help='Start all stacks with tag'
     )
     up_parser.add_argument(
-        '--priority', action='store_true', help='Start in priority order'
+        '--priority', action='store_true',
+        help='Start one at a time in priority order'
+    )
+    up_parser.add_argument(
+        '-j', '--jobs', type=int, default=DEFAULT_JOBS,
+        help=f'Stacks to start at once (default {DEFAULT_JOBS})'
     )
     up_parser.add_argument(
         '--with-deps', action='store_true', help='Start dependencies first'
@@ -235,35 +391,41 @@ def main():
         'target', nargs='?', help='Stack name or category'
     )
 
+    return parser
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
 
     if not args.command:
         parser.print_help()
         sys.exit(1)
 
-    # Initialize manager
-    manager = StackManager()
-
-    # Dispatch to command
-    commands = {
-        'autostart': cmd_autostart,
-        'category': cmd_category,
-        'cat': cmd_category, # Alias for category
-        'down': cmd_down,
-        'list': cmd_ls,  # Alias for ls
-        'logs': cmd_logs,
-        'ls': cmd_ls,
-        'restart': cmd_restart,
-        'search': cmd_search,
-        'show': cmd_show,
-        'status': cmd_status,
-        'tag': cmd_tag,
-        'up': cmd_up,
-        'validate': cmd_validate,
-    }
-
-    commands[args.command](manager, args)
+    # Read-only queries go to a running daemon when there is one.
+    if (
+        args.command in DAEMON_COMMANDS
+        and not args.no_daemon
+        and not getattr(args, 'watch', False)
+    ):
+        from pathlib import Path
+
+        from .client import run_remote
+        code = run_remote(Path.cwd(), sys.argv[1:])
+        if code is not None:
+            sys.exit(code)
+
+    # Dispatch to command. Handlers and the manager (and with them yaml
+    # and the Docker client) are only imported once a command runs.
+    handler = getattr(commands, HANDLERS[args.command])
+
+    # Initialize manager; stacks are discovered when first needed
+    from .stack_manager import StackManager
+    manager = StackManager(
+        max_depth=args.max_depth, status_ttl=args.status_ttl
+    )
 
+    handler(manager, args)
 
 if __name__ == '__main__':
     main()
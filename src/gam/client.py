@@ -0,0 +1,67 @@
+"""Client side of the `gam daemon` protocol.
+
+A request is one line of JSON holding the command line; the reply is one
+line of JSON with the command's output and exit code. This runs before
+any command code is loaded, so it sticks to light standard modules.
+"""
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+from .cache import cache_path
+
+SOCKET_FILE = "daemon.sock"
+PROTOCOL_VERSION = 1
+
+# Seconds to wait for the daemon to accept, and then to answer.
+CONNECT_TIMEOUT = 0.5
+REPLY_TIMEOUT = 60.0
+
+
+def socket_path(root_dir: Path) -> Path:
+    """Return the daemon socket of a stacks root."""
+    return cache_path(root_dir, SOCKET_FILE)
+
+
+def call(root_dir: Path, argv: list[str]) -> dict | None:
+    """Send a command line to the daemon and return its reply.
+
+    Returns None when no daemon answers, so the caller can run the
+    command itself.
+    """
+    path = socket_path(root_dir)
+    if not os.path.exists(path):
+        return None
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT)
+        sock.connect(str(path))
+        sock.settimeout(REPLY_TIMEOUT)
+        request = {'version': PROTOCOL_VERSION, 'argv': argv}
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        with sock.makefile('rb') as f:
+            line = f.readline()
+        reply = json.loads(line)
+    except (OSError, ValueError):
+        return None
+    finally:
+        sock.close()
+    if not isinstance(reply, dict) or 'error' in reply:
+        return None
+    return reply
+
+
+def run_remote(root_dir: Path, argv: list[str]) -> int | None:
+    """Run a command line in the daemon, printing its output.
+
+    Returns the exit code, or None if the daemon couldn't run it.
+    """
+    reply = call(root_dir, argv)
+    if reply is None:
+        return None
+    sys.stdout.write(reply.get('stdout', ''))
+    sys.stderr.write(reply.get('stderr', ''))
+    return reply.get('code', 0)
@@ -1,22 +1,17 @@
-"""Command handlers for gam CLI."""
+"""Command handlers for gam CLI.
 
-from .autostart import cmd_autostart
-from .category import cmd_category
-from .down import cmd_down
-from .logs import cmd_logs
-from .ls import cmd_ls
-from .restart import cmd_restart
-from .search import cmd_search
-from .show import cmd_show
-from .status import cmd_status
-from .tag import cmd_tag
-from .up import cmd_up
-from .validate import cmd_validate
+Handlers are imported on first access, so the CLI only loads the module
+of the command it runs.
+"""
+
+import importlib
 
 __all__ = [
     'cmd_autostart',
     'cmd_category',
+    'cmd_daemon',
     'cmd_down',
+    'cmd_index',
     'cmd_logs',
     'cmd_ls',
     'cmd_restart',
@@ -27,3 +22,10 @@ __all__ = [
     'cmd_up',
     'cmd_validate',
 ]
+
+
+def __getattr__(name: str):
+    if name in __all__:
+        module = importlib.import_module(f'.{name[len("cmd_"):]}', __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
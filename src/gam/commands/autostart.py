@@ -1,3 +1,6 @@
+import sys
+
+from gam.scheduler import DependencyCycleError, run_graph
 from gam.stack_manager import StackManager
 
 
@@ -11,9 +14,21 @@ def cmd_autostart(manager: StackManager, args) -> None:
 
     print(f"Auto-starting {len(stacks)} stack(s) by priority...\n")
 
-    for stack in stacks:
-        print(f"  [{stack.priority}] Starting {stack.name}...", end=" ")
-        if stack.up():
-            print("✓")
-        else:
-            print("✗ FAILED")
+    def on_start(stack) -> None:
+        print(f"  [{stack.priority}] Starting {stack.name}...")
+
+    quiet = args.jobs > 1 and len(stacks) > 1
+    try:
+        with manager.changing_state(stacks):
+            report = run_graph(
+                stacks,
+                lambda stack: stack.up(quiet=quiet),
+                jobs=args.jobs,
+                on_start=on_start,
+                on_finish=lambda result: print(f"  {result.describe()}"),
+            )
+    except DependencyCycleError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"\n{report.summary()}")
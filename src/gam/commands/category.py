@@ -1,6 +1,7 @@
 import sys
 
 from gam.stack_manager import StackManager
+from gam.transaction import TransactionError
 
 
 def cmd_category(manager: StackManager, args) -> None:
@@ -11,14 +12,11 @@ def cmd_category(manager: StackManager, args) -> None:
             print("No categories found")
             return
 
+        counts = manager.get_category_counts()
         plural = 'ies' if len(categories) != 1 else 'y'
         print(f"\nFound {len(categories)} unique categor{plural}:\n")
         for category, subcategory in categories:
-            # Count how many stacks use this category
-            count = sum(
-                1 for s in manager.stacks.values()
-                if s.category == category and s.subcategory == subcategory
-            )
+            count = counts.get((category, subcategory), 0)
 
             display = (
                 f"{category}/{subcategory}" if subcategory else category
@@ -37,9 +35,9 @@ def cmd_category(manager: StackManager, args) -> None:
         else:
             old_category = stack.category
 
-        stack.category = args.new_category
-        stack.subcategory = args.subcategory or ""
-        stack.save_metadata()
+        manager.set_category(
+            stack, args.new_category, args.subcategory or ""
+        )
 
         if stack.subcategory:
             new_category = f"{stack.category}/{stack.subcategory}"
@@ -52,7 +50,14 @@ def cmd_category(manager: StackManager, args) -> None:
         print(msg)
 
     elif args.category_action == 'rename':
-        count = manager.rename_category(args.old_category, args.new_category)
+        try:
+            count = manager.rename_category(
+                args.old_category, args.new_category
+            )
+        except TransactionError as e:
+            print(f"Error: {e}")
+            print("No stacks were changed")
+            sys.exit(1)
         if count > 0:
             plural = 's' if count != 1 else ''
             msg = (
@@ -0,0 +1,27 @@
+import signal
+import sys
+
+from gam.daemon import Daemon, DaemonError
+from gam.stack_manager import StackManager
+
+
+def _terminate(signum, frame) -> None:
+    raise KeyboardInterrupt
+
+
+def cmd_daemon(manager: StackManager, args) -> None:
+    """Serve read-only commands from memory until stopped."""
+    daemon = Daemon(manager, status_ttl=args.status_ttl)
+    try:
+        daemon.start()
+    except DaemonError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    signal.signal(signal.SIGTERM, _terminate)
+    print(f"Listening on {daemon.path} (Ctrl-C to stop)", flush=True)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print("\nStopped")
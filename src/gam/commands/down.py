@@ -1,5 +1,6 @@
 import sys
 
+from gam.scheduler import DependencyCycleError, run_graph
 from gam.stack_manager import StackManager
 
 
@@ -9,15 +10,15 @@ def cmd_down(manager: StackManager, args) -> None:
 
     if args.all:
         stacks_to_stop = list(manager.stacks.values())
+    elif args.select:
+        stacks_to_stop = manager.select(args.select)
     elif args.category:
         stacks_to_stop = manager.get_category_stacks(args.category)
     elif args.tag:
-        stacks_to_stop = [
-            s for s in manager.stacks.values() if args.tag in s.tags
-        ]
+        stacks_to_stop = manager.get_tag_stacks(args.tag)
     else:
         if not args.target:
-            print("Error: Provide a stack name or use --all, -c, or -t")
+            print("Error: Provide a stack name or use --all, -s, -c, or -t")
             sys.exit(1)
 
         stack = manager.get_stack(args.target)
@@ -26,14 +27,25 @@ def cmd_down(manager: StackManager, args) -> None:
             sys.exit(1)
         stacks_to_stop = [stack]
 
-    # Stop in reverse priority order
-    stacks_to_stop.sort(key=lambda s: -s.priority)
-
     print(f"Stopping {len(stacks_to_stop)} stack(s)...\n")
 
-    for stack in stacks_to_stop:
-        print(f"  Stopping {stack.name}...", end=" ")
-        if stack.down():
-            print("✓")
-        else:
-            print("✗ FAILED")
+    # Dependents stop before their dependencies, lowest priority first.
+    # A failed or timed-out stack doesn't hold up the rest of the shutdown.
+    # Output of concurrent stops would interleave; a lone stack keeps it.
+    quiet = args.jobs > 1 and len(stacks_to_stop) > 1
+    try:
+        with manager.changing_state(stacks_to_stop):
+            report = run_graph(
+                stacks_to_stop,
+                lambda stack: stack.down(quiet=quiet, timeout=args.timeout),
+                jobs=args.jobs,
+                reverse=True,
+                keep_going=True,
+                on_start=lambda stack: print(f"  Stopping {stack.name}..."),
+                on_finish=lambda result: print(f"  {result.describe()}"),
+            )
+    except DependencyCycleError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"\n{report.summary()}")
@@ -0,0 +1,10 @@
+from gam.stack_manager import StackManager
+
+
+def cmd_index(manager: StackManager, args) -> None:
+    """Stack index commands."""
+    if args.index_action == 'rebuild':
+        count = manager.rebuild_index()
+        plural = 's' if count != 1 else ''
+        print(f"✓ Rebuilt stack index: {count} stack{plural} found")
+        print(f"  {manager.index.path}")
@@ -1,8 +1,29 @@
+import re
 import subprocess
 import sys
-import threading
-from queue import Queue
+from functools import partial
+from pathlib import Path
 
+from gam.engine import EngineError, get_engine, to_api_time
+from gam.logcursor import (
+    STACK_SOURCE,
+    LogCursors,
+    api_time_after,
+    rfc3339_after,
+)
+from gam.logexport import RotatingFile, check_compression, parse_size
+from gam.logfilter import line_filter
+from gam.logstream import (
+    MERGE_WINDOW,
+    LogStream,
+    command_lines,
+    export_logs,
+    follow_logs,
+    merge_logs,
+    run,
+    stream_logs,
+)
+from gam.stack import COMPOSE_NUMBER_LABEL, COMPOSE_SERVICE_LABEL
 from gam.stack_manager import StackManager
 
 
@@ -10,7 +31,8 @@ def cmd_logs(manager: StackManager, args) -> None:
     """Show logs from stack(s)."""
     stacks_to_show = []
 
-    # Stack selection: positional > --all > --category > --tag > default
+    # Stack selection: positional > --all > --select > --category > --tag
+    # > default
     if args.stacks:
         # Multiple specific stacks by name
         for stack_name in args.stacks:
@@ -21,15 +43,18 @@ def cmd_logs(manager: StackManager, args) -> None:
             stacks_to_show.append(stack)
     elif args.all:
         stacks_to_show = list(manager.stacks.values())
+    elif args.select:
+        stacks_to_show = manager.select(args.select)
+        if not stacks_to_show:
+            print(f"No stacks match '{args.select.text}'")
+            sys.exit(1)
     elif args.category:
         stacks_to_show = manager.get_category_stacks(args.category)
         if not stacks_to_show:
             print(f"No stacks found in category '{args.category}'")
             sys.exit(1)
     elif args.tag:
-        stacks_to_show = [
-            s for s in manager.stacks.values() if args.tag in s.tags
-        ]
+        stacks_to_show = manager.get_tag_stacks(args.tag)
         if not stacks_to_show:
             print(f"No stacks found with tag '{args.tag}'")
             sys.exit(1)
@@ -54,105 +79,314 @@ def cmd_logs(manager: StackManager, args) -> None:
     if args.until:
         cmd.extend(["--until", args.until])
 
-    # Single stack: no prefixing, direct output
-    if len(stacks_to_show) == 1:
-        stack = stacks_to_show[0]
+    try:
+        match = line_filter(args.grep, args.level, args.ignore_case)
+    except re.error as e:
+        print(f"Invalid --grep pattern: {e}")
+        sys.exit(1)
+
+    # Read logs through the Engine API when the daemon is reachable.
+    engine_options = _engine_log_options(args)
+
+    cursors = None
+    if args.since_last:
+        cursors = LogCursors(
+            manager.root_dir, keep_timestamps=args.timestamps or args.merge
+        )
+
+    try:
+        _show_selected(
+            stacks_to_show, cmd, engine_options, args, match, cursors
+        )
+    finally:
+        if cursors:
+            cursors.save()
+
+
+def _show_selected(
+    stacks: list,
+    cmd: list,
+    engine_options: dict | None,
+    args,
+    match=None,
+    cursors: LogCursors | None = None
+) -> None:
+    """Show or export the logs of the selected stacks."""
+    if args.output_dir:
+        _export_logs(stacks, cmd, engine_options, args, match, cursors)
+        return
+
+    # Single stack: no stack prefixing
+    if len(stacks) == 1:
+        stack = stacks[0]
         print(f"Showing logs for {stack.name}...")
-        subprocess.run(cmd, cwd=stack.path)
+        if engine_options is None and match is None and cursors is None:
+            # Direct output from docker compose
+            subprocess.run(cmd, cwd=stack.path)
+        else:
+            _show_logs(
+                stacks, cmd, engine_options, args, match, cursors, False
+            )
         return
 
     # Multiple stacks
-    print(f"Showing logs from {len(stacks_to_show)} stack(s)...\n")
+    print(f"Showing logs from {len(stacks)} stack(s)...\n")
+    _show_logs(stacks, cmd, engine_options, args, match, cursors)
 
-    if args.follow:
-        _show_logs_parallel(stacks_to_show, cmd)
-    else:
-        _show_logs_serial(stacks_to_show, cmd)
 
+def _show_logs(
+    stacks: list,
+    cmd: list,
+    engine_options: dict | None,
+    args,
+    match=None,
+    cursors: LogCursors | None = None,
+    with_name: bool = True
+) -> None:
+    """Stream logs in the mode the arguments ask for.
 
-def _show_logs_serial(stacks: list, cmd: list) -> None:
-    """Show historical logs from multiple stacks serially."""
-    for stack in stacks:
-        result = subprocess.run(
-            cmd,
-            cwd=stack.path,
-            capture_output=True,
-            text=True
+    `match`, if given, filters lines inside each stream's reader; with
+    `cursors`, each stream starts after its cursor and advances it.
+    """
+    if args.merge:
+        _show_logs_merged(
+            stacks, cmd, engine_options, with_name, args.follow,
+            args.timestamps, match, cursors
         )
-        # Prefix each line with stack name
-        if result.stdout:
-            for line in result.stdout.splitlines():
-                print(f"[{stack.name}] {line}")
-        # Also show stderr if present
-        if result.stderr:
-            for line in result.stderr.splitlines():
-                print(f"[{stack.name}] {line}", file=sys.stderr)
-
-
-def _show_logs_parallel(stacks: list, cmd: list) -> None:
-    """Stream logs from multiple stacks in parallel using threads."""
-    output_queue = Queue()
-    shutdown_event = threading.Event()
-    threads = []
-
-    # Start thread per stack
-    for stack in stacks:
-        thread = threading.Thread(
-            target=_stream_logs_with_prefix,
-            args=(stack.name, cmd, stack.path, output_queue,
-                  shutdown_event)
+    elif args.follow:
+        _show_logs_parallel(
+            stacks, cmd, engine_options, with_name, match, args.rate,
+            cursors
+        )
+    else:
+        _show_logs_history(
+            stacks, cmd, engine_options, with_name, args.jobs, match,
+            cursors
         )
-        thread.daemon = True
-        thread.start()
-        threads.append(thread)
 
-    # Print from queue until interrupted
+
+def _engine_log_options(args) -> dict | None:
+    """Build Engine API log parameters, or None to use the docker CLI."""
+    if not get_engine().ping():
+        return None
     try:
-        while True:
-            if not output_queue.empty():
-                line = output_queue.get()
-                print(line, end='')
-            else:
-                # Small sleep to avoid busy waiting
-                threading.Event().wait(0.01)
-    except KeyboardInterrupt:
+        return {
+            'follow': args.follow,
+            'since': to_api_time(args.since) if args.since else None,
+            'until': to_api_time(args.until) if args.until else None,
+            'tail': args.tail,
+            'timestamps': args.timestamps,
+        }
+    except EngineError:
+        # Let docker compose interpret (and report) unusual time values.
+        return None
+
+
+def _container_label(container: dict) -> str:
+    """Name a container the way docker compose prefixes its log lines."""
+    labels = container.get('Labels') or {}
+    service = labels.get(COMPOSE_SERVICE_LABEL)
+    number = labels.get(COMPOSE_NUMBER_LABEL)
+    if service and number:
+        return f"{service}-{number}"
+    return container['Names'][0].lstrip('/')
+
+
+def _engine_streams(stack, with_name: bool = True) -> list:
+    """Name each container of a stack for Engine API log streaming.
+
+    Returns (prefix, container id) pairs; raises EngineError if the stack's
+    containers can't be listed.
+    """
+    containers = sorted(stack.get_containers(), key=_container_label)
+    labels = [_container_label(c) for c in containers]
+    width = max(map(len, labels), default=0)
+    stack_prefix = f"[{stack.name}] " if with_name else ""
+    return [
+        (f"{stack_prefix}{label:<{width}}  | ", container['Id'])
+        for label, container in zip(labels, containers)
+    ]
+
+
+def _show_logs_history(
+    stacks: list,
+    cmd: list,
+    engine_options: dict | None = None,
+    with_name: bool = True,
+    jobs: int | None = None,
+    match=None,
+    cursors: LogCursors | None = None
+) -> None:
+    """Show historical logs from multiple stacks, `jobs` streams at a time.
+
+    Lines are written as they are read, each with its stack prefix.
+    """
+    streams = _log_streams(stacks, cmd, engine_options, with_name, cursors)
+    if not run(stream_logs(streams, jobs=jobs, match=match)):
+        print("\n\nStopping log output...")
+
+
+def _log_streams(
+    stacks: list,
+    cmd: list,
+    engine_options: dict | None,
+    with_name: bool,
+    cursors: LogCursors | None = None
+) -> list[LogStream]:
+    """Build async log streams: one per container from the Engine API, or
+    one `docker compose logs` process per stack when it's unavailable.
+
+    With `cursors`, every stream asks for timestamped lines after its
+    source's cursor and advances the cursor as lines are read.
+    """
+    engine = get_engine()
+    streams = []
+    for stack in stacks:
+        if engine_options is not None:
+            try:
+                for prefix, container_id in _engine_streams(
+                    stack, with_name
+                ):
+                    options = engine_options
+                    if cursors:
+                        options = _options_after(
+                            options, cursors.last(stack.name, container_id)
+                        )
+                    open_logs = partial(
+                        engine.logs_async, container_id, **options
+                    )
+                    if cursors:
+                        open_logs = cursors.track(
+                            stack.name, container_id, open_logs
+                        )
+                    streams.append(LogStream(prefix, open_logs, stack.name))
+                continue
+            except EngineError:
+                pass
+        stack_cmd = cmd
+        if cursors:
+            stack_cmd = _cmd_after(cmd, cursors.last(stack.name))
+        open_logs = partial(command_lines, stack_cmd, stack.path)
+        if cursors:
+            open_logs = cursors.track(stack.name, STACK_SOURCE, open_logs)
+        streams.append(LogStream(
+            f"[{stack.name}] " if with_name else "", open_logs, stack.name
+        ))
+    return streams
+
+
+def _options_after(options: dict, last: str | None) -> dict:
+    """Engine API log options for timestamped lines after a cursor."""
+    options = {**options, 'timestamps': True}
+    if last:
+        options['since'] = api_time_after(last)
+    return options
+
+
+def _cmd_after(cmd: list, last: str | None) -> list:
+    """A `docker compose logs` command for timestamped lines after a
+    cursor, replacing any --since it had."""
+    after = []
+    args = iter(cmd)
+    for arg in args:
+        if arg == "--since" and last:
+            next(args, None)
+        elif arg != "--timestamps":
+            after.append(arg)
+    after.append("--timestamps")
+    if last:
+        after.extend(["--since", rfc3339_after(last)])
+    return after
+
+
+def _show_logs_merged(
+    stacks: list,
+    cmd: list,
+    engine_options: dict | None,
+    with_name: bool,
+    follow: bool,
+    keep_timestamps: bool,
+    match=None,
+    cursors: LogCursors | None = None
+) -> None:
+    """Show every stream as one chronological stream.
+
+    Timestamps are requested for ordering and only shown if asked for.
+    """
+    if "--timestamps" not in cmd:
+        cmd = cmd + ["--timestamps"]
+    if engine_options is not None:
+        engine_options = {**engine_options, 'timestamps': True}
+    streams = _log_streams(stacks, cmd, engine_options, with_name, cursors)
+    merged = merge_logs(
+        streams,
+        window=MERGE_WINDOW if follow else None,
+        keep_timestamps=keep_timestamps,
+        match=match,
+    )
+    if not run(merged):
         print("\n\nStopping log streaming...")
-        shutdown_event.set()
-        for thread in threads:
-            thread.join(timeout=2)
 
 
-def _stream_logs_with_prefix(
-    stack_name: str,
+def _export_logs(
+    stacks: list,
     cmd: list,
-    cwd,
-    output_queue: Queue,
-    shutdown_event: threading.Event
+    engine_options: dict | None,
+    args,
+    match=None,
+    cursors: LogCursors | None = None
 ) -> None:
-    """Stream logs from a stack and prefix each line."""
+    """Write each stack's logs to compressed files in --output-dir."""
     try:
-        proc = subprocess.Popen(
-            cmd,
-            cwd=cwd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            bufsize=1
-        )
+        check_compression(args.compress)
+        max_bytes = parse_size(args.max_size) if args.max_size else None
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
 
-        try:
-            for line in proc.stdout:
-                if shutdown_event.is_set():
-                    break
-                output_queue.put(f"[{stack_name}] {line}")
-        finally:
-            proc.terminate()
-            try:
-                proc.wait(timeout=1)
-            except subprocess.TimeoutExpired:
-                proc.kill()
-                proc.wait()
-    except Exception as e:
-        output_queue.put(
-            f"[{stack_name}] Error streaming logs: {e}\n"
-        )
+    directory = Path(args.output_dir)
+    files = []
+
+    def open_output(stack_name: str) -> RotatingFile:
+        output = RotatingFile(directory, stack_name, args.compress, max_bytes)
+        files.append(output)
+        return output
+
+    print(f"Exporting logs from {len(stacks)} stack(s) to {directory}...")
+    streams = _log_streams(stacks, cmd, engine_options, False, cursors)
+    try:
+        directory.mkdir(parents=True, exist_ok=True)
+        finished = run(export_logs(
+            streams,
+            open_output,
+            jobs=None if args.follow else args.jobs,
+            match=match,
+        ))
+    except OSError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    if not finished:
+        print("\n\nStopping log export...")
+
+    paths = [path for output in files for path in output.paths]
+    size = sum(path.stat().st_size for path in paths)
+    print(f"Wrote {len(paths)} file(s), {size / 1e6:.1f} MB")
+
+
+def _show_logs_parallel(
+    stacks: list,
+    cmd: list,
+    engine_options: dict | None = None,
+    with_name: bool = True,
+    match=None,
+    rate: float | None = None,
+    cursors: LogCursors | None = None
+) -> None:
+    """Follow logs from multiple stacks at once, until Ctrl-C.
+
+    Stacks take turns on the terminal; with `rate`, each may show at most
+    that many lines per second and the excess is dropped and counted.
+    """
+    streams = _log_streams(stacks, cmd, engine_options, with_name, cursors)
+    if not run(follow_logs(streams, rate=rate, match=match)):
+        print("\n\nStopping log streaming...")
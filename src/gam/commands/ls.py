@@ -3,12 +3,16 @@ from gam.stack_manager import StackManager
 
 def cmd_ls(manager: StackManager, args) -> None:
     """List all stacks."""
-    stacks = manager.list_stacks(category=args.category, tag=args.tag)
+    stacks = manager.list_stacks(
+        category=args.category, tag=args.tag, selector=args.select
+    )
 
     if not stacks:
         print("No stacks found")
         return
 
+    statuses = manager.get_statuses(stacks)
+
     # Group by category
     by_category = {}
     for stack in stacks:
@@ -20,7 +24,7 @@ def cmd_ls(manager: StackManager, args) -> None:
         print(f"{'='*60}")
 
         for stack in cat_stacks:
-            status = stack.get_status()
+            status = statuses[stack.name]
             status_icon = "●" if status['status'] == 'running' else "○"
 
             print(f"\n  {status_icon} {stack.name}")
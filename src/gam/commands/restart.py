@@ -9,15 +9,15 @@ def cmd_restart(manager: StackManager, args) -> None:
 
     if args.all:
         stacks_to_restart = list(manager.stacks.values())
+    elif args.select:
+        stacks_to_restart = manager.select(args.select)
     elif args.category:
         stacks_to_restart = manager.get_category_stacks(args.category)
     elif args.tag:
-        stacks_to_restart = [
-            s for s in manager.stacks.values() if args.tag in s.tags
-        ]
+        stacks_to_restart = manager.get_tag_stacks(args.tag)
     else:
         if not args.target:
-            print("Error: Provide a stack name or use --all, -c, or -t")
+            print("Error: Provide a stack name or use --all, -s, -c, or -t")
             sys.exit(1)
 
         stack = manager.get_stack(args.target)
@@ -31,9 +31,10 @@ def cmd_restart(manager: StackManager, args) -> None:
 
     print(f"Restarting {len(stacks_to_restart)} stack(s)...\n")
 
-    for stack in stacks_to_restart:
-        print(f"  Restarting {stack.name}...", end=" ")
-        if stack.restart():
-            print("✓")
-        else:
-            print("✗ FAILED")
+    with manager.changing_state(stacks_to_restart):
+        for stack in stacks_to_restart:
+            print(f"  Restarting {stack.name}...", end=" ")
+            if stack.restart():
+                print("✓")
+            else:
+                print("✗ FAILED")
@@ -10,7 +10,7 @@ def cmd_show(manager: StackManager, args) -> None:
         print(f"Stack '{args.stack}' not found")
         sys.exit(1)
 
-    status = stack.get_status()
+    status = manager.get_statuses([stack])[stack.name]
 
     print(f"\nStack: {stack.name}")
     print(f"{'='*60}")
@@ -24,8 +24,11 @@ def cmd_show(manager: StackManager, args) -> None:
     print(f"Tags:         {tags_display}")
     print(f"Path:         {stack.path}")
     containers_info = (
-        f"({status['running']}/{status['containers']} containers)"
+        f"({status['running']}/{status['containers']} containers"
     )
+    if status.get('unhealthy'):
+        containers_info += f", {status['unhealthy']} unhealthy"
+    containers_info += ")"
     print(f"Status:       {status['status']} {containers_info}")
     print(f"Auto-start:   {'yes' if stack.auto_start else 'no'}")
     if stack.auto_start:
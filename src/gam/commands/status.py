@@ -1,21 +1,78 @@
+import sys
+import threading
+import time
+
+from gam.stack import Stack
 from gam.stack_manager import StackManager
+from gam.state_tracker import StateTracker
 
+# Seconds between redraws of `status --watch` while Docker events aren't
+# available and statuses have to be polled.
+WATCH_INTERVAL = 2.0
+
+_CLEAR_SCREEN = "\033[H\033[J"
 
-def cmd_status(manager: StackManager, args) -> None:
-    """Show status of all stacks."""
-    stacks = manager.list_stacks(category=args.category, tag=args.tag)
 
+def _print_table(stacks: list[Stack], statuses: dict[str, dict]) -> None:
     header = f"\n{'Stack':<30} {'Category':<15} {'Status':<10} {'Containers'}"
     print(header)
     print(f"{'-'*70}")
 
     for stack in stacks:
-        status = stack.get_status()
+        status = statuses[stack.name]
         status_icon = "●" if status['status'] == 'running' else "○"
         containers_str = f"{status['running']}/{status['containers']}"
+        if status.get('unhealthy'):
+            containers_str += f" ({status['unhealthy']} unhealthy)"
 
         row = (
             f"{status_icon} {stack.name:<28} {stack.category:<15} "
             f"{status['status']:<10} {containers_str}"
         )
         print(row)
+
+
+def _watch(manager: StackManager, stacks: list[Stack]) -> None:
+    """Redraw the table whenever the stacks' containers change."""
+    tracker = StateTracker()
+    manager.state_tracker = tracker
+    # Polled statuses must be fresh, not reused from an earlier run.
+    manager.status_cache = None
+    changed = threading.Event()
+    stop = threading.Event()
+    threading.Thread(
+        target=tracker.follow, args=(stop, changed.set), daemon=True
+    ).start()
+
+    try:
+        while True:
+            statuses = manager.get_statuses(stacks)
+            if sys.stdout.isatty():
+                print(_CLEAR_SCREEN, end="")
+            _print_table(stacks, statuses)
+            source = "docker events" if tracker.live else "polling"
+            print(
+                f"\nUpdated {time.strftime('%H:%M:%S')} from {source} "
+                f"(Ctrl-C to stop)", flush=True
+            )
+            # Sleep until the tracker sees a change; poll while it can't.
+            while not changed.wait(WATCH_INTERVAL) and tracker.live:
+                pass
+            changed.clear()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+
+
+def cmd_status(manager: StackManager, args) -> None:
+    """Show status of all stacks."""
+    stacks = manager.list_stacks(
+        category=args.category, tag=args.tag, selector=args.select
+    )
+
+    if args.watch:
+        _watch(manager, stacks)
+        return
+
+    _print_table(stacks, manager.get_statuses(stacks))
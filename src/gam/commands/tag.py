@@ -1,6 +1,7 @@
 import sys
 
 from gam.stack_manager import StackManager
+from gam.transaction import TransactionError
 
 
 def cmd_tag(manager: StackManager, args) -> None:
@@ -11,10 +12,10 @@ def cmd_tag(manager: StackManager, args) -> None:
             print("No tags found")
             return
 
+        counts = manager.get_tag_counts()
         print(f"\nFound {len(tags)} unique tag(s):\n")
         for tag in tags:
-            # Count how many stacks use this tag
-            count = sum(1 for s in manager.stacks.values() if tag in s.tags)
+            count = counts.get(tag, 0)
             print(f"  • {tag} ({count} stack{'s' if count != 1 else ''})")
 
     elif args.tag_action == 'add':
@@ -23,14 +24,8 @@ def cmd_tag(manager: StackManager, args) -> None:
             print(f"Stack '{args.stack}' not found")
             sys.exit(1)
 
-        added = []
-        for tag in args.tags:
-            if tag not in stack.tags:
-                stack.tags.append(tag)
-                added.append(tag)
-
+        added = manager.add_tags(stack, args.tags)
         if added:
-            stack.save_metadata()
             print(f"✓ Added tag(s) to {stack.name}: {', '.join(added)}")
         else:
             print(f"All specified tags already exist on {stack.name}")
@@ -41,14 +36,8 @@ def cmd_tag(manager: StackManager, args) -> None:
             print(f"Stack '{args.stack}' not found")
             sys.exit(1)
 
-        removed = []
-        for tag in args.tags:
-            if tag in stack.tags:
-                stack.tags.remove(tag)
-                removed.append(tag)
-
+        removed = manager.remove_tags(stack, args.tags)
         if removed:
-            stack.save_metadata()
             removed_tags = ', '.join(removed)
             print(f"✓ Removed tag(s) from {stack.name}: {removed_tags}")
         else:
@@ -56,7 +45,12 @@ def cmd_tag(manager: StackManager, args) -> None:
             print(msg)
 
     elif args.tag_action == 'rename':
-        count = manager.rename_tag(args.old_tag, args.new_tag)
+        try:
+            count = manager.rename_tag(args.old_tag, args.new_tag)
+        except TransactionError as e:
+            print(f"Error: {e}")
+            print("No stacks were changed")
+            sys.exit(1)
         if count > 0:
             plural = 's' if count != 1 else ''
             msg = (
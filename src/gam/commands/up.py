@@ -1,5 +1,6 @@
 import sys
 
+from gam.scheduler import DependencyCycleError, run_graph
 from gam.stack_manager import StackManager
 
 
@@ -9,15 +10,15 @@ def cmd_up(manager: StackManager, args) -> None:
 
     if args.all:
         stacks_to_start = list(manager.stacks.values())
+    elif args.select:
+        stacks_to_start = manager.select(args.select)
     elif args.category:
         stacks_to_start = manager.get_category_stacks(args.category)
     elif args.tag:
-        stacks_to_start = [
-            s for s in manager.stacks.values() if args.tag in s.tags
-        ]
+        stacks_to_start = manager.get_tag_stacks(args.tag)
     else:
         if not args.target:
-            print("Error: Provide a stack name or use --all, -c, or -t")
+            print("Error: Provide a stack name or use --all, -s, -c, or -t")
             sys.exit(1)
 
         stack = manager.get_stack(args.target)
@@ -32,15 +33,27 @@ def cmd_up(manager: StackManager, args) -> None:
         else:
             stacks_to_start = [stack]
 
-    # Sort by priority if requested
-    if args.priority:
-        stacks_to_start.sort(key=lambda s: s.priority)
+    # A shared dependency only needs starting once
+    stacks_to_start = list({s.name: s for s in stacks_to_start}.values())
 
     print(f"Starting {len(stacks_to_start)} stack(s)...\n")
 
-    for stack in stacks_to_start:
-        print(f"  Starting {stack.name}...", end=" ")
-        if stack.up():
-            print("✓")
-        else:
-            print("✗ FAILED")
+    # Stacks start as soon as their dependencies are up, highest priority
+    # first; --priority starts them strictly one at a time in that order.
+    jobs = 1 if args.priority else args.jobs
+    # Output of concurrent starts would interleave; a lone stack keeps it.
+    quiet = jobs > 1 and len(stacks_to_start) > 1
+    try:
+        with manager.changing_state(stacks_to_start):
+            report = run_graph(
+                stacks_to_start,
+                lambda stack: stack.up(quiet=quiet),
+                jobs=jobs,
+                on_start=lambda stack: print(f"  Starting {stack.name}..."),
+                on_finish=lambda result: print(f"  {result.describe()}"),
+            )
+    except DependencyCycleError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+
+    print(f"\n{report.summary()}")
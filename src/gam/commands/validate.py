@@ -17,7 +17,9 @@ def cmd_validate(manager: StackManager, args) -> None:
     for stack in stacks:
         # Check compose file exists
         if not stack.compose_file.exists():
-            issues.append(f"  ✗ {stack.name}: docker-compose.yml not found")
+            issues.append(
+                f"  ✗ {stack.name}: {stack.compose_file.name} not found"
+            )
 
         # Check for name field mismatch in metadata
         if stack.meta_file.exists():
@@ -0,0 +1,182 @@
+"""`gam daemon`: answer read-only commands from a long-lived process.
+
+The daemon keeps a StackManager, with its indexes and stack statuses, in
+memory and runs the command lines gam.client sends over a unix socket in
+the stacks root. Before each command the manager is caught up with the
+tree on disk. Statuses come from a StateTracker following the Docker
+events stream; while the stream isn't available they are asked of
+docker and kept for the status TTL instead.
+"""
+
+import io
+import json
+import socket
+import socketserver
+import sys
+import threading
+from contextlib import redirect_stderr, redirect_stdout
+from pathlib import Path
+
+from gam import commands
+from gam.cli import DAEMON_COMMANDS, HANDLERS, build_parser
+from gam.client import PROTOCOL_VERSION, socket_path
+from gam.defaults import DEFAULT_STATUS_TTL
+from gam.stack_manager import StackManager
+from gam.state_tracker import StateTracker
+from gam.status_cache import MemoryStatusCache
+
+
+class DaemonError(Exception):
+    """Raised when the daemon can't start listening."""
+
+
+def _exit_code(exit: SystemExit) -> int:
+    """Turn a SystemExit into a process exit code, like the interpreter."""
+    if exit.code is None:
+        return 0
+    if isinstance(exit.code, int):
+        return exit.code
+    print(exit.code, file=sys.stderr)
+    return 1
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Read one request line and write back one reply line."""
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        if not line:
+            return  # A connection probe
+        try:
+            request = json.loads(line)
+        except ValueError:
+            reply = {'error': "Malformed request"}
+        else:
+            reply = self.server.gam_daemon.handle(request)
+        try:
+            self.wfile.write(json.dumps(reply).encode() + b"\n")
+        except OSError:
+            pass  # The client gave up waiting
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class Daemon:
+    """Serves DAEMON_COMMANDS for one stacks root."""
+
+    def __init__(
+        self,
+        manager: StackManager,
+        path: Path | None = None,
+        status_ttl: float = DEFAULT_STATUS_TTL
+    ):
+        self.manager = manager
+        self.path = Path(path or socket_path(manager.root_dir))
+        self.status_ttl = status_ttl
+        self.tracker = StateTracker()
+        self.statuses = MemoryStatusCache(status_ttl)
+        manager.state_tracker = self.tracker
+        manager.status_cache = self.statuses
+        # Commands redirect the process-wide stdout, so one runs at a time.
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._server = None
+
+    def handle(self, request) -> dict:
+        """Run one request's command line and return the reply."""
+        if (
+            not isinstance(request, dict)
+            or request.get('version') != PROTOCOL_VERSION
+        ):
+            return {'error': "Unsupported protocol version"}
+        argv = request.get('argv')
+        if not isinstance(argv, list) or not all(
+            isinstance(arg, str) for arg in argv
+        ):
+            return {'error': "Malformed request"}
+
+        stdout, stderr = io.StringIO(), io.StringIO()
+        code = 0
+        with self._lock, redirect_stdout(stdout), redirect_stderr(stderr):
+            try:
+                args = build_parser().parse_args(argv)
+                if not self._serves(args):
+                    return {'error': f"'{args.command}' isn't served here"}
+                self.manager.refresh()
+                getattr(commands, HANDLERS[args.command])(self.manager, args)
+            except SystemExit as e:
+                code = _exit_code(e)
+            except Exception as e:
+                print(f"Error: {e}", file=sys.stderr)
+                code = 1
+        return {
+            'stdout': stdout.getvalue(),
+            'stderr': stderr.getvalue(),
+            'code': code,
+        }
+
+    def _serves(self, args) -> bool:
+        """Check a command can be answered from this daemon's state.
+
+        Commands run with another scan depth or status TTL than the
+        daemon's would see different stacks or staler statuses than
+        asked for, so they are left to the client.
+        """
+        return (
+            args.command in DAEMON_COMMANDS
+            and not getattr(args, 'watch', False)
+            and args.max_depth == self.manager.index.max_depth
+            and args.status_ttl == self.status_ttl
+        )
+
+    def _follow_events(self) -> None:
+        """Keep the tracker following events. Statuses cached while it
+        wasn't live are dropped on every change it sees, so none are
+        left over once it stops being live."""
+        self.tracker.follow(self._stopping, self.statuses.invalidate)
+
+    def start(self) -> None:
+        """Listen on the socket and start following events."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(str(self.path))
+            except OSError:
+                self.path.unlink()  # Left behind by a daemon that died
+            else:
+                raise DaemonError(
+                    f"A daemon is already running on {self.path}"
+                )
+            finally:
+                probe.close()
+        try:
+            self._server = _Server(str(self.path), _Handler)
+        except OSError as e:
+            raise DaemonError(f"Can't listen on {self.path}: {e}") from e
+        self._server.gam_daemon = self
+        self.path.chmod(0o600)
+        threading.Thread(target=self._follow_events, daemon=True).start()
+
+    def serve_forever(self) -> None:
+        """Answer requests until shutdown() or an exception."""
+        try:
+            self._server.serve_forever(poll_interval=0.2)
+        finally:
+            self.close()
+
+    def shutdown(self) -> None:
+        """Stop serve_forever() from another thread."""
+        self._stopping.set()
+        self._server.shutdown()
+
+    def close(self) -> None:
+        """Stop listening and remove the socket."""
+        self._stopping.set()
+        self._server.server_close()
+        try:
+            self.path.unlink()
+        except OSError:
+            pass
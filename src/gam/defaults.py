@@ -0,0 +1,10 @@
+"""Defaults shared by the CLI and the modules implementing it.
+
+Kept free of imports so the CLI can build its parser cheaply.
+"""
+
+# Default number of stacks operated on at once.
+DEFAULT_JOBS = 4
+
+# Seconds a stack status read from docker is reused by later gam runs.
+DEFAULT_STATUS_TTL = 5.0
@@ -0,0 +1,536 @@
+"""Minimal Docker Engine API client.
+
+Talks HTTP/1.1 straight to the daemon socket so read-only queries (container
+listing, inspect, logs, events) don't pay for starting a `docker` CLI process.
+Idle connections are kept alive and reused. Callers fall back to the CLI when
+an EngineError is raised.
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import AsyncIterator, Iterator
+from urllib.parse import quote, urlencode, urlparse
+
+DEFAULT_HOST = "unix:///var/run/docker.sock"
+
+# Content type the daemon uses for stdout/stderr framed log streams.
+MULTIPLEXED_STREAM = "application/vnd.docker.multiplexed-stream"
+
+# Seconds to fail fast after a failed connect before trying the daemon again.
+RETRY_INTERVAL = 5.0
+
+_DURATION_RE = re.compile(r'(\d+(?:\.\d+)?)(ns|us|µs|ms|s|m|h)')
+_DURATIONS_RE = re.compile(r'(?:\d+(?:\.\d+)?(?:ns|us|µs|ms|s|m|h))+')
+_DURATION_UNITS = {
+    'ns': 1e-9, 'us': 1e-6, 'µs': 1e-6, 'ms': 1e-3,
+    's': 1, 'm': 60, 'h': 3600,
+}
+
+
+class EngineError(Exception):
+    """Raised when the Docker Engine API is unavailable or returns an error."""
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    """HTTPConnection over a unix domain socket."""
+
+    def __init__(self, socket_path: str, timeout: float | None):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+def to_api_time(value: str, now: float | None = None) -> str:
+    """Convert a CLI-style time value to the API's 'seconds.nanos' form.
+
+    Accepts unix timestamps, Go-style relative durations ('10m', '1h30m')
+    and RFC 3339 / ISO 8601 dates, like `docker logs --since` does.
+    """
+    value = value.strip()
+    if re.fullmatch(r'\d+(\.\d+)?', value):
+        return value
+
+    if _DURATIONS_RE.fullmatch(value):
+        seconds = sum(
+            float(amount) * _DURATION_UNITS[unit]
+            for amount, unit in _DURATION_RE.findall(value)
+        )
+        return f"{(now if now is not None else time.time()) - seconds:.9f}"
+
+    text = value.replace('Z', '+00:00').replace('z', '+00:00')
+    # datetime only understands microseconds; drop extra precision.
+    text = re.sub(r'(\.\d{6})\d+', r'\1', text)
+    try:
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise EngineError(f"Unsupported time value: {value!r}") from None
+    return f"{moment.timestamp():.9f}"
+
+
+class LogDecoder:
+    """Split a container log stream into lines.
+
+    Containers without a TTY multiplex stdout and stderr into frames with an
+    8-byte header; containers with a TTY send the raw stream. Partial lines
+    are buffered per stream until their newline arrives.
+    """
+
+    def __init__(self, content_type: str | None = None):
+        self._multiplexed = (
+            True if content_type == MULTIPLEXED_STREAM else None
+        )
+        self._buffer = b""
+        self._partial = {}
+
+    def feed(self, data: bytes) -> Iterator[bytes]:
+        """Consume a chunk of the response body, yielding complete lines."""
+        self._buffer += data
+        if self._multiplexed is None:
+            if len(self._buffer) < 4:
+                return
+            # Old daemons label both kinds of stream as raw, so sniff the
+            # frame header: stream id 0-2 followed by three zero bytes.
+            self._multiplexed = (
+                self._buffer[0] <= 2 and self._buffer[1:4] == b"\0\0\0"
+            )
+
+        if not self._multiplexed:
+            data, self._buffer = self._buffer, b""
+            yield from self._lines(0, data)
+            return
+
+        while len(self._buffer) >= 8:
+            size = int.from_bytes(self._buffer[4:8], 'big')
+            if len(self._buffer) < 8 + size:
+                break
+            stream = self._buffer[0]
+            payload = self._buffer[8:8 + size]
+            self._buffer = self._buffer[8 + size:]
+            yield from self._lines(stream, payload)
+
+    def flush(self) -> Iterator[bytes]:
+        """Yield whatever partial lines remain at end of stream."""
+        if self._buffer and not self._multiplexed:
+            yield from self._lines(0, self._buffer)
+        self._buffer = b""
+        for stream in list(self._partial):
+            rest = self._partial.pop(stream)
+            if rest:
+                yield rest + b"\n"
+
+    def _lines(self, stream: int, data: bytes) -> Iterator[bytes]:
+        data = self._partial.pop(stream, b"") + data
+        lines = data.split(b"\n")
+        if lines[-1]:
+            self._partial[stream] = lines[-1]
+        for line in lines[:-1]:
+            yield line + b"\n"
+
+
+def _context_endpoint() -> tuple[str, bool]:
+    """Host and TLS use of the Docker context the CLI would pick.
+
+    DOCKER_CONTEXT wins over currentContext in the CLI config. A context
+    that can't be read is returned by name, for the CLI to resolve.
+    """
+    config_dir = (
+        os.environ.get("DOCKER_CONFIG") or os.path.expanduser("~/.docker")
+    )
+    name = os.environ.get("DOCKER_CONTEXT")
+    if not name:
+        try:
+            with open(os.path.join(config_dir, "config.json")) as f:
+                name = json.load(f).get("currentContext")
+        except (OSError, ValueError, AttributeError):
+            name = None
+    if not name or name == "default":
+        return DEFAULT_HOST, False
+
+    # Contexts are stored under the sha256 of their name.
+    digest = hashlib.sha256(name.encode()).hexdigest()
+    contexts = os.path.join(config_dir, "contexts")
+    try:
+        with open(os.path.join(contexts, "meta", digest, "meta.json")) as f:
+            endpoint = json.load(f)['Endpoints']['docker']
+        host = endpoint['Host'] or DEFAULT_HOST
+    except (OSError, ValueError, KeyError, TypeError):
+        return f"docker context {name}", False
+    tls = endpoint.get('SkipTLSVerify') or os.path.isdir(
+        os.path.join(contexts, "tls", digest, "docker")
+    )
+    return host, bool(tls)
+
+
+class Engine:
+    """Docker Engine API client with a keep-alive connection pool."""
+
+    def __init__(
+        self,
+        host: str | None = None,
+        pool_size: int = 4,
+        timeout: float = 30.0
+    ):
+        tls = bool(os.environ.get("DOCKER_TLS_VERIFY"))
+        if not host and not os.environ.get("DOCKER_HOST"):
+            host, tls = _context_endpoint()
+        self.host = host or os.environ["DOCKER_HOST"]
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self._idle: list[http.client.HTTPConnection] = []
+        self._lock = threading.Lock()
+        # After a failed connect, calls fail fast until this monotonic time
+        # and callers go straight to their CLI fallback.
+        self._retry_at = 0.0
+
+        url = urlparse(self.host)
+        if url.scheme == 'unix':
+            self._address = ('unix', url.path)
+        elif url.scheme in ('tcp', 'http') and not tls:
+            self._address = ('tcp', (url.hostname, url.port or 2375))
+        else:
+            # ssh://, TLS, npipe and unreadable context hosts are left to
+            # the docker CLI.
+            self._address = None
+
+    def _connect(self, timeout: float | None) -> http.client.HTTPConnection:
+        if self._address is None or time.monotonic() < self._retry_at:
+            raise EngineError(
+                f"Docker Engine API not reachable at {self.host}"
+            )
+        kind, address = self._address
+        if kind == 'unix':
+            conn = _UnixHTTPConnection(address, timeout)
+        else:
+            conn = http.client.HTTPConnection(*address, timeout=timeout)
+        try:
+            conn.connect()
+        except OSError as e:
+            self._retry_at = time.monotonic() + RETRY_INTERVAL
+            raise EngineError(
+                f"Docker Engine API not reachable at {self.host}: {e}"
+            ) from e
+        return conn
+
+    def _acquire(self) -> tuple[http.client.HTTPConnection, bool]:
+        """Get an idle pooled connection, or open a new one."""
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(self.timeout), False
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            if len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self) -> None:
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    @staticmethod
+    def _url(path: str, params: dict | None = None) -> str:
+        if params:
+            return f"{path}?{urlencode(params)}"
+        return path
+
+    @staticmethod
+    def _error(status: int, body: bytes) -> EngineError:
+        try:
+            message = json.loads(body).get('message', '')
+        except (ValueError, AttributeError):
+            message = body.decode('utf-8', 'replace')
+        return EngineError(f"Docker Engine API error {status}: {message}")
+
+    def request(self, method: str, path: str, params: dict | None = None):
+        """Send a request and return the decoded response body."""
+        url = self._url(path, params)
+        while True:
+            conn, reused = self._acquire()
+            try:
+                conn.request(method, url)
+                response = conn.getresponse()
+                body = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                # The daemon may have dropped an idle keep-alive connection.
+                if reused:
+                    continue
+                raise EngineError(
+                    f"Docker Engine API request failed: {e}"
+                ) from e
+            break
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+
+        if response.status >= 400:
+            raise self._error(response.status, body)
+        if 'json' in (response.getheader('Content-Type') or ''):
+            return json.loads(body) if body else None
+        return body
+
+    @contextmanager
+    def _stream(self, path: str, params: dict, follow: bool):
+        """Open a streaming response.
+
+        Finite streams borrow a pooled connection and hand it back once fully
+        read; followed streams get a dedicated connection without a timeout.
+        """
+        url = self._url(path, params)
+        while True:
+            if follow:
+                conn, reused = self._connect(None), False
+            else:
+                conn, reused = self._acquire()
+            try:
+                conn.request('GET', url)
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if reused:
+                    continue
+                raise EngineError(
+                    f"Docker Engine API request failed: {e}"
+                ) from e
+            break
+
+        try:
+            if response.status >= 400:
+                raise self._error(response.status, response.read())
+            yield response
+        except (OSError, http.client.HTTPException) as e:
+            raise EngineError(f"Docker Engine API stream failed: {e}") from e
+        finally:
+            if not follow and response.isclosed() and not response.will_close:
+                self._release(conn)
+            else:
+                conn.close()
+
+    def ping(self) -> bool:
+        """Check whether the daemon answers on the API socket."""
+        try:
+            return self.request('GET', '/_ping') == b"OK"
+        except EngineError:
+            return False
+
+    def containers(
+        self,
+        all: bool = True,
+        filters: dict[str, list[str]] | None = None
+    ) -> list[dict]:
+        """List containers, like `docker ps`."""
+        params = {'all': int(all)}
+        if filters:
+            params['filters'] = json.dumps(filters)
+        return self.request('GET', '/containers/json', params)
+
+    def inspect(self, container_id: str) -> dict:
+        """Return low-level information about a container."""
+        return self.request('GET', f"/containers/{quote(container_id)}/json")
+
+    @staticmethod
+    def _log_params(
+        follow: bool,
+        since: str | None,
+        until: str | None,
+        tail: str | None,
+        timestamps: bool
+    ) -> dict:
+        params = {
+            'stdout': 1,
+            'stderr': 1,
+            'follow': int(follow),
+            'timestamps': int(timestamps),
+        }
+        if since:
+            params['since'] = to_api_time(since)
+        if until:
+            params['until'] = to_api_time(until)
+        if tail:
+            params['tail'] = tail
+        return params
+
+    def logs(
+        self,
+        container_id: str,
+        follow: bool = False,
+        since: str | None = None,
+        until: str | None = None,
+        tail: str | None = None,
+        timestamps: bool = False
+    ) -> Iterator[bytes]:
+        """Yield a container's log lines, stdout and stderr combined.
+
+        `since` and `until` accept the same forms as `docker logs`.
+        """
+        params = self._log_params(follow, since, until, tail, timestamps)
+        path = f"/containers/{quote(container_id)}/logs"
+        with self._stream(path, params, follow) as response:
+            decoder = LogDecoder(response.getheader('Content-Type'))
+            while True:
+                chunk = response.read1(65536)
+                if not chunk:
+                    break
+                yield from decoder.feed(chunk)
+            yield from decoder.flush()
+
+    async def logs_async(
+        self,
+        container_id: str,
+        follow: bool = False,
+        since: str | None = None,
+        until: str | None = None,
+        tail: str | None = None,
+        timestamps: bool = False
+    ) -> AsyncIterator[bytes]:
+        """Asynchronous logs(), for reading many streams on one event loop.
+
+        Each call uses its own connection, closed when iteration ends.
+        """
+        import asyncio
+
+        params = self._log_params(follow, since, until, tail, timestamps)
+        url = self._url(f"/containers/{quote(container_id)}/logs", params)
+        if self._address is None or time.monotonic() < self._retry_at:
+            raise EngineError(
+                f"Docker Engine API not reachable at {self.host}"
+            )
+
+        kind, address = self._address
+        try:
+            if kind == 'unix':
+                reader, writer = await asyncio.open_unix_connection(address)
+            else:
+                reader, writer = await asyncio.open_connection(*address)
+        except OSError as e:
+            self._retry_at = time.monotonic() + RETRY_INTERVAL
+            raise EngineError(
+                f"Docker Engine API not reachable at {self.host}: {e}"
+            ) from e
+
+        try:
+            writer.write(
+                f"GET {url} HTTP/1.1\r\nHost: docker\r\n"
+                f"Connection: close\r\n\r\n".encode()
+            )
+            status, headers = await _read_head(reader)
+            if status >= 400:
+                raise self._error(status, await reader.read())
+            decoder = LogDecoder(headers.get('content-type'))
+            async for chunk in _read_body(reader, headers):
+                for line in decoder.feed(chunk):
+                    yield line
+            for line in decoder.flush():
+                yield line
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            raise EngineError(f"Docker Engine API stream failed: {e}") from e
+        finally:
+            writer.close()
+
+    def events(
+        self,
+        filters: dict[str, list[str]] | None = None,
+        since: str | None = None,
+        until: str | None = None
+    ) -> Iterator[dict]:
+        """Yield daemon events, like `docker events`.
+
+        Without `until` the stream follows new events until closed.
+        """
+        params = {}
+        if filters:
+            params['filters'] = json.dumps(filters)
+        if since:
+            params['since'] = to_api_time(since)
+        if until:
+            params['until'] = to_api_time(until)
+
+        with self._stream('/events', params, until is None) as response:
+            pending = b""
+            while True:
+                chunk = response.read1(65536)
+                if not chunk:
+                    break
+                lines = (pending + chunk).split(b"\n")
+                pending = lines.pop()
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+
+
+async def _read_head(reader) -> tuple[int, dict[str, str]]:
+    """Read an HTTP response's status line and headers."""
+    status_line = await reader.readline()
+    parts = status_line.split(None, 2)
+    if len(parts) < 2:
+        raise ValueError(f"bad status line {status_line!r}")
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return int(parts[1]), headers
+
+
+async def _read_body(reader, headers: dict[str, str]) -> AsyncIterator[bytes]:
+    """Yield an HTTP response body as it arrives, undoing chunking."""
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # Skip any trailers
+                while (await reader.readline()).strip():
+                    pass
+                return
+            yield await reader.readexactly(size)
+            await reader.readexactly(2)
+    elif 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining:
+            chunk = await reader.read(min(remaining, 65536))
+            if not chunk:
+                raise ValueError("connection closed mid-body")
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while chunk := await reader.read(65536):
+            yield chunk
+
+
+_engine: Engine | None = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """Return the shared Engine client for this process."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = Engine()
+        return _engine
@@ -0,0 +1,109 @@
+"""gitignore-style patterns used to prune stack discovery."""
+
+import re
+
+# Read in this order, so .gamignore can override .gitignore.
+IGNORE_FILES = (".gitignore", ".gamignore")
+
+
+def parse_patterns(text: str) -> list[str]:
+    """Return the meaningful pattern lines of an ignore file."""
+    patterns = []
+    for line in text.splitlines():
+        line = line.rstrip()
+        if line and not line.startswith('#'):
+            patterns.append(line)
+    return patterns
+
+
+def _translate(glob: str) -> str:
+    """Translate a gitignore glob to a regex over '/'-separated paths."""
+    out = []
+    i = 0
+    while i < len(glob):
+        c = glob[i]
+        if glob.startswith('**/', i):
+            out.append('(?:.*/)?')
+            i += 3
+            continue
+        if glob.startswith('/**', i) and i + 3 == len(glob):
+            out.append('/.*')
+            i += 3
+            continue
+        if glob.startswith('**', i):
+            out.append('.*')
+            i += 2
+            continue
+        if c == '*':
+            out.append('[^/]*')
+        elif c == '?':
+            out.append('[^/]')
+        elif c == '[':
+            end = glob.find(']', i + 2)
+            if end == -1:
+                out.append(re.escape(c))
+            else:
+                body = glob[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append(f'[{body}]')
+                i = end
+        elif c == '\\' and i + 1 < len(glob):
+            i += 1
+            out.append(re.escape(glob[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """Patterns from the ignore files of one directory.
+
+    Paths are matched relative to that directory. As in git, a pattern
+    without a slash matches a name at any depth, one with a slash is
+    anchored, a trailing slash is ignored (only directories are matched
+    here) and a leading '!' re-includes. The last matching pattern wins.
+    """
+
+    def __init__(self, base: str, patterns: list[str]):
+        self.base = base
+        self.rules: list[tuple[bool, re.Pattern]] = []
+        for pattern in patterns:
+            negate = pattern.startswith('!')
+            if negate:
+                pattern = pattern[1:]
+            elif pattern.startswith(('\\!', '\\#')):
+                pattern = pattern[1:]
+            pattern = pattern.rstrip('/')
+            if not pattern:
+                continue
+            if '/' in pattern:
+                regex = _translate(pattern.lstrip('/'))
+            else:
+                regex = '(?:.*/)?' + _translate(pattern)
+            self.rules.append((negate, re.compile(regex + r'\Z', re.S)))
+
+    def match(self, rel: str) -> bool | None:
+        """Return True if ignored, False if re-included, None if unmatched.
+
+        rel is relative to the stacks root and must lie below base.
+        """
+        if self.base:
+            rel = rel[len(self.base) + 1:]
+        for negate, regex in reversed(self.rules):
+            if regex.match(rel):
+                return not negate
+        return None
+
+
+def is_ignored(rules: list[IgnoreRules], rel: str) -> bool:
+    """Decide whether a directory is ignored by the enclosing rules.
+
+    rules are ordered from the root down; deeper files take precedence.
+    """
+    for ruleset in reversed(rules):
+        decision = ruleset.match(rel)
+        if decision is not None:
+            return decision
+    return False
@@ -0,0 +1,124 @@
+"""Log cursors for `gam logs --since-last`.
+
+A cursor records the timestamp of the last line seen from each log
+source of a stack: a container when logs come from the Engine API, or the
+stack as a whole when they come from `docker compose logs`. The next run
+asks only for lines after it, so periodic log shipping reads just what
+is new.
+"""
+
+import calendar
+import time
+from contextlib import aclosing
+from pathlib import Path
+from typing import AsyncIterator, Callable
+
+from gam.cache import cache_path, load_json, save_json
+from gam.logstream import split_timestamp
+
+CURSOR_DIR = "cursors"
+CURSOR_VERSION = 1
+
+# The source name used for a stack read as a whole.
+STACK_SOURCE = ""
+
+
+def _after(timestamp: str) -> tuple[int, int]:
+    """Return (unix seconds, nanoseconds) one nanosecond after a
+    fixed-width Docker timestamp, so the line itself isn't read again."""
+    seconds = calendar.timegm(
+        time.strptime(timestamp[:19], "%Y-%m-%dT%H:%M:%S")
+    )
+    nanos = int(timestamp[20:29]) + 1
+    return seconds + nanos // 1_000_000_000, nanos % 1_000_000_000
+
+
+def rfc3339_after(timestamp: str) -> str:
+    """Format the moment just after a timestamp for `docker --since`."""
+    seconds, nanos = _after(timestamp)
+    return time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds)) + (
+        f".{nanos:09d}Z"
+    )
+
+
+def api_time_after(timestamp: str) -> str:
+    """Format the moment just after a timestamp for the Engine API."""
+    seconds, nanos = _after(timestamp)
+    return f"{seconds}.{nanos:09d}"
+
+
+class LogCursors:
+    """Per-stack cursor files under the stacks root's .gam directory.
+
+    Cursors are read as stacks are streamed, advanced as lines pass
+    through track() and written back by save(), including after an
+    interrupted run.
+    """
+
+    def __init__(self, root_dir: Path, keep_timestamps: bool = False):
+        self.root_dir = Path(root_dir)
+        self.keep_timestamps = keep_timestamps
+        self._loaded: dict[str, dict[str, str]] = {}
+        self._seen: dict[str, dict[str, bytes]] = {}
+
+    def path(self, stack: str) -> Path:
+        """Return the cursor file of a stack."""
+        return cache_path(self.root_dir, CURSOR_DIR) / f"{stack}.json"
+
+    def load(self, stack: str) -> dict[str, str]:
+        """Return the last timestamp seen per source of a stack."""
+        if stack not in self._loaded:
+            data = load_json(self.path(stack))
+            if data is None or data.get('version') != CURSOR_VERSION:
+                data = {}
+            self._loaded[stack] = data.get('last', {})
+        return self._loaded[stack]
+
+    def last(self, stack: str, source: str = STACK_SOURCE) -> str | None:
+        """Return the last timestamp seen from a source.
+
+        Sources without a cursor of their own (a recreated container, say)
+        start after the newest line seen from the stack.
+        """
+        last = self.load(stack)
+        if source in last:
+            return last[source]
+        return max(last.values(), default=None)
+
+    def track(
+        self,
+        stack: str,
+        source: str,
+        open: Callable[[], AsyncIterator[bytes]]
+    ) -> Callable[[], AsyncIterator[bytes]]:
+        """Wrap a LogStream opener to advance the source's cursor.
+
+        Lines must carry timestamps; they are removed again unless
+        keep_timestamps is set.
+        """
+        seen = self._seen.setdefault(stack, {})
+
+        async def lines() -> AsyncIterator[bytes]:
+            async with aclosing(open()) as inner:
+                async for line in inner:
+                    key, line = split_timestamp(line, self.keep_timestamps)
+                    # A stack read as a whole interleaves its containers.
+                    if key > seen.get(source, b""):
+                        seen[source] = key
+                    yield line
+
+        return lines
+
+    def save(self) -> None:
+        """Write the cursors of every stack that saw new lines."""
+        for stack, seen in self._seen.items():
+            if not seen:
+                continue
+            last = self.load(stack) | {
+                source: key.decode() for source, key in seen.items()
+            }
+            save_json(self.path(stack), {
+                'version': CURSOR_VERSION,
+                'last': last,
+            })
+            self._loaded[stack] = last
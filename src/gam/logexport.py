@@ -0,0 +1,126 @@
+"""Per-stack log files for `gam logs --output-dir`.
+
+Logs are compressed as they are written and split into parts of a
+bounded size, so exporting a whole host's logs takes little disk and
+never needs one huge file.
+"""
+
+import gzip
+import io
+import threading
+from pathlib import Path
+
+COMPRESSIONS = ('gzip', 'zstd', 'none')
+
+_SUFFIXES = {'gzip': '.gz', 'zstd': '.zst', 'none': ''}
+_UNITS = {'K': 1 << 10, 'M': 1 << 20, 'G': 1 << 30}
+
+
+def parse_size(text: str) -> int:
+    """Parse a size such as 500K, 100M or 2G into bytes."""
+    number = text.strip().upper().removesuffix('B')
+    scale = _UNITS.get(number[-1:], 1)
+    if scale != 1:
+        number = number[:-1]
+    try:
+        size = int(float(number) * scale)
+    except ValueError:
+        raise ValueError(f"Invalid size '{text}'") from None
+    if size <= 0:
+        raise ValueError(f"Invalid size '{text}'")
+    return size
+
+
+def _zstd_writer(raw):
+    """Open a zstd compressor over a binary file."""
+    try:
+        # Python 3.14+
+        from compression import zstd
+        return zstd.ZstdFile(raw, 'wb')
+    except ImportError:
+        pass
+    try:
+        import zstandard
+    except ImportError:
+        raise ValueError(
+            "zstd compression needs the zstandard package "
+            "(pip install 'docker-gam[zstd]')"
+        ) from None
+    return zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+
+
+def check_compression(compression: str) -> None:
+    """Raise ValueError if a compression method can't be used here."""
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}'")
+    if compression == 'zstd':
+        _zstd_writer(io.BytesIO()).close()
+
+
+class RotatingFile:
+    """A binary file for one stack's logs, compressed on the fly.
+
+    With `max_bytes`, a part is closed once its compressed size reaches
+    the limit and the next write starts a new one: NAME.000.log.gz,
+    NAME.001.log.gz and so on. Without it there is a single NAME.log.gz.
+    Writes never split across parts. It may be written and closed from
+    different threads.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        name: str,
+        compression: str = 'gzip',
+        max_bytes: int | None = None
+    ):
+        self.directory = Path(directory)
+        self.name = name
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.paths: list[Path] = []
+        self._raw = None
+        self._out = None
+        self._lock = threading.Lock()
+        self._open()
+
+    def _open(self) -> None:
+        part = f".{len(self.paths):03d}" if self.max_bytes else ""
+        suffix = _SUFFIXES[self.compression]
+        path = self.directory / f"{self.name}{part}.log{suffix}"
+        self._raw = open(path, 'wb')
+        if self.compression == 'gzip':
+            self._out = gzip.GzipFile(
+                filename='', mode='wb', fileobj=self._raw, mtime=0
+            )
+        elif self.compression == 'zstd':
+            self._out = _zstd_writer(self._raw)
+        else:
+            self._out = self._raw
+        self.paths.append(path)
+
+    def _close_part(self) -> None:
+        if self._out is not self._raw:
+            self._out.close()
+        self._raw.close()
+        self._out = self._raw = None
+
+    def write(self, data: bytes) -> int:
+        """Compress and write data, moving to a new part when full."""
+        with self._lock:
+            if self._out is None:
+                self._open()
+            self._out.write(data)
+            if self.max_bytes and self._raw.tell() >= self.max_bytes:
+                self._close_part()
+        return len(data)
+
+    def flush(self) -> None:
+        """Do nothing: parts are flushed when closed, which compresses
+        better than flushing every write."""
+
+    def close(self) -> None:
+        """Finish the current part."""
+        with self._lock:
+            if self._out is not None:
+                self._close_part()
@@ -0,0 +1,58 @@
+"""Line filters for log streams.
+
+Filters look at the raw bytes of a line, so lines that are dropped are
+never decoded, prefixed or queued for output.
+"""
+
+import re
+from typing import Callable
+
+# Words that mark a line's severity, from least to most severe.
+LEVELS = {
+    'debug': (b'trace', b'debug', b'dbg'),
+    'info': (b'info', b'notice'),
+    'warn': (b'warn', b'warning'),
+    'error': (b'error', b'err'),
+    'fatal': (b'fatal', b'crit', b'critical', b'panic', b'emerg', b'alert'),
+}
+
+# Characters that make a --grep pattern a regex rather than a substring.
+_REGEX_CHARS = frozenset('.^$*+?{}[]\\|()')
+
+
+def level_pattern(level: str) -> re.Pattern:
+    """Compile a regex finding severity words at or above a level."""
+    names = list(LEVELS)
+    words = [
+        word for name in names[names.index(level):] for word in LEVELS[name]
+    ]
+    return re.compile(rb'\b(?:' + b'|'.join(words) + rb')\b', re.I)
+
+
+def line_filter(
+    grep: str | None = None,
+    level: str | None = None,
+    ignore_case: bool = False
+) -> Callable[[bytes], bool] | None:
+    """Build a predicate keeping lines that pass every given filter.
+
+    A `grep` pattern without regex characters is matched as a plain
+    substring. Returns None when there is nothing to filter; raises
+    re.error for an invalid pattern.
+    """
+    tests = []
+    if grep:
+        if ignore_case or _REGEX_CHARS.intersection(grep):
+            flags = re.I if ignore_case else 0
+            tests.append(re.compile(grep.encode(), flags).search)
+        else:
+            needle = grep.encode()
+            tests.append(lambda line: needle in line)
+    if level:
+        tests.append(level_pattern(level).search)
+
+    if not tests:
+        return None
+    if len(tests) == 1:
+        return tests[0]
+    return lambda line: all(test(line) for test in tests)
@@ -0,0 +1,516 @@
+"""Asynchronous log streaming for many stacks at once.
+
+Every stream is read on one event loop, whether it comes from the Engine
+API or from a `docker compose logs` process, and every line goes through
+a single writer. The writer's queue is bounded, so a terminal that can't
+keep up slows the readers down instead of growing memory. Lines stay
+bytes from the reader to the terminal: they are never decoded, only
+prefixed and written in large chunks.
+"""
+
+import asyncio
+import heapq
+import io
+import re
+import signal
+import sys
+import time
+from collections import deque
+from contextlib import aclosing
+from datetime import datetime, timezone
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Callable, Coroutine
+
+from gam.engine import EngineError
+
+# Lines waiting for the writer before readers have to wait.
+WRITE_QUEUE_SIZE = 1024
+# Longer lines from a process pipe are passed on in pieces.
+PIPE_LINE_LIMIT = 1 << 20
+# Seconds a log process gets to exit after SIGTERM before it is killed.
+STOP_TIMEOUT = 1.0
+# Lines read ahead per stream while merging.
+MERGE_BUFFER = 256
+# Seconds a quiet stream may hold back newer lines of others when merging
+# followed logs.
+MERGE_WINDOW = 1.0
+# Lines queued per stream when following, before new ones are dropped.
+FOLLOW_QUEUE_SIZE = 1024
+# Lines a stream may pass on per round-robin turn.
+FOLLOW_TURN = 64
+# Seconds between reports of dropped lines.
+DROP_REPORT_INTERVAL = 1.0
+
+# An RFC 3339 timestamp near the start of a line, as added by `docker logs
+# --timestamps` (possibly after a `docker compose` "service  | " prefix).
+_TIMESTAMP_RE = re.compile(
+    rb'(\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d(\.\d+)?(Z|[+-]\d\d:\d\d)) ?'
+)
+# Docker's own format: fixed-width nanoseconds in UTC, which sorts as bytes.
+_FIXED_WIDTH = len(b"2006-01-02T15:04:05.000000000Z")
+
+
+@dataclass
+class LogStream:
+    """A source of log lines and the prefix they are shown with.
+
+    `open` is called once reading starts and returns the lines as bytes.
+    Streams with the same `stack` share its rate limit when following.
+    """
+    prefix: str
+    open: Callable[[], AsyncIterator[bytes]]
+    stack: str = ""
+
+
+async def command_lines(cmd: list, cwd) -> AsyncIterator[bytes]:
+    """Yield a command's output lines, stdout and stderr combined.
+
+    The process is waited for at the end of its output, and stopped when
+    iteration ends early or is cancelled.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        *cmd,
+        cwd=cwd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+        limit=PIPE_LINE_LIMIT,
+    )
+    finished = False
+    try:
+        while True:
+            try:
+                line = await proc.stdout.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                # End of output; the last line may lack its newline.
+                if e.partial:
+                    yield e.partial + b"\n"
+                break
+            except asyncio.LimitOverrunError as e:
+                line = await proc.stdout.read(e.consumed) + b"\n"
+            yield line
+        # Let asyncio reap the process itself: signalling one that exited
+        # but wasn't reaped yet makes it report an unknown child.
+        await proc.wait()
+        finished = True
+    finally:
+        if not finished:
+            await _stop(proc)
+
+
+async def _stop(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is not None:
+        return
+    try:
+        proc.terminate()
+        await asyncio.wait_for(proc.wait(), STOP_TIMEOUT)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+
+
+class OutputWriter:
+    """The one place log lines are written from.
+
+    Lines are queued by the readers as bytes, and everything queued is
+    joined into one write from a worker thread. A slow terminal neither
+    blocks the event loop nor lets the queue grow past its bound. By
+    default lines go straight to stdout's binary buffer; a text stream
+    given as `out` gets them decoded.
+    """
+
+    def __init__(self, out=None, queue_size: int = WRITE_QUEUE_SIZE):
+        if out is None:
+            # Anything printed before must come out first.
+            sys.stdout.flush()
+            out = getattr(sys.stdout, 'buffer', sys.stdout)
+        self.out = out
+        self.text = isinstance(out, io.TextIOBase)
+        self.queue_size = queue_size
+        # A plain list and two events cost far less per line than an
+        # asyncio.Queue.
+        self.pending: list[bytes] = []
+        self.closed = False
+        self.ready = asyncio.Event()
+        self.drained = asyncio.Event()
+
+    async def put(self, line: bytes | None) -> None:
+        """Queue a line, waiting while the queue is full.
+
+        None marks the end of output.
+        """
+        if line is None:
+            self.closed = True
+        else:
+            while len(self.pending) >= self.queue_size:
+                self.drained.clear()
+                await self.drained.wait()
+            self.pending.append(line)
+        self.ready.set()
+
+    async def run(self) -> None:
+        """Write queued lines until the end of output is queued."""
+        while True:
+            if not self.pending:
+                if self.closed:
+                    return
+                self.ready.clear()
+                await self.ready.wait()
+                continue
+            batch, self.pending = self.pending, []
+            self.drained.set()
+            await asyncio.to_thread(self._write, b''.join(batch))
+
+    def _write(self, data: bytes) -> None:
+        if self.text:
+            self.out.write(data.decode('utf-8', 'replace'))
+        else:
+            self.out.write(data)
+        self.out.flush()
+
+
+async def _pump(
+    stream: LogStream,
+    writer: OutputWriter,
+    slots: asyncio.Semaphore | None,
+    match: Callable[[bytes], bool] | None = None
+) -> None:
+    """Copy one stream's lines to the writer, if they pass `match`."""
+    prefix = stream.prefix.encode()
+    if slots:
+        await slots.acquire()
+    try:
+        # Close the stream (and stop its process) promptly, even when
+        # cancelled while waiting on the writer.
+        async with aclosing(stream.open()) as lines:
+            async for line in lines:
+                if match and not match(line):
+                    continue
+                await writer.put(prefix + line)
+    except (EngineError, OSError) as e:
+        await writer.put(prefix + f"Error streaming logs: {e}\n".encode())
+    finally:
+        if slots:
+            slots.release()
+
+
+async def stream_logs(
+    streams: list[LogStream],
+    out=None,
+    jobs: int | None = None,
+    match: Callable[[bytes], bool] | None = None
+) -> None:
+    """Read streams concurrently until they end, writing every line.
+
+    With `jobs`, at most that many streams are open at once; the rest wait
+    their turn. Lines are passed on as they arrive, so memory use doesn't
+    depend on how much a stream holds. With `match`, only lines it accepts
+    are written; the rest are dropped as raw bytes by their reader.
+    """
+    writer = OutputWriter(out)
+    writer_task = asyncio.create_task(writer.run())
+    slots = asyncio.Semaphore(max(1, jobs)) if jobs else None
+    try:
+        await asyncio.gather(
+            *(_pump(s, writer, slots, match) for s in streams)
+        )
+        await writer.put(None)
+        await writer_task
+    finally:
+        writer_task.cancel()
+
+
+async def export_logs(
+    streams: list[LogStream],
+    open_output: Callable[[str], BinaryIO],
+    jobs: int | None = None,
+    match: Callable[[bytes], bool] | None = None
+) -> None:
+    """Write each stack's streams to an output of its own.
+
+    `open_output(stack)` is called once per stack and the outputs are
+    closed at the end. Every stack has its own writer, so stacks are
+    written concurrently and nothing goes through the terminal. With
+    `jobs`, at most that many streams are open at once.
+    """
+    writers: dict[str, OutputWriter] = {}
+    for stream in streams:
+        if stream.stack not in writers:
+            writers[stream.stack] = OutputWriter(open_output(stream.stack))
+    writer_tasks = [asyncio.create_task(w.run()) for w in writers.values()]
+    slots = asyncio.Semaphore(max(1, jobs)) if jobs else None
+    try:
+        await asyncio.gather(
+            *(_pump(s, writers[s.stack], slots, match) for s in streams)
+        )
+        for writer in writers.values():
+            await writer.put(None)
+        await asyncio.gather(*writer_tasks)
+    finally:
+        for task in writer_tasks:
+            task.cancel()
+        await asyncio.gather(*writer_tasks, return_exceptions=True)
+        for writer in writers.values():
+            await asyncio.to_thread(writer.out.close)
+
+
+class RateLimit:
+    """Token bucket allowing `rate` lines per second.
+
+    Up to a second's worth may pass at once after a quiet spell.
+    """
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.burst = max(rate, 1.0)
+        self.tokens = self.burst
+        self.last = time.monotonic()
+
+    def take(self) -> bool:
+        """Use up one line of the budget, if there is any left."""
+        now = time.monotonic()
+        self.tokens = min(
+            self.burst, self.tokens + (now - self.last) * self.rate
+        )
+        self.last = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
+
+
+async def follow_logs(
+    streams: list[LogStream],
+    out=None,
+    rate: float | None = None,
+    queue_size: int = FOLLOW_QUEUE_SIZE,
+    match: Callable[[bytes], bool] | None = None
+) -> None:
+    """Follow streams until they end, sharing the output fairly.
+
+    Each stream has its own bounded queue and the queues are drained in
+    turn, so a noisy stack can't starve the others. Readers never wait:
+    a line is dropped when its queue is full (the terminal can't keep up)
+    or when its stack is over `rate` lines per second. Drops are counted
+    per stack and reported every DROP_REPORT_INTERVAL seconds.
+    """
+    # Lines wait in their stream's queue, not the writer's, so they can be
+    # dropped fairly.
+    writer = OutputWriter(out, FOLLOW_TURN)
+    writer_task = asyncio.create_task(writer.run())
+    queues = [deque() for _ in streams]
+    limits = {s.stack: RateLimit(rate) for s in streams} if rate else {}
+    dropped: dict[str, int] = {}
+    arrived = asyncio.Event()
+
+    async def read(stream: LogStream, queue: deque) -> None:
+        limit = limits.get(stream.stack)
+        try:
+            async with aclosing(stream.open()) as lines:
+                async for line in lines:
+                    if match and not match(line):
+                        continue
+                    if len(queue) >= queue_size or (
+                        limit and not limit.take()
+                    ):
+                        name = stream.stack or stream.prefix.strip()
+                        dropped[name] = dropped.get(name, 0) + 1
+                        continue
+                    queue.append(line)
+                    arrived.set()
+        except (EngineError, OSError) as e:
+            queue.append(f"Error streaming logs: {e}\n".encode())
+        arrived.set()
+
+    async def report() -> None:
+        for name, count in dropped.items():
+            await writer.put(f"[{name}] {count} lines dropped\n".encode())
+        dropped.clear()
+
+    readers = [
+        asyncio.create_task(read(s, q)) for s, q in zip(streams, queues)
+    ]
+    prefixes = [s.prefix.encode() for s in streams]
+    next_report = time.monotonic() + DROP_REPORT_INTERVAL
+    try:
+        while True:
+            arrived.clear()
+            for prefix, queue in zip(prefixes, queues):
+                for _ in range(min(len(queue), FOLLOW_TURN)):
+                    await writer.put(prefix + queue.popleft())
+
+            now = time.monotonic()
+            if now >= next_report:
+                await report()
+                next_report = now + DROP_REPORT_INTERVAL
+            if any(queues):
+                continue
+            if all(task.done() for task in readers):
+                break
+            try:
+                await asyncio.wait_for(arrived.wait(), next_report - now)
+            except asyncio.TimeoutError:
+                pass
+
+        await asyncio.gather(*readers)
+        await report()
+        await writer.put(None)
+        await writer_task
+    finally:
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        writer_task.cancel()
+
+
+def _sort_key(match: re.Match) -> bytes:
+    """Normalise a matched timestamp to Docker's sortable form."""
+    timestamp, fraction, offset = match.group(1, 2, 3)
+    if len(timestamp) == _FIXED_WIDTH and offset == b"Z":
+        return timestamp
+    moment = datetime.fromisoformat(
+        timestamp[:19].decode()
+        + ("+00:00" if offset == b"Z" else offset.decode())
+    ).astimezone(timezone.utc)
+    nanos = (fraction or b".")[1:10].ljust(9, b"0")
+    return f"{moment:%Y-%m-%dT%H:%M:%S}.".encode() + nanos + b"Z"
+
+
+def split_timestamp(line: bytes, keep: bool = True) -> tuple[bytes, bytes]:
+    """Find a log line's timestamp.
+
+    Returns (sort key, line), with the timestamp removed from the line
+    unless `keep` is set. Lines without one get an empty key.
+    """
+    match = _TIMESTAMP_RE.search(line, 0, 128)
+    if not match:
+        return b"", line
+    key = _sort_key(match)
+    if not keep:
+        line = line[:match.start()] + line[match.end():]
+    return key, line
+
+
+async def merge_logs(
+    streams: list[LogStream],
+    out=None,
+    window: float | None = None,
+    keep_timestamps: bool = True,
+    match: Callable[[bytes], bool] | None = None
+) -> None:
+    """Write timestamped streams as one chronological stream.
+
+    Each stream is assumed to be in order already, so this is a k-way
+    merge: the earliest head line among the streams is written next. With
+    `window=None` (finite logs) every stream must offer its next line
+    before anything is written. When following, a stream that has been
+    quiet for `window` seconds stops holding the others back, so lines may
+    be out of order by at most that much. Memory is capped by the
+    per-stream read-ahead. Lines `match` rejects never enter it.
+    """
+    writer = OutputWriter(out)
+    writer_task = asyncio.create_task(writer.run())
+    queues = [asyncio.Queue(MERGE_BUFFER) for _ in streams]
+    arrived = asyncio.Event()
+
+    async def read(index: int, stream: LogStream) -> None:
+        queue = queues[index]
+        last_key = b""
+        try:
+            async with aclosing(stream.open()) as lines:
+                async for line in lines:
+                    if match and not match(line):
+                        continue
+                    key, line = split_timestamp(line, keep_timestamps)
+                    # Untimestamped lines stay next to their predecessor.
+                    last_key = key or last_key
+                    await queue.put((last_key, line))
+                    arrived.set()
+        except (EngineError, OSError) as e:
+            await queue.put(
+                (last_key, f"Error streaming logs: {e}\n".encode())
+            )
+        await queue.put(None)
+        arrived.set()
+
+    readers = [
+        asyncio.create_task(read(i, s)) for i, s in enumerate(streams)
+    ]
+    prefixes = [s.prefix.encode() for s in streams]
+    heads = []
+    waiting = set(range(len(streams)))
+    last_active = [time.monotonic()] * len(streams)
+    try:
+        while waiting or heads:
+            arrived.clear()
+            now = time.monotonic()
+            for index in list(waiting):
+                if queues[index].empty():
+                    continue
+                waiting.discard(index)
+                last_active[index] = now
+                item = queues[index].get_nowait()
+                if item is not None:
+                    key, line = item
+                    heapq.heappush(heads, (key, index, line))
+
+            # Streams with nothing queued block output, unless they have
+            # been quiet for longer than the window.
+            blocking = [
+                last_active[i] for i in waiting
+                if window is None or now - last_active[i] < window
+            ]
+            if not heads and not waiting:
+                break
+            if blocking or not heads:
+                timeout = None
+                if blocking and window is not None:
+                    timeout = min(blocking) + window - now
+                try:
+                    await asyncio.wait_for(arrived.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            key, index, line = heapq.heappop(heads)
+            await writer.put(prefixes[index] + line)
+            waiting.add(index)
+
+        await writer.put(None)
+        await writer_task
+    finally:
+        for task in readers:
+            task.cancel()
+        await asyncio.gather(*readers, return_exceptions=True)
+        writer_task.cancel()
+
+
+def run(main: Coroutine) -> bool:
+    """Run a streaming coroutine, stopping it cleanly on Ctrl-C.
+
+    Returns False if it was interrupted. SIGINT cancels the coroutine, so
+    readers close their streams and stop their processes before this
+    returns.
+    """
+    async def runner() -> bool:
+        loop = asyncio.get_running_loop()
+        task = asyncio.current_task()
+        try:
+            loop.add_signal_handler(signal.SIGINT, task.cancel)
+        except (NotImplementedError, RuntimeError, ValueError):
+            # No signal handlers here: Ctrl-C raises KeyboardInterrupt.
+            pass
+        try:
+            await main
+        except asyncio.CancelledError:
+            return False
+        finally:
+            loop.remove_signal_handler(signal.SIGINT)
+        return True
+
+    try:
+        return asyncio.run(runner())
+    except KeyboardInterrupt:
+        return False
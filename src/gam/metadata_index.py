@@ -0,0 +1,62 @@
+"""Inverted indexes over stack metadata."""
+
+from typing import Iterable, Iterator
+
+from gam.stack import Stack
+
+
+class MetadataIndex:
+    """Maps tags, categories, (category, subcategory) pairs and owners to
+    the names of the stacks that have them.
+
+    The values each stack was indexed under are remembered, so a stack can
+    be re-indexed with update() after its metadata was changed in place.
+    Keys without stacks are dropped, so the key sets double as listings.
+    """
+
+    def __init__(self, stacks: Iterable[Stack] = ()):
+        self.tags: dict[str, set[str]] = {}
+        self.categories: dict[str, set[str]] = {}
+        self.subcategories: dict[tuple[str, str], set[str]] = {}
+        self.owners: dict[str, set[str]] = {}
+        self._values: dict[str, tuple] = {}
+        for stack in stacks:
+            self.add(stack)
+
+    def _postings(self, values: tuple) -> Iterator[tuple[dict, object]]:
+        """Yield (index, key) for every posting of a stack's values."""
+        tags, category, subcategory, owner = values
+        for tag in tags:
+            yield self.tags, tag
+        yield self.categories, category
+        yield self.subcategories, (category, subcategory)
+        if owner:
+            yield self.owners, owner
+
+    def add(self, stack: Stack) -> None:
+        """Index a stack under its current metadata."""
+        values = (
+            tuple(dict.fromkeys(stack.tags)),
+            stack.category,
+            stack.subcategory,
+            stack.owner,
+        )
+        self._values[stack.name] = values
+        for index, key in self._postings(values):
+            index.setdefault(key, set()).add(stack.name)
+
+    def remove(self, name: str) -> None:
+        """Drop a stack from every index."""
+        values = self._values.pop(name, None)
+        if values is None:
+            return
+        for index, key in self._postings(values):
+            names = index[key]
+            names.discard(name)
+            if not names:
+                del index[key]
+
+    def update(self, stack: Stack) -> None:
+        """Re-index a stack whose metadata changed."""
+        self.remove(stack.name)
+        self.add(stack)
@@ -0,0 +1,222 @@
+"""Round-trip edits of .stack-meta.yaml files.
+
+Rather than re-dumping the whole file, only the top-level entries whose
+values changed are rewritten, in place. Keys gam doesn't know, comments,
+blank lines, ordering and quoting of untouched entries are all kept, and
+saving unchanged metadata produces exactly the bytes already on disk.
+Block sequences whose items are one-line scalars are edited item by item,
+so the indentation and comments of the items that remain are kept too.
+"""
+
+import difflib
+
+import yaml
+
+# libyaml's C parser, when PyYAML was built with it, is much faster.
+SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+
+def dump_entries(values: dict) -> str:
+    """Serialise top-level entries the way gam always has."""
+    if not values:
+        return ""
+    return yaml.dump(values, default_flow_style=False,
+                     sort_keys=False, indent=2)
+
+
+def _is_filler(line: str) -> bool:
+    """Check whether a line is blank or only a comment."""
+    stripped = line.strip()
+    return not stripped or stripped.startswith('#')
+
+
+def _entries(text: str) -> dict[str, tuple] | None:
+    """Map each top-level key to (first line, last line, value end column,
+    value node).
+
+    The last line excludes comments and blank lines that follow the
+    value. Returns None unless the text is a block mapping at column 0.
+    """
+    try:
+        node = yaml.compose(text, Loader=SafeLoader)
+    except yaml.YAMLError:
+        return None
+    if node is None:
+        return {}
+    if not isinstance(node, yaml.MappingNode) or node.flow_style:
+        return None
+
+    lines = text.splitlines()
+    entries = {}
+    for key, value in node.value:
+        if not isinstance(key, yaml.ScalarNode) or key.start_mark.column:
+            return None
+        first = key.start_mark.line
+        end = value.end_mark
+        last = end.line if end.column else end.line - 1
+        while last > first and _is_filler(lines[last]):
+            last -= 1
+        column = end.column if end.line == last else len(lines[last])
+        entries[key.value] = (first, last, column, value)
+    return entries
+
+
+def _dump_item(value) -> str | None:
+    """Serialise a sequence item, None unless it fits on one line."""
+    if not isinstance(value, (str, int, float, bool)):
+        return None
+    text = yaml.dump([value], default_flow_style=False)
+    if text.count('\n') != 1 or not text.startswith('- '):
+        return None
+    return text[2:-1]
+
+
+def _edit_sequence(
+    lines: list[str],
+    first: int,
+    last: int,
+    node,
+    old: list,
+    new: list,
+) -> str | None:
+    """Rewrite a block sequence entry item by item.
+
+    Items that stay keep their lines, replaced items keep their prefix
+    and trailing comment, and added items copy a neighbour's indentation.
+    Returns None when the entry can't be edited that way.
+    """
+    if (
+        not isinstance(node, yaml.SequenceNode)
+        or node.flow_style
+        or not node.value
+        or not isinstance(new, list)
+        or not new
+        or not isinstance(old, list)
+        or len(old) != len(node.value)
+    ):
+        return None
+    items = node.value
+    rows = [item.start_mark.line for item in items]
+    if (
+        any(not isinstance(item, yaml.ScalarNode) for item in items)
+        or any(item.end_mark.line != item.start_mark.line for item in items)
+        or len(set(rows)) != len(rows)
+        or rows[0] <= first
+    ):
+        return None
+    rendered = [_dump_item(value) for value in new]
+    if None in rendered:
+        return None
+
+    replaced: dict[int, str] = {}
+    deleted: set[int] = set()
+    # New items to add after the old item at each index (-1: before all).
+    added: dict[int, list[str]] = {}
+    matcher = difflib.SequenceMatcher(a=old, b=new, autojunk=False)
+    for op, i1, i2, j1, j2 in matcher.get_opcodes():
+        if op == 'equal':
+            continue
+        common = min(i2 - i1, j2 - j1)
+        for k in range(common):
+            replaced[i1 + k] = rendered[j1 + k]
+        deleted.update(range(i1 + common, i2))
+        if j1 + common < j2:
+            anchor = i1 + common - 1
+            added.setdefault(anchor, []).extend(rendered[j1 + common:j2])
+
+    def prefix(k: int) -> str:
+        return lines[rows[k]][:items[k].start_mark.column]
+
+    out = []
+    for row in range(first, last + 1):
+        if row not in rows:
+            out.append(lines[row])
+            continue
+        k = rows.index(row)
+        if k == 0:
+            out.extend(prefix(0) + item + "\n" for item in added.get(-1, ()))
+        line = lines[row]
+        if k in replaced:
+            end = items[k].end_mark.column
+            line = prefix(k) + replaced[k] + line[end:]
+        if k not in deleted:
+            if not line.endswith('\n'):
+                line += '\n'
+            out.append(line)
+        out.extend(prefix(k) + item + "\n" for item in added.get(k, ()))
+    return "".join(out)
+
+
+def update_metadata(
+    text: str | None,
+    values: dict,
+    fields: dict,
+    defaults: dict | None = None,
+) -> str:
+    """Return metadata file text updated to hold the given values.
+
+    `values` is what a new file would contain; `fields` holds the current
+    value of every key gam manages, including those `values` leaves out
+    because they are at their default. An entry for a managed key is left
+    alone if the file already has that value, rewritten if `values` has
+    the key and removed otherwise. Missing keys of `values` are appended,
+    except those whose value is the one in `defaults`, which a file
+    without them already means; all other entries are kept verbatim.
+
+    Text that isn't a plain top-level mapping is replaced wholesale.
+    """
+    entries = _entries(text) if text else None
+    if entries is None:
+        return dump_entries(values)
+    current = yaml.load(text, Loader=SafeLoader) or {}
+
+    lines = text.splitlines(keepends=True)
+    defaults = defaults or {}
+    missing = {
+        k: v for k, v in values.items()
+        if k not in entries and (k not in defaults or v != defaults[k])
+    }
+    # Where the mapping ends: anything but comments after it, such as a
+    # `...` document end marker, must stay after the appended keys.
+    end = max((entry[1] for entry in entries.values()), default=-1)
+    closed = not all(_is_filler(line) for line in lines[end + 1:])
+    if closed and missing and not entries:
+        return dump_entries(values)
+
+    edits = []
+    for key, (first, last, column, node) in entries.items():
+        if key not in fields or current.get(key) == fields[key]:
+            continue
+        if key not in values:
+            edits.append((first, last, ""))
+            continue
+        new = _edit_sequence(
+            lines, first, last, node, current.get(key), values[key]
+        )
+        if new is not None:
+            edits.append((first, last, new))
+            continue
+        new = dump_entries({key: values[key]})
+        old_tail = lines[last][column:].rstrip('\r\n')
+        if (
+            first == last
+            and old_tail.lstrip().startswith('#')
+            and new.count('\n') == 1
+        ):
+            # Keep a comment trailing a one-line entry.
+            new = new[:-1] + old_tail + "\n"
+        edits.append((first, last, new))
+
+    if closed and missing:
+        edits.append((end + 1, end, dump_entries(missing)))
+        missing = {}
+
+    for first, last, new in sorted(edits, reverse=True):
+        lines[first:last + 1] = [new] if new else []
+
+    result = "".join(lines)
+    if missing:
+        if result and not result.endswith('\n'):
+            result += '\n'
+        result += dump_entries(missing)
+    return result
@@ -0,0 +1,218 @@
+"""Dependency-aware parallel scheduling of stack operations."""
+
+import heapq
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable
+
+from gam.defaults import DEFAULT_JOBS
+from gam.stack import Stack
+
+
+class DependencyCycleError(Exception):
+    """Raised when depends_on declarations form a cycle."""
+
+    def __init__(self, names: list[str]):
+        self.names = names
+        super().__init__(
+            f"Dependency cycle between stacks: {', '.join(names)}"
+        )
+
+
+@dataclass
+class StackResult:
+    """Outcome of running an operation on one stack."""
+    stack: Stack
+    ok: bool
+    duration: float = 0.0
+    skipped_for: str | None = None
+    error: str | None = None
+
+    @property
+    def skipped(self) -> bool:
+        return self.skipped_for is not None
+
+    def describe(self) -> str:
+        """One-line, human-readable outcome."""
+        if self.skipped:
+            return f"✗ SKIPPED {self.stack.name} ({self.skipped_for} failed)"
+        if self.ok:
+            return f"✓ {self.stack.name} ({self.duration:.1f}s)"
+        reason = f": {self.error}" if self.error else ""
+        return f"✗ FAILED {self.stack.name} ({self.duration:.1f}s){reason}"
+
+
+@dataclass
+class ScheduleReport:
+    """Results and timings of a scheduled run."""
+    results: list[StackResult] = field(default_factory=list)
+    elapsed: float = 0.0
+    critical_path: float = 0.0
+
+    @property
+    def failed(self) -> list[StackResult]:
+        return [r for r in self.results if not r.ok]
+
+    def summary(self) -> str:
+        work = sum(r.duration for r in self.results)
+        ok = sum(1 for r in self.results if r.ok)
+        return (
+            f"{ok}/{len(self.results)} stack(s) done in "
+            f"{self.elapsed:.1f}s (critical path {self.critical_path:.1f}s, "
+            f"{work:.1f}s of work)"
+        )
+
+
+def build_graph(
+    stacks: list[Stack],
+    reverse: bool = False
+) -> dict[str, set[str]]:
+    """Map each stack name to the names it has to wait for.
+
+    Edges come from depends_on, limited to the given stacks. With
+    reverse=True they are flipped so dependents go first (shutdown order).
+    """
+    by_name = {s.name: s for s in stacks}
+    waits_on = {name: set() for name in by_name}
+
+    for stack in by_name.values():
+        for dep in stack.depends_on:
+            if dep not in by_name or dep == stack.name:
+                continue
+            if reverse:
+                waits_on[dep].add(stack.name)
+            else:
+                waits_on[stack.name].add(dep)
+
+    _check_cycles(waits_on)
+    return waits_on
+
+
+def _check_cycles(waits_on: dict[str, set[str]]) -> None:
+    """Raise DependencyCycleError if the graph can't be ordered."""
+    remaining = {name: len(deps) for name, deps in waits_on.items()}
+    dependents = _dependents(waits_on)
+    ready = [name for name, count in remaining.items() if count == 0]
+    while ready:
+        name = ready.pop()
+        for child in dependents[name]:
+            remaining[child] -= 1
+            if remaining[child] == 0:
+                ready.append(child)
+    stuck = sorted(name for name, count in remaining.items() if count > 0)
+    if stuck:
+        raise DependencyCycleError(stuck)
+
+
+def _dependents(waits_on: dict[str, set[str]]) -> dict[str, set[str]]:
+    dependents = {name: set() for name in waits_on}
+    for name, deps in waits_on.items():
+        for dep in deps:
+            dependents[dep].add(name)
+    return dependents
+
+
+def _timed(action: Callable[[Stack], bool], stack: Stack) -> StackResult:
+    start = time.monotonic()
+    try:
+        ok, error = bool(action(stack)), None
+    except Exception as e:
+        ok, error = False, str(e)
+    return StackResult(stack, ok, time.monotonic() - start, error=error)
+
+
+def run_graph(
+    stacks: list[Stack],
+    action: Callable[[Stack], bool],
+    jobs: int = DEFAULT_JOBS,
+    reverse: bool = False,
+    keep_going: bool = False,
+    on_start: Callable[[Stack], None] | None = None,
+    on_finish: Callable[[StackResult], None] | None = None
+) -> ScheduleReport:
+    """Run action on every stack as soon as the stacks it waits on are done.
+
+    Up to `jobs` actions run at once. Among ready stacks, priority decides
+    who goes first (highest first, or lowest first when reversed). Stacks
+    waiting on a failed stack are skipped, unless keep_going=True, which
+    treats a failure like completion. Callbacks run in the calling thread,
+    so they may print freely.
+    """
+    by_name = {s.name: s for s in stacks}
+    waits_on = build_graph(list(by_name.values()), reverse)
+    dependents = _dependents(waits_on)
+    remaining = {name: len(deps) for name, deps in waits_on.items()}
+    sign = -1 if reverse else 1
+
+    ready = []
+
+    def push(name: str) -> None:
+        stack = by_name[name]
+        heapq.heappush(ready, (sign * stack.priority, name))
+
+    for name, count in remaining.items():
+        if count == 0:
+            push(name)
+
+    report = ScheduleReport()
+    results: dict[str, StackResult] = {}
+
+    def finish(result: StackResult) -> None:
+        results[result.stack.name] = result
+        report.results.append(result)
+        if on_finish:
+            on_finish(result)
+
+    def skip_dependents(name: str) -> None:
+        pending = [name]
+        while pending:
+            failed = pending.pop()
+            for child in sorted(dependents[failed]):
+                if child not in results:
+                    finish(StackResult(by_name[child], False,
+                                       skipped_for=failed))
+                    pending.append(child)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        running = {}
+        while ready or running:
+            while ready and len(running) < max(1, jobs):
+                _, name = heapq.heappop(ready)
+                if on_start:
+                    on_start(by_name[name])
+                running[pool.submit(_timed, action, by_name[name])] = name
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=running.get):
+                name = running.pop(future)
+                result = future.result()
+                finish(result)
+                if not result.ok and not keep_going:
+                    skip_dependents(name)
+                    continue
+                for child in dependents[name]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0 and child not in results:
+                        push(child)
+
+    report.elapsed = time.monotonic() - started
+    report.critical_path = _critical_path(waits_on, results)
+    return report
+
+
+def _critical_path(
+    waits_on: dict[str, set[str]],
+    results: dict[str, StackResult]
+) -> float:
+    """Length of the slowest chain of dependent stack operations."""
+    lengths: dict[str, float] = {}
+
+    def length(name: str) -> float:
+        if name not in lengths:
+            before = max((length(d) for d in waits_on[name]), default=0.0)
+            lengths[name] = before + results[name].duration
+        return lengths[name]
+
+    return max((length(name) for name in results), default=0.0)
@@ -0,0 +1,271 @@
+"""Ranked full-text search over stack metadata for `gam search`.
+
+Every stack is indexed as a bag of words from its name, description,
+tags, category, owner, documentation and custom metadata keys, weighted
+by field. Queries are ranked with BM25; each query word also matches
+words it is a prefix of and, through a trigram index of the vocabulary,
+words spelled similarly.
+
+The index is kept in .gam/search.json beside the discovery index. A
+stack is re-indexed only when its .stack-meta.yaml changed, so a search
+costs one stat per stack rather than parsing every metadata file.
+"""
+
+import math
+import os
+import re
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Callable, Iterable
+
+from gam.cache import cache_path, load_json, save_json
+from gam.stack import Stack
+from gam.stack_index import _RACY_WINDOW_NS
+
+SEARCH_FILE = "search.json"
+SEARCH_VERSION = 1
+
+# How much one occurrence of a word counts, by the field it's in.
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'tags': 2.0,
+    'category': 1.5,
+    'subcategory': 1.5,
+    'owner': 1.5,
+    'description': 1.0,
+    'documentation': 0.5,
+    'extra': 1.0,
+}
+
+# BM25 term frequency saturation and length normalisation.
+K1 = 1.2
+B = 0.75
+
+# Relative weight of a query word matching as a prefix, or as a similar
+# word (scaled by trigram similarity, which must be at least FUZZY_MIN).
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+FUZZY_MIN = 0.5
+
+_WORD_RE = re.compile(r'[a-z0-9]+')
+
+# An mtime that never matches, so the stack is re-read next time.
+_STALE = -1
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lower-case words."""
+    return _WORD_RE.findall(text.lower())
+
+
+def trigrams(word: str) -> set[str]:
+    """Return the trigrams of a word, padded so short words have some."""
+    padded = f"^{word}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _texts(value) -> Iterable[str]:
+    """Yield the strings inside a metadata value."""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            yield str(key)
+            yield from _texts(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _texts(item)
+    elif value is not None and not isinstance(value, bool):
+        yield str(value)
+
+
+def document(stack: Stack) -> dict[str, float]:
+    """Return a stack's field-weighted term frequencies."""
+    terms: dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for text in _texts(getattr(stack, field)):
+            for word in tokenize(text):
+                terms[word] = terms.get(word, 0.0) + weight
+    return terms
+
+
+def _meta_mtime(stack: Stack) -> int | None:
+    """Return the mtime of a stack's metadata file, None if it has none."""
+    try:
+        mtime = os.stat(stack.meta_file).st_mtime_ns
+    except OSError:
+        return None
+    # Files modified just now may change again within the same tick.
+    if time.time_ns() - mtime < _RACY_WINDOW_NS:
+        return _STALE
+    return mtime
+
+
+class SearchIndex:
+    """BM25 index over the metadata of a stacks root's stacks."""
+
+    def __init__(self, root_dir: Path):
+        self.root_dir = Path(root_dir)
+        self.path = cache_path(self.root_dir, SEARCH_FILE)
+        # Per stack: its path, metadata mtime, terms and weighted length.
+        self.docs: dict[str, dict] = {}
+        self.changed = False
+        self._postings: dict[str, dict[str, float]] | None = None
+        self._vocabulary: list[str] = []
+        self._trigrams: dict[str, list[str]] = {}
+        self._gram_counts: dict[str, int] = {}
+
+    def load(self) -> bool:
+        """Load the index from disk. Returns False if there was none."""
+        data = load_json(self.path)
+        if (
+            data is None
+            or data.get('version') != SEARCH_VERSION
+            or data.get('root') != str(self.root_dir)
+        ):
+            self.docs = {}
+            return False
+        self.docs = data.get('docs', {})
+        self._postings = None
+        return True
+
+    def save(self) -> bool:
+        """Write the index to disk if it changed since it was loaded."""
+        if not self.changed:
+            return True
+        saved = save_json(self.path, {
+            'version': SEARCH_VERSION,
+            'root': str(self.root_dir),
+            'docs': self.docs,
+        })
+        self.changed = not saved
+        return saved
+
+    @staticmethod
+    def _entry(stack: Stack, mtime: int | None) -> dict:
+        terms = document(stack)
+        return {
+            'path': str(stack.path),
+            'mtime': mtime,
+            'terms': terms,
+            'length': sum(terms.values()),
+        }
+
+    def refresh(
+        self,
+        stacks: Iterable[Stack],
+        load: Callable[[list[Stack]], None] | None = None
+    ) -> None:
+        """Revalidate against the given stacks, re-indexing changed ones.
+
+        `load` materialises the metadata of the stacks to re-index in one
+        go, e.g. StackManager.load_metadata.
+        """
+        docs = {}
+        stale = []
+        for stack in stacks:
+            mtime = _meta_mtime(stack)
+            entry = self.docs.get(stack.name)
+            if (
+                entry is None
+                or mtime == _STALE
+                or entry['mtime'] != mtime
+                or entry['path'] != str(stack.path)
+            ):
+                stale.append((stack, mtime))
+            else:
+                docs[stack.name] = entry
+
+        if stale:
+            if load is not None:
+                load([stack for stack, _ in stale])
+            for stack, mtime in stale:
+                docs[stack.name] = self._entry(stack, mtime)
+            self.changed = True
+        elif docs.keys() != self.docs.keys():
+            self.changed = True
+        if self.changed:
+            self._postings = None
+        self.docs = docs
+
+    def update(self, stack: Stack) -> None:
+        """Re-index a stack whose metadata changed in memory."""
+        self.docs[stack.name] = self._entry(stack, _STALE)
+        self.changed = True
+        self._postings = None
+
+    def _build(self) -> None:
+        """Invert the documents into postings and a trigram index."""
+        postings: dict[str, dict[str, float]] = {}
+        for name, doc in self.docs.items():
+            for term, tf in doc['terms'].items():
+                postings.setdefault(term, {})[name] = tf
+        self._postings = postings
+        self._vocabulary = sorted(postings)
+        self._trigrams = {}
+        self._gram_counts = {}
+        for term in self._vocabulary:
+            grams = trigrams(term)
+            self._gram_counts[term] = len(grams)
+            for gram in grams:
+                self._trigrams.setdefault(gram, []).append(term)
+
+    def _expand(self, word: str) -> Iterable[tuple[str, float]]:
+        """Yield the indexed terms a query word matches, with weights."""
+        if word in self._postings:
+            yield word, 1.0
+
+        if len(word) >= 2:
+            i = bisect_left(self._vocabulary, word)
+            while (
+                i < len(self._vocabulary)
+                and self._vocabulary[i].startswith(word)
+            ):
+                if self._vocabulary[i] != word:
+                    yield self._vocabulary[i], PREFIX_WEIGHT
+                i += 1
+
+        if len(word) >= 3:
+            grams = trigrams(word)
+            shared: dict[str, int] = {}
+            for gram in grams:
+                for term in self._trigrams.get(gram, ()):
+                    shared[term] = shared.get(term, 0) + 1
+            for term, count in shared.items():
+                if term.startswith(word):
+                    continue
+                similarity = 2 * count / (
+                    len(grams) + self._gram_counts[term]
+                )
+                if word in term:
+                    similarity = max(similarity, FUZZY_MIN)
+                if similarity >= FUZZY_MIN:
+                    yield term, FUZZY_WEIGHT * similarity
+
+    def search(self, query: str) -> list[tuple[str, float]]:
+        """Return (stack name, score) pairs matching a query, best first."""
+        words = tokenize(query)
+        if not words or not self.docs:
+            return []
+        if self._postings is None:
+            self._build()
+
+        count = len(self.docs)
+        average = sum(d['length'] for d in self.docs.values()) / count or 1.0
+        scores: dict[str, float] = {}
+        for word in dict.fromkeys(words):
+            # A word counts once per stack, by its best matching term.
+            best: dict[str, float] = {}
+            for term, weight in self._expand(word):
+                postings = self._postings[term]
+                idf = math.log(
+                    1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for name, tf in postings.items():
+                    norm = 1 - B + B * self.docs[name]['length'] / average
+                    score = weight * idf * tf * (K1 + 1) / (tf + K1 * norm)
+                    if score > best.get(name, 0.0):
+                        best[name] = score
+            for name, score in best.items():
+                scores[name] = scores.get(name, 0.0) + score
+
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))
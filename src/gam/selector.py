@@ -0,0 +1,137 @@
+"""Selector expressions for choosing stacks.
+
+A selector is a comma-separated list of terms that must all hold:
+
+    category=data          category (category=data/sql adds a subcategory)
+    tag=prod               has the tag
+    owner=media-team       owned by
+    name=web-*             name matches a glob
+    priority<=2            priority compared with <, <=, =, >=, >
+    critical, auto_start   boolean fields
+
+Any term can be negated with a leading '!' (or with != for values).
+Tag, category and owner terms are answered from StackManager's
+metadata indexes; only what's left is checked stack by stack.
+"""
+
+import fnmatch
+import operator
+import re
+from dataclasses import dataclass
+
+# Terms answered by a metadata index, by the index's attribute name.
+_INDEXED = {'tag': 'tags', 'category': 'categories', 'owner': 'owners'}
+# Boolean stack fields, by the names a selector may use for them.
+_BOOLEANS = {'critical': 'critical', 'auto_start': 'auto_start',
+             'autostart': 'auto_start'}
+_COMPARISONS = {
+    '<': operator.lt, '<=': operator.le, '=': operator.eq,
+    '>=': operator.ge, '>': operator.gt,
+}
+_TRUE = {'true', 'yes', '1'}
+_FALSE = {'false', 'no', '0'}
+
+_TERM_RE = re.compile(r'(!?)\s*([a-z_]+)\s*(?:(<=|>=|!=|==|=|<|>)\s*(.*))?')
+
+
+class SelectorError(ValueError):
+    """A selector expression that can't be parsed."""
+
+
+@dataclass(frozen=True)
+class Term:
+    """One condition of a selector."""
+    key: str
+    op: str
+    value: str | int | bool
+    negate: bool = False
+
+    @property
+    def indexed(self) -> bool:
+        return self.key in _INDEXED or self.key == 'subcategory'
+
+    def postings(self, index) -> set[str]:
+        """Names of the stacks matching an indexed term."""
+        if self.key == 'subcategory':
+            return index.subcategories.get(self.value, set())
+        return getattr(index, _INDEXED[self.key]).get(self.value, set())
+
+    def test(self, stack) -> bool:
+        """Check a term against one stack."""
+        if self.key == 'name':
+            return fnmatch.fnmatchcase(stack.name, self.value)
+        if self.key == 'priority':
+            return _COMPARISONS[self.op](stack.priority, self.value)
+        return bool(getattr(stack, self.key)) == self.value
+
+
+def _parse_term(text: str) -> Term:
+    match = _TERM_RE.fullmatch(text)
+    if not match:
+        raise SelectorError(f"Invalid selector term '{text}'")
+    negate, key, op, value = match.groups()
+    negate = bool(negate)
+    if op == '!=':
+        op, negate = '=', not negate
+    elif op == '==':
+        op = '='
+    value = (value or "").strip()
+
+    if key == 'priority':
+        if op is None or not re.fullmatch(r'-?\d+', value):
+            raise SelectorError(f"'{text}': priority needs a comparison "
+                                "with a number, e.g. priority<=2")
+        return Term(key, op, int(value), negate)
+
+    if key in _BOOLEANS:
+        field = _BOOLEANS[key]
+        if op is None:
+            return Term(field, '=', True, negate)
+        if op == '=' and value.lower() in _TRUE | _FALSE:
+            return Term(field, '=', value.lower() in _TRUE, negate)
+        raise SelectorError(f"'{text}': {key} is true or false")
+
+    if key in _INDEXED or key == 'name':
+        if op != '=' or not value:
+            raise SelectorError(f"'{text}': use {key}=VALUE")
+        if key == 'category' and '/' in value:
+            category, subcategory = value.split('/', 1)
+            return Term('subcategory', '=', (category, subcategory), negate)
+        return Term(key, '=', value, negate)
+
+    raise SelectorError(f"Unknown selector key '{key}' in '{text}'")
+
+
+class Selector:
+    """A compiled selector expression."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.terms = [
+            _parse_term(part.strip()) for part in text.split(',')
+        ]
+
+    def __repr__(self) -> str:
+        return f"Selector({self.text!r})"
+
+    def match(self, manager) -> set[str]:
+        """Return the names of a StackManager's stacks that match."""
+        index = manager.metadata_index
+        names = set(manager.stacks)
+        lookups = [t for t in self.terms if t.indexed]
+        # Narrow to the smallest posting list first, then subtract.
+        lookups.sort(key=lambda t: (t.negate, len(t.postings(index))))
+        for term in lookups:
+            if term.negate:
+                names -= term.postings(index)
+            else:
+                names &= term.postings(index)
+            if not names:
+                return names
+        for term in self.terms:
+            if not term.indexed:
+                names = {
+                    name for name in names
+                    if term.test(manager.stacks[name]) != term.negate
+                }
+        return names
@@ -1,12 +1,80 @@
+import os
+import re
 import subprocess
-from dataclasses import dataclass, field
+import sys
+from dataclasses import MISSING, dataclass, field, fields
 from pathlib import Path
 
 import yaml
 
+from gam.engine import EngineError, get_engine
+from gam.metafile import SafeLoader, update_metadata
+from gam.transaction import write_atomic
+
+# Compose file names, in the order docker compose looks for them.
+COMPOSE_FILES = (
+    "compose.yaml",
+    "compose.yml",
+    "docker-compose.yaml",
+    "docker-compose.yml",
+)
+
+# Labels docker compose attaches to every container it creates.
+COMPOSE_PROJECT_LABEL = "com.docker.compose.project"
+COMPOSE_WORKING_DIR_LABEL = "com.docker.compose.project.working_dir"
+COMPOSE_ONEOFF_LABEL = "com.docker.compose.oneoff"
+COMPOSE_SERVICE_LABEL = "com.docker.compose.service"
+COMPOSE_NUMBER_LABEL = "com.docker.compose.container-number"
+
+
+# Health check status as `docker ps` shows it, e.g. "Up 5 minutes (healthy)".
+_HEALTH_RE = re.compile(r'\((?:health: )?(healthy|unhealthy|starting)\)')
+
+
+def container_health(container: dict) -> str | None:
+    """Return a container's health check status, None if it has none.
+
+    `docker compose ps` reports it as 'Health'; `docker ps` and the Engine
+    API only as part of 'Status'.
+    """
+    health = container.get('Health')
+    if isinstance(health, dict):  # Newer Engine API versions
+        health = health.get('Status')
+    if health:
+        return health
+    match = _HEALTH_RE.search(container.get('Status') or "")
+    return match.group(1) if match else None
+
+
+def summarize_containers(containers: list[dict]) -> dict:
+    """Build a status dict from a list of container records.
+
+    Each record needs a 'State' key, which is what both `docker compose
+    ps` and `docker ps` report, and may carry its health check status
+    (see container_health).
+    """
+    running = [c for c in containers if c.get('State') == 'running']
+    return {
+        'status': 'running' if running else 'stopped',
+        'containers': len(containers),
+        'running': len(running),
+        'exited': sum(
+            1 for c in containers if c.get('State') in ('exited', 'dead')
+        ),
+        'unhealthy': sum(
+            1 for c in running if container_health(c) == 'unhealthy'
+        ),
+    }
+
+
 @dataclass
 class Stack:
-    """Represents a Docker Compose stack with metadata."""
+    """Represents a Docker Compose stack with metadata.
+
+    Stacks made with Stack.lazy() read .stack-meta.yaml on first access
+    to (or assignment of) a metadata field, so commands touching one stack
+    don't parse every stack's metadata.
+    """
     name: str
     path: Path
     category: str = "uncategorized"
@@ -21,32 +89,107 @@ class Stack:
     owner: str = ""
     documentation: str = ""
     health_check_url: str = ""
+    # Keys of .stack-meta.yaml that aren't fields above.
+    extra: dict = field(default_factory=dict)
+
+    # Class-level default: stacks built directly are fully materialised.
+    _meta_loaded = True
+
+    @classmethod
+    def lazy(cls, name: str, path: Path) -> 'Stack':
+        """Create a stack whose metadata is loaded on first use."""
+        stack = cls(name=name, path=path)
+        object.__setattr__(stack, '_meta_loaded', False)
+        return stack
+
+    def __getattribute__(self, key):
+        if (
+            key in _METADATA_FIELDS
+            and not object.__getattribute__(self, '_meta_loaded')
+        ):
+            object.__getattribute__(self, 'load_metadata')()
+        return object.__getattribute__(self, key)
+
+    def __setattr__(self, key, value):
+        if (
+            key in _METADATA_FIELDS
+            and not object.__getattribute__(self, '_meta_loaded')
+        ):
+            # Load first so a later load can't clobber this assignment.
+            object.__getattribute__(self, 'load_metadata')()
+        object.__setattr__(self, key, value)
+
+    @property
+    def meta_loaded(self) -> bool:
+        return self._meta_loaded
 
     @property
     def compose_file(self) -> Path:
+        for name in COMPOSE_FILES:
+            if os.path.isfile(self.path / name):
+                return self.path / name
         return self.path / "docker-compose.yml"
 
     @property
     def meta_file(self) -> Path:
         return self.path / ".stack-meta.yaml"
 
+    @property
+    def project_name(self) -> str:
+        """Default compose project name for this stack's directory."""
+        name = re.sub(r'[^a-z0-9_-]', '', self.path.name.lower())
+        return name.lstrip('_-')
+
     def exists(self) -> bool:
         return self.compose_file.exists()
 
     def load_metadata(self) -> None:
         """Load metadata from .stack-meta.yaml."""
+        object.__setattr__(self, '_meta_loaded', True)
         if self.meta_file.exists():
             with open(self.meta_file) as f:
-                meta = yaml.safe_load(f) or {}
+                meta = yaml.load(f, Loader=SafeLoader) or {}
                 for key, value in meta.items():
                     # Skip 'name' - it's always derived from path.
                     if key == 'name':
                         continue
-                    if hasattr(self, key):
+                    if key in _METADATA_FIELDS and key != 'extra':
                         setattr(self, key, value)
+                    else:
+                        self.extra[key] = value
+
+    def save_metadata(self) -> bool:
+        """Save metadata to .stack-meta.yaml, replacing it atomically.
 
-    def save_metadata(self) -> None:
-        """Save metadata to .stack-meta.yaml."""
+        The file isn't touched if it already holds these values. Returns
+        whether it was written.
+        """
+        old, new = self.pending_metadata()
+        if new == old:
+            return False
+        write_atomic(self.meta_file, new)
+        return True
+
+    def pending_metadata(self) -> tuple[bytes | None, bytes]:
+        """Return the metadata file's bytes (None if there is no file)
+        and the bytes save_metadata would replace them with."""
+        try:
+            with open(self.meta_file, 'rb') as f:
+                old = f.read()
+        except FileNotFoundError:
+            return None, self.render_metadata().encode()
+        try:
+            text = old.decode()
+        except UnicodeDecodeError:
+            text = None
+        return old, self.render_metadata(text).encode()
+
+    def render_metadata(self, current: str | None = None) -> str:
+        """Serialise metadata as the contents of .stack-meta.yaml.
+
+        Given the file's current text, only entries whose values changed
+        are rewritten; unknown keys and comments are kept.
+        """
         # Build metadata dict from current values.
         # Note: 'name' is omitted - it's always derived from directory path.
         meta = {
@@ -73,13 +216,42 @@ class Stack:
         if self.health_check_url:
             meta['health_check_url'] = self.health_check_url
 
-        # Write to file
-        with open(self.meta_file, 'w') as f:
-            yaml.dump(meta, f, default_flow_style=False,
-                      sort_keys=False, indent=2)
+        for key, value in self.extra.items():
+            meta.setdefault(key, value)
+
+        managed = {
+            key: getattr(self, key)
+            for key in _METADATA_FIELDS if key != 'extra'
+        }
+        return update_metadata(current, meta, managed, _METADATA_DEFAULTS)
+
+    def get_containers(self) -> list[dict]:
+        """List this stack's service containers through the Engine API.
+
+        Raises EngineError when the API is unavailable.
+        """
+        engine = get_engine()
+        containers = []
+        # Compose records the directory it ran in, which may be either the
+        # path we discovered or its symlink-resolved form.
+        for working_dir in dict.fromkeys(
+            [str(self.path), os.path.realpath(self.path)]
+        ):
+            containers.extend(engine.containers(all=True, filters={
+                'label': [
+                    f"{COMPOSE_WORKING_DIR_LABEL}={working_dir}",
+                    f"{COMPOSE_ONEOFF_LABEL}=False",
+                ],
+            }))
+        return containers
 
     def get_status(self) -> dict:
-        """Get running status using docker compose ps."""
+        """Get running status from the Engine API or docker compose ps."""
+        try:
+            return summarize_containers(self.get_containers())
+        except EngineError:
+            pass
+
         try:
             result = subprocess.run(
                 ["docker", "compose", "ps", "--format", "json"],
@@ -93,41 +265,70 @@ class Stack:
                     yaml.safe_load(line)
                     for line in result.stdout.strip().split('\n')
                 ]
-                running = sum(
-                    1 for c in containers if c.get('State') == 'running'
-                )
-                return {
-                    'status': 'running' if running > 0 else 'stopped',
-                    'containers': len(containers),
-                    'running': running
-                }
+                return summarize_containers(containers)
         except subprocess.CalledProcessError:
             pass
-        return {'status': 'stopped', 'containers': 0, 'running': 0}
+        return summarize_containers([])
+
+    def _compose(
+        self,
+        cmd: list[str],
+        quiet: bool = False,
+        timeout: float | None = None
+    ) -> bool:
+        """Run a docker compose command in the stack directory.
+
+        With quiet=True the output is captured and only shown (prefixed
+        with the stack name) if the command fails, so concurrent runs don't
+        interleave their progress output. A command running longer than
+        `timeout` seconds is killed and counts as failed.
+        """
+        try:
+            if quiet:
+                subprocess.run(
+                    cmd, cwd=self.path, check=True, timeout=timeout,
+                    capture_output=True, text=True
+                )
+            else:
+                subprocess.run(cmd, cwd=self.path, check=True, timeout=timeout)
+            return True
+        except subprocess.TimeoutExpired:
+            sys.stderr.write(
+                f"[{self.name}] {' '.join(cmd)} timed out after {timeout}s\n"
+            )
+            return False
+        except subprocess.CalledProcessError as e:
+            output = (e.stderr or "") + (e.stdout or "") if quiet else ""
+            if output.strip():
+                sys.stderr.write("".join(
+                    f"[{self.name}] {line}\n"
+                    for line in output.strip().splitlines()
+                ))
+            return False
 
-    def up(self, detached: bool = True) -> bool:
+    def up(self, detached: bool = True, quiet: bool = False) -> bool:
         """Start the stack."""
         cmd = ["docker", "compose", "up"]
         if detached:
             cmd.append("-d")
-        try:
-            subprocess.run(cmd, cwd=self.path, check=True)
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        return self._compose(cmd, quiet)
 
-    def down(self) -> bool:
+    def down(self, quiet: bool = False, timeout: float | None = None) -> bool:
         """Stop the stack."""
-        try:
-            subprocess.run(
-                ["docker", "compose", "down"],
-                cwd=self.path,
-                check=True
-            )
-            return True
-        except subprocess.CalledProcessError:
-            return False
+        return self._compose(["docker", "compose", "down"], quiet, timeout)
 
     def restart(self) -> bool:
         """Restart the stack."""
         return self.down() and self.up()
+
+
+# Fields that come from .stack-meta.yaml, i.e. everything but the identity.
+_METADATA_FIELDS = frozenset(
+    f.name for f in fields(Stack) if f.name not in ('name', 'path')
+)
+
+# What a metadata field is when the file doesn't mention it.
+_METADATA_DEFAULTS = {
+    f.name: f.default if f.default is not MISSING else f.default_factory()
+    for f in fields(Stack) if f.name in _METADATA_FIELDS
+}
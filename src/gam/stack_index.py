@@ -0,0 +1,249 @@
+"""Persistent index of the directory tree under a stacks root."""
+
+import os
+import time
+from pathlib import Path
+
+from gam.cache import cache_path, load_json, save_json
+from gam.ignore import IGNORE_FILES, IgnoreRules, is_ignored, parse_patterns
+from gam.stack import COMPOSE_FILES
+
+INDEX_FILE = "index.json"
+INDEX_VERSION = 2
+
+# Directory mtimes this recent may still change within the same timestamp
+# tick, so they are not trusted on the next run.
+_RACY_WINDOW_NS = 1_000_000_000
+
+
+class StackIndex:
+    """Cached view of the stack directories under a root.
+
+    For every directory the index records its mtime, its subdirectories,
+    which compose file it holds and the patterns of its ignore files.
+    Adding, removing or renaming an entry changes the mtime of its parent
+    directory, so a directory whose mtime (and ignore files' mtimes) is
+    unchanged can be trusted without listing it again. Revalidation
+    therefore costs one stat per directory; only changed directories are
+    re-scanned.
+
+    Hidden directories, directories matched by .gitignore/.gamignore
+    patterns and directories deeper than max_depth are never descended
+    into, so container data under a stack is not walked at all.
+    """
+
+    def __init__(self, root_dir: Path, max_depth: int | None = None):
+        self.root_dir = Path(root_dir)
+        self.max_depth = max_depth
+        self.path = cache_path(self.root_dir, INDEX_FILE)
+        self.dirs: dict[str, dict] = {}
+        self.changed = False
+
+    def load(self) -> bool:
+        """Load the index from disk. Returns False if there was none."""
+        data = load_json(self.path)
+        if (
+            data is None
+            or data.get('version') != INDEX_VERSION
+            or data.get('root') != str(self.root_dir)
+        ):
+            self.dirs = {}
+            return False
+        self.dirs = data.get('dirs', {})
+        return True
+
+    def save(self) -> bool:
+        """Write the index to disk if it changed since it was loaded."""
+        if not self.changed:
+            return True
+        root = self.dirs.get("")
+        if root and root['mtime'] != -1 and not self.path.parent.exists():
+            # Creating the cache directory touches the root, which would
+            # otherwise force a re-scan of it on the next run.
+            try:
+                unchanged = os.stat(self.root_dir).st_mtime_ns == root['mtime']
+                self.path.parent.mkdir(exist_ok=True)
+                if unchanged:
+                    root['mtime'] = os.stat(self.root_dir).st_mtime_ns
+            except OSError:
+                pass
+        saved = save_json(self.path, {
+            'version': INDEX_VERSION,
+            'root': str(self.root_dir),
+            'dirs': self.dirs,
+        })
+        self.changed = not saved
+        return saved
+
+    def refresh(self) -> list[Path]:
+        """Revalidate against the filesystem and return stack directories."""
+        dirs = {}
+        pending = [("", 0, [])]
+        while pending:
+            rel, depth, rules = pending.pop()
+            full = os.path.join(self.root_dir, rel)
+            try:
+                mtime = os.stat(full).st_mtime_ns
+            except OSError:
+                continue
+
+            entry = self.dirs.get(rel)
+            if (
+                entry is None
+                or entry['mtime'] != mtime
+                or self._ignores_changed(full, entry)
+            ):
+                try:
+                    entry = self._scan(full, mtime)
+                except OSError:
+                    # Unreadable, or no longer a directory
+                    continue
+                self.changed = True
+            dirs[rel] = entry
+
+            if self.max_depth is not None and depth >= self.max_depth:
+                continue
+            if entry['patterns']:
+                rules = rules + [IgnoreRules(rel, entry['patterns'])]
+            for child in entry['dirs']:
+                child_rel = os.path.join(rel, child)
+                if not is_ignored(rules, child_rel):
+                    pending.append((child_rel, depth + 1, rules))
+
+        if dirs.keys() != self.dirs.keys():
+            self.changed = True
+        self.dirs = dirs
+        return self.stack_dirs()
+
+    def rebuild(self) -> list[Path]:
+        """Forget everything and scan the whole tree again."""
+        self.dirs = {}
+        self.changed = True
+        return self.refresh()
+
+    def lookup(self, name: str) -> Path | None:
+        """Find the directory of one stack without walking the tree.
+
+        Stack names join path components with '-', but components may
+        contain dashes too, so each split is tried; components that don't
+        exist prune the search. Hidden, ignored and too-deep directories
+        are excluded just as in refresh(), and so is anything outside the
+        root: names holding a path separator or '..' never match.
+        """
+        if (
+            not name
+            or os.path.isabs(name)
+            or os.sep in name
+            or (os.altsep and os.altsep in name)
+        ):
+            return None
+        parts = name.split('-')
+
+        def search(rel: str, i: int, depth: int, rules: list) -> str | None:
+            full = os.path.join(self.root_dir, rel)
+            if i == len(parts):
+                has_compose = any(
+                    os.path.isfile(os.path.join(full, n))
+                    for n in COMPOSE_FILES
+                )
+                return rel if has_compose else None
+            if self.max_depth is not None and depth >= self.max_depth:
+                return None
+
+            patterns = self._read_ignores(full, IGNORE_FILES)
+            if patterns:
+                rules = rules + [IgnoreRules(rel, patterns)]
+            for j in range(i + 1, len(parts) + 1):
+                child = '-'.join(parts[i:j])
+                child_rel = os.path.join(rel, child)
+                if (
+                    not child
+                    or child.startswith('.')
+                    or os.path.islink(os.path.join(full, child))
+                    or not os.path.isdir(os.path.join(full, child))
+                    or is_ignored(rules, child_rel)
+                ):
+                    continue
+                found = search(child_rel, j, depth + 1, rules)
+                if found is not None:
+                    return found
+            return None
+
+        found = search("", 0, 0, [])
+        if not found:
+            return None
+        path = self.root_dir / found
+        root = os.path.realpath(self.root_dir)
+        if os.path.commonpath([root, os.path.realpath(path)]) != root:
+            return None
+        return path
+
+    def stack_dirs(self) -> list[Path]:
+        """Return indexed directories holding a compose file."""
+        return [
+            self.root_dir / rel if rel else self.root_dir
+            for rel, entry in sorted(self.dirs.items())
+            if entry['compose']
+        ]
+
+    @staticmethod
+    def _ignores_changed(full: str, entry: dict) -> bool:
+        """Check whether an ignore file was edited in place."""
+        for name, mtime in entry['ignores'].items():
+            try:
+                if os.stat(os.path.join(full, name)).st_mtime_ns != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    @staticmethod
+    def _read_ignores(full: str, names) -> list[str]:
+        """Read the patterns of a directory's ignore files, in order."""
+        patterns = []
+        for name in IGNORE_FILES:
+            if name not in names:
+                continue
+            try:
+                with open(os.path.join(full, name), errors='replace') as f:
+                    patterns.extend(parse_patterns(f.read()))
+            except OSError:
+                pass
+        return patterns
+
+    @staticmethod
+    def _scan(full: str, mtime: int) -> dict:
+        """List one directory and read its ignore files."""
+        now = time.time_ns()
+        subdirs = []
+        compose = set()
+        ignores = {}
+        with os.scandir(full) as entries:
+            for entry in entries:
+                if entry.name in COMPOSE_FILES:
+                    if entry.is_file():
+                        compose.add(entry.name)
+                elif entry.name in IGNORE_FILES:
+                    if entry.is_file():
+                        ignores[entry.name] = entry.stat().st_mtime_ns
+                elif (
+                    not entry.name.startswith('.')
+                    and entry.is_dir(follow_symlinks=False)
+                ):
+                    subdirs.append(entry.name)
+
+        patterns = StackIndex._read_ignores(full, ignores)
+        for name, ignore_mtime in ignores.items():
+            if now - ignore_mtime < _RACY_WINDOW_NS:
+                ignores[name] = -1
+
+        if now - mtime < _RACY_WINDOW_NS:
+            # Modified just now: force a re-scan next time.
+            mtime = -1
+        return {
+            'mtime': mtime,
+            'dirs': sorted(subdirs),
+            'compose': next((n for n in COMPOSE_FILES if n in compose), None),
+            'ignores': ignores,
+            'patterns': patterns,
+        }
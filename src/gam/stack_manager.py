@@ -1,71 +1,401 @@
+import json
 import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Callable, Iterator
+
+from gam.defaults import DEFAULT_STATUS_TTL
+from gam.engine import EngineError, get_engine
+from gam.metadata_index import MetadataIndex
+from gam.search_index import SearchIndex
+from gam.selector import Selector
+from gam.stack import (
+    COMPOSE_ONEOFF_LABEL,
+    COMPOSE_PROJECT_LABEL,
+    COMPOSE_WORKING_DIR_LABEL,
+    Stack,
+    summarize_containers,
+)
+from gam.stack_index import StackIndex
+from gam.state_tracker import StateTracker
+from gam.status_cache import StatusCache
+from gam.transaction import MetadataTransaction
+
+# Threads reading metadata files during discovery; below the threshold a
+# pool costs more than it saves.
+LOAD_WORKERS = 8
+_PARALLEL_LOAD_MIN = 16
+
+
+def _parse_labels(labels) -> dict[str, str]:
+    """Normalize container labels to a dict.
+
+    `docker ps --format` renders labels as a comma-separated 'k=v' string,
+    while the Engine API returns them as a mapping.
+    """
+    if isinstance(labels, dict):
+        return labels
+    parsed = {}
+    for item in (labels or "").split(','):
+        key, sep, value = item.partition('=')
+        if sep:
+            parsed[key] = value
+    return parsed
+
+
+def _list_compose_containers() -> list[dict]:
+    """List all compose-managed containers (running or not) in one call.
+
+    Uses the Engine API when reachable and `docker ps` otherwise.
+    """
+    try:
+        return get_engine().containers(
+            all=True, filters={'label': [COMPOSE_PROJECT_LABEL]}
+        )
+    except EngineError:
+        pass
+
+    try:
+        result = subprocess.run(
+            ["docker", "ps", "-a", "--no-trunc",
+             "--filter", f"label={COMPOSE_PROJECT_LABEL}",
+             "--format", "{{json .}}"],
+            capture_output=True,
+            text=True,
+            check=True
+        )
+    except subprocess.CalledProcessError:
+        return []
+    return [
+        json.loads(line) for line in result.stdout.splitlines() if line.strip()
+    ]
 
-from gam.stack import Stack
 
 class StackManager:
     """Manages all Docker Compose stacks."""
 
-    def __init__(self, root_dir: Path = Path.cwd()):
+    # Class-level defaults: managers built without __init__ don't cache.
+    status_cache: StatusCache | None = None
+    # Set by long-running processes that follow docker events.
+    state_tracker: StateTracker | None = None
+
+    def __init__(
+        self,
+        root_dir: Path = Path.cwd(),
+        max_depth: int | None = None,
+        status_ttl: float = DEFAULT_STATUS_TTL
+    ):
         self.root_dir = root_dir
-        self.stacks: dict[str, Stack] = {}
-        self.discover_stacks()
+        self.index = StackIndex(root_dir, max_depth)
+        if status_ttl > 0:
+            self.status_cache = StatusCache(root_dir, status_ttl)
+        self._stacks: dict[str, Stack] | None = None
+        self._resolved: dict[str, Stack] = {}
+        self._metadata_index: MetadataIndex | None = None
+        self._search_index: SearchIndex | None = None
+        # Metadata file (mtime, size) per stack directory, for refresh().
+        self._meta_files: dict[Path, tuple | None] = {}
+
+    @property
+    def stacks(self) -> dict[str, Stack]:
+        """All stacks by name, discovered on first access."""
+        if self._stacks is None:
+            self.discover_stacks()
+        return self._stacks
+
+    @stacks.setter
+    def stacks(self, stacks: dict[str, Stack]) -> None:
+        self._stacks = stacks
+        self._metadata_index = None
+        self._search_index = None
+
+    @property
+    def metadata_index(self) -> MetadataIndex:
+        """Tag, category and owner indexes, built on first use.
+
+        Built from every stack's metadata; the mutating methods below keep
+        it current.
+        """
+        if self._metadata_index is None:
+            self.load_metadata()
+            self._metadata_index = MetadataIndex(self.stacks.values())
+        return self._metadata_index
+
+    @property
+    def search_index(self) -> SearchIndex:
+        """Full-text index of stack metadata, revalidated on first use.
+
+        Only stacks whose metadata file changed since the index was saved
+        are read again.
+        """
+        if self._search_index is None:
+            index = SearchIndex(self.root_dir)
+            index.load()
+            index.refresh(self.stacks.values(), self.load_metadata)
+            index.save()
+            self._search_index = index
+        return self._search_index
+
+    def _named(self, names) -> list[Stack]:
+        """Return the stacks with the given names, sorted by name."""
+        return [self.stacks[name] for name in sorted(names)]
 
     def discover_stacks(self) -> None:
-        """Find all docker-compose.yml files and load metadata."""
-        for compose_file in self.root_dir.rglob("docker-compose.yml"):
-            stack_path = compose_file.parent
-            # Skip if in hidden directory
-            if any(part.startswith('.') for part in stack_path.parts):
-                continue
+        """Find all compose files and create their stacks.
 
-            # Derive stack name from path
-            rel_path = stack_path.relative_to(self.root_dir)
-            stack_name = str(rel_path).replace(os.sep, '-')
+        Directories come from the on-disk stack index, which only re-scans
+        the parts of the tree that changed since the last run.
+        """
+        if self._stacks is None:
+            self._stacks = {}
+        self.index.load()
+        stack_paths = self.index.refresh()
+        self.index.save()
+        self._load_stacks(stack_paths)
+        self._metadata_index = None
+        self._search_index = None
 
-            # Create and load stack
-            stack = Stack(name=stack_name, path=stack_path)
-            stack.load_metadata()
+    def rebuild_index(self) -> int:
+        """Rescan the whole tree and rewrite the stack index.
 
+        Returns the number of stacks found.
+        """
+        stack_paths = self.index.rebuild()
+        self.index.save()
+        self.stacks = {}
+        self._load_stacks(stack_paths)
+        return len(self.stacks)
+
+    def _load_stacks(self, stack_paths: list[Path]) -> None:
+        """Create lazy stacks for the given directories.
+
+        Metadata is read when a stack is first used, or for many stacks at
+        once by load_metadata().
+        """
+        for stack_path in stack_paths:
+            stack_name = self._stack_name(stack_path)
+            stack = self._resolved.pop(stack_name, None)
+            if stack is None or stack.path != stack_path:
+                stack = Stack.lazy(stack_name, stack_path)
             self.stacks[stack_name] = stack
 
+    def _stack_name(self, stack_path: Path) -> str:
+        """Derive a stack's name from its path below the root."""
+        rel_path = stack_path.relative_to(self.root_dir)
+        return str(rel_path).replace(os.sep, '-')
+
+    def refresh(self) -> bool:
+        """Catch a long-lived manager up with changes on disk.
+
+        Stack directories are revalidated through the stack index, and
+        stacks whose metadata file changed since the last refresh are
+        replaced by fresh lazy stacks. Returns whether anything changed.
+        """
+        if self._stacks is None:
+            self.index.load()
+        self.index.refresh()
+        self.index.save()
+        files = {}
+        for stack_path in self.index.stack_dirs():
+            try:
+                st = os.stat(stack_path / ".stack-meta.yaml")
+                files[stack_path] = (st.st_mtime_ns, st.st_size)
+            except OSError:
+                files[stack_path] = None
+        if self._stacks is not None and files == self._meta_files:
+            return False
+
+        current = {str(s.path): s for s in (self._stacks or {}).values()}
+        stacks = {}
+        for stack_path, signature in files.items():
+            stack = current.get(str(stack_path))
+            if stack is None or self._meta_files.get(stack_path) != signature:
+                stack = Stack.lazy(self._stack_name(stack_path), stack_path)
+            stacks[stack.name] = stack
+        self.stacks = stacks
+        self._meta_files = files
+        return True
+
+    def load_metadata(self, stacks: list[Stack] | None = None) -> None:
+        """Materialise metadata for the given (default: all) stacks.
+
+        Metadata files are read and parsed by a thread pool, which mostly
+        overlaps the file I/O (many small reads, often on cold caches).
+        """
+        if stacks is None:
+            stacks = self.stacks.values()
+        pending = [s for s in stacks if not s.meta_loaded]
+
+        if len(pending) < _PARALLEL_LOAD_MIN:
+            for stack in pending:
+                stack.load_metadata()
+        else:
+            with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as pool:
+                # Consume the results so the first error is raised here.
+                list(pool.map(Stack.load_metadata, pending))
+
     def list_stacks(
         self,
         category: str | None = None,
-        tag: str | None = None
+        tag: str | None = None,
+        selector: Selector | None = None
     ) -> list[Stack]:
         """List stacks with optional filtering."""
-        stacks = list(self.stacks.values())
+        if category or tag or selector:
+            index = self.metadata_index
+            names = selector.match(self) if selector else set(self.stacks)
+            if category:
+                names &= index.categories.get(category, set())
+            if tag:
+                names &= index.tags.get(tag, set())
+            stacks = self._named(names)
+        else:
+            self.load_metadata()
+            stacks = list(self.stacks.values())
 
-        if category:
-            stacks = [s for s in stacks if s.category == category]
+        return sorted(stacks, key=lambda s: (s.priority, s.category, s.name))
 
-        if tag:
-            stacks = [s for s in stacks if tag in s.tags]
+    def select(self, selector: Selector | str) -> list[Stack]:
+        """Get the stacks matching a selector expression, by name.
 
-        return sorted(stacks, key=lambda s: (s.priority, s.category, s.name))
+        Raises SelectorError if given an expression that doesn't parse.
+        """
+        if isinstance(selector, str):
+            selector = Selector(selector)
+        return self._named(selector.match(self))
 
     def get_stack(self, name: str) -> Stack | None:
-        """Get stack by name."""
-        return self.stacks.get(name)
+        """Get stack by name.
+
+        Before discovery has run, the stack is resolved from its name's
+        path alone, so single-stack commands don't walk the whole tree.
+        """
+        if self._stacks is not None:
+            return self._stacks.get(name)
+        if name not in self._resolved:
+            path = self.index.lookup(name)
+            if path is None:
+                return None
+            self._resolved[name] = Stack.lazy(name, path)
+        return self._resolved[name]
+
+    def get_statuses(
+        self,
+        stacks: list[Stack] | None = None
+    ) -> dict[str, dict]:
+        """Get running status for many stacks with a single docker call.
+
+        Containers are matched to stacks by their compose working directory
+        label, falling back to the compose project name. Returns a dict
+        mapping stack name to the same shape as Stack.get_status().
+
+        With a live state tracker statuses come from memory. Otherwise
+        statuses read by a recent gam run are reused from the status
+        cache, and docker is only asked about the rest.
+        """
+        if stacks is None:
+            stacks = list(self.stacks.values())
+        tracker = self.state_tracker
+        if tracker is not None and tracker.live:
+            return tracker.statuses(
+                self.container_matcher(stacks), [s.name for s in stacks]
+            )
+        if self.status_cache is None:
+            return self._query_statuses(stacks)
+
+        statuses = self.status_cache.get(s.name for s in stacks)
+        missing = [s for s in stacks if s.name not in statuses]
+        if missing:
+            queried = self._query_statuses(missing)
+            self.status_cache.put(queried)
+            statuses.update(queried)
+        return {stack.name: statuses[stack.name] for stack in stacks}
+
+    @contextmanager
+    def changing_state(self, stacks: list[Stack]) -> Iterator[None]:
+        """Wrap starting or stopping stacks, forgetting their cached
+        statuses afterwards (even if interrupted)."""
+        try:
+            yield
+        finally:
+            if self.status_cache is not None:
+                self.status_cache.invalidate(s.name for s in stacks)
+
+    def container_matcher(
+        self,
+        stacks: list[Stack] | None = None
+    ) -> Callable[[dict | str], str | None]:
+        """Build a function naming the stack a container belongs to.
+
+        It takes the container's labels and returns None for one-off
+        containers and containers of other stacks.
+        """
+        if stacks is None:
+            stacks = list(self.stacks.values())
+        by_dir = {}
+        by_project = {}
+        for stack in stacks:
+            by_dir[str(stack.path)] = stack.name
+            by_dir[os.path.realpath(stack.path)] = stack.name
+            # Project names are only usable when they identify one stack.
+            project = stack.project_name
+            by_project[project] = (
+                None if project in by_project else stack.name
+            )
+
+        def match(labels: dict | str) -> str | None:
+            labels = _parse_labels(labels)
+            if labels.get(COMPOSE_ONEOFF_LABEL) == 'True':
+                return None
+            working_dir = labels.get(COMPOSE_WORKING_DIR_LABEL)
+            if working_dir:
+                return (by_dir.get(working_dir)
+                        or by_dir.get(os.path.realpath(working_dir)))
+            return by_project.get(labels.get(COMPOSE_PROJECT_LABEL))
+
+        return match
+
+    def _query_statuses(self, stacks: list[Stack]) -> dict[str, dict]:
+        """Ask docker for the status of the given stacks."""
+        match = self.container_matcher(stacks)
+        buckets = {stack.name: [] for stack in stacks}
+        for container in _list_compose_containers():
+            name = match(container.get('Labels'))
+            if name is not None:
+                buckets[name].append(container)
+
+        return {
+            name: summarize_containers(containers)
+            for name, containers in buckets.items()
+        }
 
     def get_category_stacks(self, category: str) -> list[Stack]:
         """Get all stacks in a category."""
-        return [s for s in self.stacks.values() if s.category == category]
+        return self._named(self.metadata_index.categories.get(category, ()))
+
+    def get_tag_stacks(self, tag: str) -> list[Stack]:
+        """Get all stacks with a tag."""
+        return self._named(self.metadata_index.tags.get(tag, ()))
+
+    def get_owner_stacks(self, owner: str) -> list[Stack]:
+        """Get all stacks owned by someone."""
+        return self._named(self.metadata_index.owners.get(owner, ()))
 
     def search(self, term: str) -> list[Stack]:
-        """Search stacks by name, description, and tags."""
-        term_lower = term.lower()
-        results = []
-        for stack in self.stacks.values():
-            if (term_lower in stack.name.lower() or
-                term_lower in stack.description.lower() or
-                any(term_lower in tag.lower() for tag in stack.tags)):
-                results.append(stack)
-        return results
+        """Search stack metadata, returning the best matches first.
+
+        Words of the term also match words they start, and similarly
+        spelled words; see gam.search_index.
+        """
+        return [
+            self.stacks[name] for name, _ in self.search_index.search(term)
+        ]
 
     def get_autostart_stacks(self) -> list[Stack]:
         """Get stacks with auto_start=true, sorted by priority."""
+        self.load_metadata()
         stacks = [s for s in self.stacks.values() if s.auto_start]
         return sorted(stacks, key=lambda s: s.priority)
 
@@ -82,39 +412,98 @@ class StackManager:
 
     def get_all_tags(self) -> list[str]:
         """Get all unique tags across all stacks."""
-        tags = set()
-        for stack in self.stacks.values():
-            tags.update(stack.tags)
-        return sorted(tags)
+        return sorted(self.metadata_index.tags)
+
+    def get_tag_counts(self) -> dict[str, int]:
+        """Count the stacks using each tag."""
+        return {
+            tag: len(names) for tag, names in self.metadata_index.tags.items()
+        }
 
     def get_all_categories(self) -> list[tuple]:
         """Get all unique categories (category, subcategory) tuples."""
-        categories = set()
-        for stack in self.stacks.values():
-            categories.add((stack.category, stack.subcategory))
-        return sorted(categories)
+        return sorted(self.metadata_index.subcategories)
+
+    def get_category_counts(self) -> dict[tuple, int]:
+        """Count the stacks in each (category, subcategory)."""
+        return {
+            key: len(names)
+            for key, names in self.metadata_index.subcategories.items()
+        }
+
+    def _reindex(self, stack: Stack) -> None:
+        """Update the indexes after a stack's metadata changed."""
+        if self._metadata_index is not None:
+            self._metadata_index.update(stack)
+        if self._search_index is not None:
+            self._search_index.update(stack)
+
+    def add_tags(self, stack: Stack, tags: list[str]) -> list[str]:
+        """Add tags to a stack and save it. Returns the tags added."""
+        added = []
+        for tag in tags:
+            if tag not in stack.tags:
+                stack.tags.append(tag)
+                added.append(tag)
+        if added:
+            stack.save_metadata()
+            self._reindex(stack)
+        return added
+
+    def remove_tags(self, stack: Stack, tags: list[str]) -> list[str]:
+        """Remove tags from a stack and save it. Returns the tags removed."""
+        removed = []
+        for tag in tags:
+            if tag in stack.tags:
+                stack.tags.remove(tag)
+                removed.append(tag)
+        if removed:
+            stack.save_metadata()
+            self._reindex(stack)
+        return removed
+
+    def set_category(
+        self,
+        stack: Stack,
+        category: str,
+        subcategory: str = ""
+    ) -> None:
+        """Move a stack to another category and save it."""
+        stack.category = category
+        stack.subcategory = subcategory
+        stack.save_metadata()
+        self._reindex(stack)
 
     def rename_tag(self, old_tag: str, new_tag: str) -> int:
-        """Rename a tag across all stacks. Returns count of affected stacks."""
-        count = 0
-        for stack in self.stacks.values():
-            if old_tag in stack.tags:
-                stack.tags.remove(old_tag)
-                if new_tag not in stack.tags:
-                    stack.tags.append(new_tag)
-                stack.save_metadata()
-                count += 1
-        return count
+        """Rename a tag across all stacks. Returns count of affected stacks.
+
+        All stacks are saved in one transaction: if any file can't be
+        written, none are changed and TransactionError is raised.
+        """
+        stacks = self.get_tag_stacks(old_tag)
+        with MetadataTransaction() as txn:
+            for stack in stacks:
+                txn.stage(stack)
+                # In place, so the file's entry keeps its position.
+                if new_tag in stack.tags:
+                    stack.tags.remove(old_tag)
+                else:
+                    stack.tags[stack.tags.index(old_tag)] = new_tag
+        for stack in stacks:
+            self._reindex(stack)
+        return len(stacks)
 
     def rename_category(self, old_category: str, new_category: str) -> int:
         """Rename a category across all stacks.
 
-        Returns count of affected stacks.
+        Returns count of affected stacks. Like rename_tag, this saves all
+        stacks or none.
         """
-        count = 0
-        for stack in self.stacks.values():
-            if stack.category == old_category:
+        stacks = self.get_category_stacks(old_category)
+        with MetadataTransaction() as txn:
+            for stack in stacks:
+                txn.stage(stack)
                 stack.category = new_category
-                stack.save_metadata()
-                count += 1
-        return count
+        for stack in stacks:
+            self._reindex(stack)
+        return len(stacks)
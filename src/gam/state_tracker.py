@@ -0,0 +1,157 @@
+"""Container states kept current from the Docker events stream.
+
+Instead of asking docker about every stack each time a status is needed,
+a StateTracker lists compose containers once and then applies container
+events (start, die, health_status, ...) to its copy as they arrive.
+Statuses are summarised from that copy in memory, with the same counts
+polling gives. Long-running gam processes, `gam daemon` and `gam status
+--watch`, keep one following the stream.
+"""
+
+import threading
+import time
+from typing import Callable, Iterable
+
+from gam.engine import Engine, EngineError
+from gam.stack import (
+    COMPOSE_PROJECT_LABEL,
+    container_health,
+    summarize_containers,
+)
+
+# Seconds between attempts to (re)connect to the events stream.
+RECONNECT_DELAY = 5.0
+
+EVENT_FILTERS = {'type': ['container'], 'label': [COMPOSE_PROJECT_LABEL]}
+
+# The state a container is in after each event that changes it.
+EVENT_STATES = {
+    'create': 'created',
+    'start': 'running',
+    'restart': 'running',
+    'unpause': 'running',
+    'pause': 'paused',
+    'die': 'exited',
+}
+
+
+class StateTracker:
+    """In-memory states of compose containers, by container id.
+
+    `live` is True while the tracked states follow the events stream;
+    otherwise they may be out of date and callers should ask docker. It
+    may be used from several threads.
+    """
+
+    def __init__(self):
+        self.live = False
+        self._containers: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def reset(self, containers: Iterable[dict]) -> None:
+        """Replace the tracked states with a container listing."""
+        states = {
+            c['Id']: {
+                'Labels': c.get('Labels') or {},
+                'State': c.get('State'),
+                'Health': container_health(c),
+            }
+            for c in containers
+        }
+        with self._lock:
+            self._containers = states
+
+    def apply(self, event: dict) -> bool:
+        """Update the tracked states from one container event.
+
+        Returns whether a container's state or health changed.
+        """
+        actor = event.get('Actor') or {}
+        container_id = actor.get('ID') or event.get('id')
+        # Health events look like "health_status: unhealthy".
+        action, _, detail = (event.get('Action') or "").partition(':')
+        if not container_id or event.get('Type', 'container') != 'container':
+            return False
+
+        with self._lock:
+            if action == 'destroy':
+                return self._containers.pop(container_id, None) is not None
+            if action == 'health_status':
+                state, health = None, detail.strip() or None
+            elif action in EVENT_STATES:
+                # A (re)started container's health check starts over.
+                state, health = EVENT_STATES[action], None
+            else:
+                return False
+
+            container = self._containers.get(container_id)
+            if container is None:
+                # Seen for the first time; only running ones report health.
+                container = self._containers[container_id] = {
+                    'State': 'running', 'Health': None,
+                }
+                before = None
+            else:
+                before = (container['State'], container['Health'])
+            container['Labels'] = actor.get('Attributes') or {}
+            if state is not None:
+                container['State'] = state
+            container['Health'] = health
+            return (container['State'], container['Health']) != before
+
+    def statuses(
+        self,
+        match: Callable[[dict | str], str | None],
+        names: Iterable[str]
+    ) -> dict[str, dict]:
+        """Summarise the tracked containers of the given stacks.
+
+        `match` names the stack a container's labels belong to, see
+        StackManager.container_matcher.
+        """
+        buckets = {name: [] for name in names}
+        with self._lock:
+            containers = list(self._containers.values())
+        for container in containers:
+            name = match(container['Labels'])
+            if name in buckets:
+                buckets[name].append(container)
+        return {
+            name: summarize_containers(containers)
+            for name, containers in buckets.items()
+        }
+
+    def follow(
+        self,
+        stop: threading.Event,
+        on_change: Callable[[], None] | None = None
+    ) -> None:
+        """Track container events until `stop` is set, reconnecting as
+        needed. `on_change` is called whenever the states changed,
+        including when (re)connecting replaced them."""
+        while not stop.is_set():
+            engine = Engine()
+            connected = time.time()
+            if engine.ping():
+                try:
+                    self.reset(engine.containers(
+                        all=True, filters={'label': [COMPOSE_PROJECT_LABEL]}
+                    ))
+                    # Replaying from before the listing closes the gap
+                    # between it and the stream actually being open.
+                    self.live = True
+                    if on_change is not None:
+                        on_change()
+                    for event in engine.events(
+                        filters=EVENT_FILTERS, since=f"{connected:.9f}"
+                    ):
+                        if self.apply(event) and on_change is not None:
+                            on_change()
+                        if stop.is_set():
+                            break
+                except EngineError:
+                    pass
+                finally:
+                    self.live = False
+            engine.close()
+            stop.wait(RECONNECT_DELAY)
@@ -0,0 +1,136 @@
+"""Stack statuses shared between gam runs for a few seconds.
+
+`gam status`, `gam ls` and `gam show` run back to back (or from a shell
+prompt) would otherwise each ask docker about every stack. Statuses are
+kept in .gam/status.json with the time they were read and reused until
+they are older than the TTL. gam forgets a stack's entry whenever it
+starts, stops or restarts the stack itself.
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Iterable
+
+from gam.cache import cache_path, load_json, save_json
+
+STATUS_FILE = "status.json"
+STATUS_VERSION = 2
+
+
+class StatusCache:
+    """Per-stack statuses with the wall-clock time they were read."""
+
+    def __init__(self, root_dir: Path, ttl: float):
+        self.root_dir = Path(root_dir)
+        self.ttl = ttl
+        self.path = cache_path(self.root_dir, STATUS_FILE)
+
+    def _load(self) -> dict[str, dict]:
+        data = load_json(self.path)
+        if (
+            data is None
+            or data.get('version') != STATUS_VERSION
+            or data.get('root') != str(self.root_dir)
+        ):
+            return {}
+        return data.get('stacks', {})
+
+    def _fresh(self, entries: dict[str, dict]) -> dict[str, dict]:
+        """Drop entries older than the TTL (or from the future)."""
+        now = time.time()
+        return {
+            name: entry for name, entry in entries.items()
+            if 0 <= now - entry.get('at', 0) < self.ttl
+        }
+
+    def _save(self, entries: dict[str, dict]) -> None:
+        save_json(self.path, {
+            'version': STATUS_VERSION,
+            'root': str(self.root_dir),
+            'stacks': entries,
+        })
+
+    def get(self, names: Iterable[str]) -> dict[str, dict]:
+        """Return the statuses of the given stacks that are still fresh."""
+        entries = self._fresh(self._load())
+        return {
+            name: entries[name]['status']
+            for name in names if name in entries
+        }
+
+    def put(self, statuses: dict[str, dict]) -> None:
+        """Remember statuses just read."""
+        if not statuses:
+            return
+        now = time.time()
+        entries = self._fresh(self._load())
+        for name, status in statuses.items():
+            entries[name] = {'at': now, 'status': status}
+        self._save(entries)
+
+    def invalidate(self, names: Iterable[str]) -> None:
+        """Forget the statuses of stacks whose containers changed."""
+        names = set(names)
+        entries = self._load()
+        kept = {
+            name: entry for name, entry in self._fresh(entries).items()
+            if name not in names
+        }
+        if kept != entries:
+            self._save(kept)
+
+
+class MemoryStatusCache:
+    """Statuses kept in memory by a long-running process.
+
+    With `ttl` None entries stay valid until invalidated, for callers that
+    hear about every container change. It may be used from several
+    threads: a status read before its stack was invalidated is never
+    stored, so a slow query racing a change can't leave a stale entry.
+    """
+
+    def __init__(self, ttl: float | None = None):
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, dict]] = {}
+        # When each stack was last found missing, and last invalidated.
+        self._asked: dict[str, float] = {}
+        self._invalidated: dict[str, float] = {}
+        self._cleared = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, names: Iterable[str]) -> dict[str, dict]:
+        """Return the statuses of the given stacks that are still valid."""
+        now = time.monotonic()
+        found = {}
+        with self._lock:
+            for name in names:
+                entry = self._entries.get(name)
+                if entry and (self.ttl is None or now - entry[0] < self.ttl):
+                    found[name] = entry[1]
+                else:
+                    self._asked[name] = now
+        return found
+
+    def put(self, statuses: dict[str, dict]) -> None:
+        """Remember statuses read since get() found them missing."""
+        now = time.monotonic()
+        with self._lock:
+            for name, status in statuses.items():
+                asked = self._asked.pop(name, now)
+                changed = max(self._cleared, self._invalidated.get(name, 0))
+                if changed < asked:
+                    self._entries[name] = (now, status)
+
+    def invalidate(self, names: Iterable[str] | None = None) -> None:
+        """Forget the statuses of some stacks, or of all of them."""
+        now = time.monotonic()
+        with self._lock:
+            if names is None:
+                self._entries.clear()
+                self._invalidated.clear()
+                self._cleared = now
+                return
+            for name in names:
+                self._entries.pop(name, None)
+                self._invalidated[name] = now
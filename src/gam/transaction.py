@@ -0,0 +1,212 @@
+"""All-or-nothing writes of stack metadata files.
+
+Files are never rewritten in place: new contents go to a temporary file
+in the same directory, are fsynced and then renamed over the old file,
+so a crash leaves every file either old or new, never truncated.
+A MetadataTransaction extends that to many stacks at once.
+"""
+
+import copy
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields
+from pathlib import Path
+
+# Threads preparing files in a transaction.
+WRITE_WORKERS = 8
+
+# New files get the permissions open() would have given them.
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+
+
+class TransactionError(Exception):
+    """Raised when a metadata transaction couldn't be written.
+
+    Files already replaced are rolled back, so no stack is changed.
+    """
+
+
+def _fsync_dir(path: Path) -> None:
+    """Make a rename in a directory durable, where that is supported."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _chown(fd: int, st: os.stat_result) -> None:
+    """Give a file an owner and group, as far as we are allowed to."""
+    for uid in (st.st_uid, -1):
+        try:
+            os.fchown(fd, uid, st.st_gid)
+            return
+        except PermissionError:
+            pass
+
+
+def _write_temp(path: Path, data: bytes) -> str:
+    """Write data to a synced temporary file beside path; return its name.
+
+    The temporary file gets the mode, owner and group of the file it will
+    replace. Pass a path with symlinks resolved, see _target().
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        st = None
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            if st is None:
+                os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+            else:
+                if (st.st_uid, st.st_gid) != (os.geteuid(), os.getegid()):
+                    _chown(f.fileno(), st)
+                os.fchmod(f.fileno(), st.st_mode & 0o7777)
+            os.fsync(f.fileno())
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return tmp_path
+
+
+def _target(path: Path) -> Path:
+    """The file a write to path should replace: a symlink is kept and the
+    file it points to is replaced instead."""
+    return Path(os.path.realpath(path))
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Replace a file's contents in a single rename."""
+    path = _target(path)
+    os.replace(_write_temp(path, data), path)
+    _fsync_dir(path.parent)
+
+
+class MetadataTransaction:
+    """Stage metadata changes to many stacks and save them all or none.
+
+    Stage a stack before changing it; its values are snapshotted so they
+    can be restored if the transaction fails:
+
+        with MetadataTransaction() as txn:
+            for stack in stacks:
+                txn.stage(stack)
+                stack.category = "media"
+
+    Leaving the block commits. All files are first written to synced
+    temporary files in parallel; only when every one succeeded are they
+    renamed into place. If anything fails, replaced files get their old
+    contents back and the staged stacks their old values, and
+    TransactionError is raised. An exception inside the block discards
+    the staged changes without touching disk.
+    """
+
+    def __init__(self, workers: int = WRITE_WORKERS):
+        self.workers = workers
+        self._staged: dict[str, tuple] = {}
+
+    def __enter__(self) -> 'MetadataTransaction':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+        return False
+
+    def stage(self, stack) -> None:
+        """Add a stack to the transaction, remembering its current values."""
+        if stack.name not in self._staged:
+            snapshot = {
+                f.name: copy.deepcopy(getattr(stack, f.name))
+                for f in fields(stack) if f.name not in ('name', 'path')
+            }
+            self._staged[stack.name] = (stack, snapshot)
+
+    def rollback(self) -> None:
+        """Restore the values of every staged stack and forget them."""
+        for stack, snapshot in self._staged.values():
+            for key, value in snapshot.items():
+                setattr(stack, key, value)
+        self._staged = {}
+
+    def commit(self) -> int:
+        """Save every staged stack. Returns the number of files written,
+        which leaves out files that already held the staged values."""
+        try:
+            stacks = [stack for stack, _ in self._staged.values()]
+            written = self._write(stacks) if stacks else 0
+        except BaseException:
+            self.rollback()
+            raise
+        self._staged = {}
+        return written
+
+    def _write(self, stacks: list) -> int:
+        """Prepare every file in parallel, then rename them into place."""
+        workers = min(self.workers, len(stacks))
+
+        def prepare(stack):
+            path = _target(stack.meta_file)
+            try:
+                old, new = stack.pending_metadata()
+                if new == old:
+                    return None
+                return path, old, _write_temp(path, new)
+            except OSError as e:
+                return path, None, e
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            prepared = [p for p in pool.map(prepare, stacks) if p]
+
+        failed = [(p, e) for p, _, e in prepared if isinstance(e, OSError)]
+        if failed:
+            for _, _, tmp_path in prepared:
+                if not isinstance(tmp_path, OSError):
+                    os.unlink(tmp_path)
+            path, error = failed[0]
+            raise TransactionError(f"Couldn't write {path}: {error}")
+
+        replaced = []
+        try:
+            for path, old, tmp_path in prepared:
+                os.replace(tmp_path, path)
+                replaced.append((path, old))
+        except OSError as e:
+            self._restore(replaced)
+            for _, _, tmp_path in prepared[len(replaced):]:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+            raise TransactionError(
+                f"Couldn't replace {prepared[len(replaced)][0]}: {e}"
+            ) from None
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(_fsync_dir, {path.parent for path, _ in replaced}))
+        return len(replaced)
+
+    @staticmethod
+    def _restore(replaced: list[tuple[Path, bytes | None]]) -> None:
+        """Put back the old contents of files already replaced."""
+        for path, old in reversed(replaced):
+            try:
+                if old is None:
+                    os.unlink(path)
+                else:
+                    write_atomic(path, old)
+            except OSError:
+                pass
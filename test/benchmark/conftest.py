@@ -0,0 +1,46 @@
+"""Fixtures for benchmarks.
+
+Benchmarks are slow, so they only run when selected explicitly:
+
+    pytest -m benchmark --no-cov
+"""
+
+import time
+
+import pytest
+
+RESULTS: list[tuple[str, str]] = []
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip benchmarks unless they were selected with -m benchmark."""
+    if 'benchmark' in (config.getoption('-m') or ''):
+        return
+    skip = pytest.mark.skip(reason="run with -m benchmark")
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print collected timings after the run."""
+    if not RESULTS:
+        return
+    terminalreporter.section("benchmark results")
+    width = max(len(label) for label, _ in RESULTS)
+    for label, value in RESULTS:
+        terminalreporter.write_line(f"{label:<{width}}  {value}")
+
+
+def best_of(fn, repeat=3) -> float:
+    """Best wall-clock time of several runs, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def record(label: str, value: str) -> None:
+    RESULTS.append((label, value))
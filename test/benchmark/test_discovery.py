@@ -0,0 +1,78 @@
+"""Benchmark stack discovery and metadata loading."""
+
+import shutil
+
+import pytest
+import yaml
+
+from gam.stack_manager import StackManager
+
+from .conftest import best_of, record
+
+META = """\
+description: "Synthetic stack {i}"
+category: {category}
+subcategory: group-{group}
+tags: [bench, tier-{tier}, production]
+auto_start: {auto_start}
+priority: {priority}
+depends_on:
+  - {category}-stack-0
+expected_containers: 3
+owner: team-{group}
+documentation: https://wiki.example.com/stacks/{i}
+"""
+
+CATEGORIES = ["data", "media", "web", "monitoring"]
+
+
+def make_tree(root, count):
+    """Create count stacks spread over category directories."""
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        path = root / category / f"stack-{i}"
+        path.mkdir(parents=True)
+        (path / "docker-compose.yml").write_text("services: {}\n")
+        (path / ".stack-meta.yaml").write_text(META.format(
+            i=i, category=category, group=i % 7, tier=i % 3,
+            auto_start=str(i % 2 == 0).lower(), priority=i % 5 + 1,
+        ))
+
+
+def load_sequential_pure(root):
+    """The old approach: every file parsed in turn with the Python parser."""
+    for meta_file in sorted(root.rglob(".stack-meta.yaml")):
+        with open(meta_file) as f:
+            yaml.safe_load(f)
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("count", [10, 100, 1000])
+def test_discovery(tmp_path, count):
+    """Time cold and warm discovery against a pure-Python baseline."""
+    make_tree(tmp_path, count)
+
+    baseline = best_of(lambda: load_sequential_pure(tmp_path))
+
+    def cold():
+        shutil.rmtree(tmp_path / ".gam", ignore_errors=True)
+        StackManager(root_dir=tmp_path).load_metadata()
+
+    def single():
+        manager = StackManager(root_dir=tmp_path)
+        assert manager.get_stack("data-stack-0").category == "data"
+
+    cold_time = best_of(cold)
+    warm_time = best_of(
+        lambda: StackManager(root_dir=tmp_path).load_metadata()
+    )
+    single_time = best_of(single)
+
+    assert len(StackManager(root_dir=tmp_path).stacks) == count
+    record(
+        f"discovery, {count:>4} stacks",
+        f"baseline parse {baseline * 1000:8.1f} ms   "
+        f"cold {cold_time * 1000:8.1f} ms   "
+        f"warm {warm_time * 1000:8.1f} ms   "
+        f"one stack {single_time * 1000:6.1f} ms",
+    )
@@ -0,0 +1,114 @@
+"""Benchmark log streaming throughput."""
+
+import asyncio
+import os
+import sys
+
+import pytest
+
+from gam.logstream import (
+    LogStream,
+    command_lines,
+    follow_logs,
+    merge_logs,
+    stream_logs,
+)
+
+from .conftest import best_of, record
+
+STREAMS = 8
+LINES = 50_000
+LINE = (
+    b"2024-01-01T00:00:00.000000000Z 172.18.0.1 - - \"GET /api/v1/items"
+    b" HTTP/1.1\" 200 5120 \"-\" \"curl/8.5.0\"\n"
+)
+
+# Prints the same synthetic access log line, LINES times.
+GENERATOR = (
+    "import sys; sys.stdout.buffer.write({line!r} * {count})"
+)
+
+
+def synthetic(count: int = LINES):
+    """A LogStream opener yielding `count` access log lines."""
+    async def gen():
+        for i in range(count):
+            yield LINE
+            if i % 256 == 0:
+                # Let other streams in, as real I/O would.
+                await asyncio.sleep(0)
+    return gen
+
+
+def throughput(label: str, main, lines: int) -> None:
+    """Record lines/sec of the best of several runs."""
+    with open(os.devnull, 'wb') as out:
+        seconds = best_of(lambda: asyncio.run(main(out)))
+    record(label, f"{lines / seconds:12,.0f} lines/s")
+
+
+def text_baseline(out) -> None:
+    """What per-line decoding, formatting and printing costs."""
+    for _ in range(STREAMS):
+        for _ in range(LINES):
+            print(f"[stack] {LINE.decode()}", end='', file=out, flush=True)
+
+
+@pytest.mark.benchmark
+def test_print_per_line():
+    """Time decoding and printing every line on its own."""
+    with open(os.devnull, 'w') as out:
+        seconds = best_of(lambda: text_baseline(out))
+    record("print per line", f"{STREAMS * LINES / seconds:12,.0f} lines/s")
+
+
+@pytest.mark.benchmark
+def test_stream_logs():
+    """Time historical streaming of several synthetic streams."""
+    def main(out):
+        streams = [
+            LogStream(f"[stack-{i}] ", synthetic()) for i in range(STREAMS)
+        ]
+        return stream_logs(streams, out, jobs=STREAMS)
+
+    throughput("stream_logs", main, STREAMS * LINES)
+
+
+@pytest.mark.benchmark
+def test_follow_logs():
+    """Time following several synthetic streams."""
+    def main(out):
+        streams = [
+            LogStream(f"[stack-{i}] ", synthetic(), f"stack-{i}")
+            for i in range(STREAMS)
+        ]
+        return follow_logs(streams, out)
+
+    throughput("follow_logs", main, STREAMS * LINES)
+
+
+@pytest.mark.benchmark
+def test_merge_logs():
+    """Time merging several synthetic streams by timestamp."""
+    def main(out):
+        streams = [
+            LogStream(f"[stack-{i}] ", synthetic()) for i in range(STREAMS)
+        ]
+        return merge_logs(streams, out)
+
+    throughput("merge_logs", main, STREAMS * LINES)
+
+
+@pytest.mark.benchmark
+def test_command_pipes(tmp_path):
+    """Time reading generator processes' output through pipes."""
+    cmd = [sys.executable, "-c", GENERATOR.format(line=LINE, count=LINES)]
+
+    def main(out):
+        streams = [
+            LogStream(f"[stack-{i}] ", lambda: command_lines(cmd, tmp_path))
+            for i in range(STREAMS)
+        ]
+        return stream_logs(streams, out, jobs=STREAMS)
+
+    throughput("stream_logs from pipes", main, STREAMS * LINES)
@@ -0,0 +1,60 @@
+"""Benchmark CLI startup."""
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from .conftest import record
+from .test_discovery import make_tree
+
+SRC = Path(__file__).parent.parent.parent / "src"
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of a module, as -X importtime reports it."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={"PYTHONPATH": str(SRC)},
+    )
+    for line in result.stderr.splitlines():
+        fields = [f.strip() for f in line.split("|")]
+        if len(fields) == 3 and fields[2] == module:
+            return int(fields[1])
+    raise AssertionError(f"{module} not in importtime output")
+
+
+def cli_seconds(args: list[str], cwd: Path) -> float:
+    """Wall-clock time of one CLI run in a fresh interpreter."""
+    start = time.perf_counter()
+    subprocess.run(
+        [sys.executable, "-c", "from gam.cli import main; main()", *args],
+        capture_output=True,
+        cwd=cwd,
+        env={"PYTHONPATH": str(SRC)},
+    )
+    return time.perf_counter() - start
+
+
+@pytest.mark.benchmark
+def test_import_time():
+    """Time importing the CLI module."""
+    best = min(import_time_us("gam.cli") for _ in range(5))
+    record("import gam.cli", f"{best / 1000:8.1f} ms")
+
+
+@pytest.mark.benchmark
+def test_cli_startup(tmp_path):
+    """Time whole-tree and single-stack commands on 1000 stacks."""
+    make_tree(tmp_path, 1000)
+    # Warm the discovery index first
+    cli_seconds(["ls"], tmp_path)
+
+    for args in (["--help"], ["show", "data-stack-0"], ["ls"]):
+        best = min(cli_seconds(args, tmp_path) for _ in range(3))
+        record(f"gam {' '.join(args)} (1000 stacks)", f"{best * 1000:8.1f} ms")
@@ -64,7 +64,8 @@ def cleanup_docker(original_metadata):
 @pytest.fixture
 def manager(test_stacks_dir):
     """Create a StackManager for the test stacks directory."""
-    manager = StackManager(root_dir=test_stacks_dir)
+    # Containers change under these tests; always ask docker.
+    manager = StackManager(root_dir=test_stacks_dir, status_ttl=0)
 
     yield manager
 
@@ -72,7 +73,8 @@ def manager(test_stacks_dir):
 @pytest.fixture
 def clean_stacks(test_stacks_dir):
     """Ensure all stacks are stopped and metadata restored each test."""
-    manager = StackManager(root_dir=test_stacks_dir)
+    # Containers change under these tests; always ask docker.
+    manager = StackManager(root_dir=test_stacks_dir, status_ttl=0)
 
     # Stop all stacks
     for stack in manager.stacks.values():
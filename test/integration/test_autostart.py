@@ -7,7 +7,7 @@ from gam.commands.autostart import cmd_autostart
 
 def test_autostart_starts_configured_stacks(clean_stacks, capsys):
     """Test autostart command starts configured stacks."""
-    args = Namespace()
+    args = Namespace(jobs=4)
 
     try:
         cmd_autostart(clean_stacks, args)
@@ -33,7 +33,7 @@ def test_autostart_priority_order(clean_stacks, capsys):
     stack_a.priority = 2
 
     try:
-        args = Namespace()
+        args = Namespace(jobs=4)
         cmd_autostart(clean_stacks, args)
 
         captured = capsys.readouterr()
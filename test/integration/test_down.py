@@ -15,8 +15,10 @@ def test_down_single_stack(clean_stacks, capsys):
         all=False,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
@@ -25,7 +27,10 @@ def test_down_single_stack(clean_stacks, capsys):
         target="hello",
         all=False,
         category=None,
-        tag=None
+        tag=None,
+        select=None,
+        jobs=4,
+        timeout=None
     )
     cmd_down(clean_stacks, down_args)
 
@@ -43,13 +48,18 @@ def test_down_all_stacks(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
     # Stop all stacks
-    down_args = Namespace(target=None, all=True, category=None, tag=None)
+    down_args = Namespace(
+        target=None, all=True, category=None, tag=None, select=None,
+        jobs=4, timeout=None
+    )
     cmd_down(clean_stacks, down_args)
 
     captured = capsys.readouterr()
@@ -65,13 +75,18 @@ def test_down_by_category(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
     # Stop test category stacks
-    down_args = Namespace(target=None, all=False, category="test", tag=None)
+    down_args = Namespace(
+        target=None, all=False, category="test", tag=None, select=None,
+        jobs=4, timeout=None
+    )
     cmd_down(clean_stacks, down_args)
 
     captured = capsys.readouterr()
@@ -92,13 +107,18 @@ def test_down_by_tag(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
     # Stop stacks with dev tag
-    down_args = Namespace(target=None, all=False, category=None, tag="dev")
+    down_args = Namespace(
+        target=None, all=False, category=None, tag="dev", select=None,
+        jobs=4, timeout=None
+    )
     cmd_down(clean_stacks, down_args)
 
     captured = capsys.readouterr()
@@ -119,8 +139,10 @@ def test_down_reverse_priority(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
@@ -128,7 +150,10 @@ def test_down_reverse_priority(clean_stacks, capsys):
     capsys.readouterr()
 
     # Stop all stacks
-    down_args = Namespace(target=None, all=True, category=None, tag=None)
+    down_args = Namespace(
+        target=None, all=True, category=None, tag=None, select=None,
+        jobs=4, timeout=None
+    )
     cmd_down(clean_stacks, down_args)
 
     captured = capsys.readouterr()
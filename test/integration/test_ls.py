@@ -7,7 +7,7 @@ from gam.commands.ls import cmd_ls
 
 def test_ls_lists_all_stacks(clean_stacks, capsys):
     """Test ls command lists all test stacks."""
-    args = Namespace(category=None, tag=None)
+    args = Namespace(category=None, tag=None, select=None)
     cmd_ls(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -20,7 +20,7 @@ def test_ls_lists_all_stacks(clean_stacks, capsys):
 
 def test_ls_filter_by_category(clean_stacks, capsys):
     """Test ls command filters by category."""
-    args = Namespace(category="test", tag=None)
+    args = Namespace(category="test", tag=None, select=None)
     cmd_ls(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -33,7 +33,7 @@ def test_ls_filter_by_category(clean_stacks, capsys):
 
 def test_ls_filter_by_tag(clean_stacks, capsys):
     """Test ls command filters by tag."""
-    args = Namespace(category=None, tag="dev")
+    args = Namespace(category=None, tag="dev", select=None)
     cmd_ls(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -44,7 +44,7 @@ def test_ls_filter_by_tag(clean_stacks, capsys):
 
 def test_ls_shows_autostart_indicator(clean_stacks, capsys):
     """Test ls command shows auto-start indicator."""
-    args = Namespace(category=None, tag=None)
+    args = Namespace(category=None, tag=None, select=None)
     cmd_ls(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -14,8 +14,10 @@ def test_restart_single_stack(clean_stacks, capsys):
         all=False,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
@@ -24,7 +26,8 @@ def test_restart_single_stack(clean_stacks, capsys):
         target="hello",
         all=False,
         category=None,
-        tag=None
+        tag=None,
+        select=None
     )
 
     try:
@@ -46,13 +49,17 @@ def test_restart_all_stacks(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
     # Restart all
-    restart_args = Namespace(target=None, all=True, category=None, tag=None)
+    restart_args = Namespace(
+        target=None, all=True, category=None, tag=None, select=None
+    )
 
     try:
         cmd_restart(clean_stacks, restart_args)
@@ -73,8 +80,10 @@ def test_restart_by_category(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
@@ -83,7 +92,8 @@ def test_restart_by_category(clean_stacks, capsys):
         target=None,
         all=False,
         category="test",
-        tag=None
+        tag=None,
+        select=None
     )
 
     try:
@@ -106,8 +116,10 @@ def test_restart_by_tag(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
     cmd_up(clean_stacks, up_args)
 
@@ -116,7 +128,8 @@ def test_restart_by_tag(clean_stacks, capsys):
         target=None,
         all=False,
         category=None,
-        tag="dev"
+        tag="dev",
+        select=None
     )
 
     try:
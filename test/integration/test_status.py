@@ -7,7 +7,7 @@ from gam.commands.status import cmd_status
 
 def test_status_shows_all_stacks(clean_stacks, capsys):
     """Test status command shows all stacks."""
-    args = Namespace(category=None, tag=None)
+    args = Namespace(category=None, tag=None, select=None, watch=False)
     cmd_status(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -20,7 +20,7 @@ def test_status_shows_all_stacks(clean_stacks, capsys):
 
 def test_status_filter_by_category(clean_stacks, capsys):
     """Test status command filters by category."""
-    args = Namespace(category="test", tag=None)
+    args = Namespace(category="test", tag=None, select=None, watch=False)
     cmd_status(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -31,7 +31,7 @@ def test_status_filter_by_category(clean_stacks, capsys):
 
 def test_status_filter_by_tag(clean_stacks, capsys):
     """Test status command filters by tag."""
-    args = Namespace(category=None, tag="dev")
+    args = Namespace(category=None, tag="dev", select=None, watch=False)
     cmd_status(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -44,7 +44,7 @@ def test_status_filter_by_tag(clean_stacks, capsys):
 
 def test_status_shows_stopped_stacks(clean_stacks, capsys):
     """Test status command shows stopped stacks."""
-    args = Namespace(category=None, tag=None)
+    args = Namespace(category=None, tag=None, select=None, watch=False)
     cmd_status(clean_stacks, args)
 
     captured = capsys.readouterr()
@@ -60,7 +60,7 @@ def test_status_shows_running_stacks(clean_stacks, capsys):
     stack.up()
 
     try:
-        args = Namespace(category=None, tag=None)
+        args = Namespace(category=None, tag=None, select=None, watch=False)
         cmd_status(clean_stacks, args)
 
         captured = capsys.readouterr()
@@ -13,8 +13,10 @@ def test_up_single_stack(clean_stacks, capsys):
         all=False,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
 
     try:
@@ -35,8 +37,10 @@ def test_up_all_stacks(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
 
     try:
@@ -57,8 +61,10 @@ def test_up_by_category(clean_stacks, capsys):
         all=False,
         category="test",
         tag=None,
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
 
     try:
@@ -80,8 +86,10 @@ def test_up_by_tag(clean_stacks, capsys):
         all=False,
         category=None,
         tag="dev",
+        select=None,
         priority=False,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
 
     try:
@@ -103,8 +111,10 @@ def test_up_with_priority(clean_stacks, capsys):
         all=True,
         category=None,
         tag=None,
+        select=None,
         priority=True,
-        with_deps=False
+        with_deps=False,
+        jobs=4
     )
 
     try:
@@ -130,8 +140,10 @@ def test_up_with_dependencies(clean_stacks, capsys):
         all=False,
         category=None,
         tag=None,
+        select=None,
         priority=False,
-        with_deps=True
+        with_deps=True,
+        jobs=4
     )
 
     try:
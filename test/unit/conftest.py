@@ -5,9 +5,35 @@ from unittest.mock import MagicMock
 
 import pytest
 
+from gam import engine
+from gam.scheduler import DEFAULT_JOBS
 from gam.stack import Stack
 from gam.stack_manager import StackManager
 
+from .fake_engine import FakeEngine
+
+
+@pytest.fixture(autouse=True)
+def no_docker_engine(monkeypatch):
+    """Point the Engine API client at a socket that does not exist.
+
+    Keeps unit tests away from any real daemon; code under test falls back
+    to the (mocked) docker CLI.
+    """
+    monkeypatch.setenv("DOCKER_HOST", "unix:///nonexistent/docker.sock")
+    monkeypatch.setattr(engine, "_engine", None)
+
+
+@pytest.fixture
+def fake_engine(monkeypatch):
+    """Run a fake Docker Engine API server and point gam at it."""
+    server = FakeEngine().start()
+    monkeypatch.setenv("DOCKER_HOST", server.host)
+    monkeypatch.setattr(engine, "_engine", None)
+    yield server
+    engine.get_engine().close()
+    server.stop()
+
 
 @pytest.fixture
 def mock_stack():
@@ -73,8 +99,21 @@ def mock_args():
     args = MagicMock()
     args.category = None
     args.tag = None
+    args.select = None
     args.all = False
     args.priority = False
     args.with_deps = False
     args.target = None
+    args.jobs = DEFAULT_JOBS
+    args.timeout = None
+    args.merge = False
+    args.grep = None
+    args.ignore_case = False
+    args.level = None
+    args.rate = None
+    args.since_last = False
+    args.output_dir = None
+    args.compress = 'gzip'
+    args.max_size = None
+    args.watch = False
     return args
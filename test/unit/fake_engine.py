@@ -0,0 +1,141 @@
+"""Fake Docker Engine API server listening on a unix socket."""
+
+import json
+import os
+import socketserver
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler
+from urllib.parse import parse_qs, urlparse
+
+
+def frame(data: bytes, stream: int = 1) -> bytes:
+    """Wrap data in a multiplexed log stream frame."""
+    return bytes([stream, 0, 0, 0]) + len(data).to_bytes(4, 'big') + data
+
+
+class _Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class FakeEngine:
+    """Serve canned Engine API responses for tests.
+
+    Set `containers`, `logs` (container id -> raw body bytes) and `events`
+    (list of dicts) before issuing requests. Every request is recorded in
+    `requests` and every accepted connection is counted in `connections`.
+    """
+
+    def __init__(self):
+        self.containers: list[dict] = []
+        self.logs: dict[str, bytes] = {}
+        self.events: list[dict] = []
+        self.requests: list[tuple[str, str, dict]] = []
+        self.connections = 0
+        # Short path: unix socket paths are limited to ~108 bytes.
+        self._dir = tempfile.mkdtemp(prefix="gam-")
+        self.socket_path = os.path.join(self._dir, "docker.sock")
+        self._server = _Server(self.socket_path, self._handler())
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, args=(0.05,), daemon=True
+        )
+
+    @property
+    def host(self) -> str:
+        return f"unix://{self.socket_path}"
+
+    def start(self) -> "FakeEngine":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        os.unlink(self.socket_path)
+        os.rmdir(self._dir)
+
+    def _handler(self):
+        engine = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                engine.connections += 1
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, data, status=200):
+                self._send(
+                    status, json.dumps(data).encode(), "application/json"
+                )
+
+            def _send_chunked(self, chunks, content_type):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for chunk in chunks:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                self.wfile.write(b"0\r\n\r\n")
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                engine.requests.append(("GET", url.path, query))
+                parts = url.path.strip('/').split('/')
+
+                if url.path == "/_ping":
+                    self._send(200, b"OK", "text/plain")
+                elif url.path == "/containers/json":
+                    self._send_json(self._filter(query))
+                elif parts[0] == "containers" and parts[-1] == "json":
+                    for container in engine.containers:
+                        if container['Id'] == parts[1]:
+                            self._send_json(container)
+                            return
+                    self._send_json({"message": "No such container"}, 404)
+                elif parts[0] == "containers" and parts[-1] == "logs":
+                    if parts[1] not in engine.logs:
+                        self._send_json({"message": "No such container"}, 404)
+                        return
+                    body = engine.logs[parts[1]]
+                    # Split into small chunks to exercise reassembly.
+                    chunks = [body[i:i + 7] for i in range(0, len(body), 7)]
+                    self._send_chunked(
+                        chunks, "application/vnd.docker.multiplexed-stream"
+                    )
+                elif url.path == "/events":
+                    self._send_chunked(
+                        [json.dumps(e).encode() + b"\n"
+                         for e in engine.events],
+                        "application/json",
+                    )
+                else:
+                    self._send_json({"message": "not found"}, 404)
+
+            def _filter(self, query):
+                filters = json.loads(query.get('filters', '{}'))
+                result = []
+                for container in engine.containers:
+                    labels = container.get('Labels', {})
+                    for label in filters.get('label', []):
+                        key, sep, value = label.partition('=')
+                        if key not in labels or (
+                            sep and labels[key] != value
+                        ):
+                            break
+                    else:
+                        result.append(container)
+                return result
+
+        return Handler
@@ -0,0 +1,68 @@
+"""Tests for CLI startup."""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+SRC = Path(__file__).parent.parent.parent / "src"
+
+# Modules only a command that runs should pay for.
+HEAVY = {
+    "yaml",
+    "http.client",
+    "concurrent.futures",
+    "gam.stack_manager",
+    "gam.engine",
+    "gam.commands.up",
+}
+
+# Prints the loaded modules as the interpreter exits, however main() ends.
+RUNNER = """\
+import atexit, json, sys
+atexit.register(lambda: print(json.dumps(sorted(sys.modules)),
+                              file=sys.stderr))
+sys.argv = {argv!r}
+from gam.cli import main
+main()
+"""
+
+
+def run_cli(*args: str, cwd: Path | None = None):
+    """Run the CLI in a fresh interpreter.
+
+    Returns the completed process and the set of modules it imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", RUNNER.format(argv=["gam", *args])],
+        capture_output=True,
+        text=True,
+        cwd=cwd,
+        env={"PYTHONPATH": str(SRC)},
+    )
+    modules = set(json.loads(result.stderr.splitlines()[-1]))
+    return result, modules
+
+
+class TestStartup:
+    """Test cases for lazy CLI imports."""
+
+    @pytest.mark.parametrize("args", [
+        ["--help"], [], ["up", "--jobs", "many"],
+    ], ids=["help", "no-command", "bad-argument"])
+    def test_no_heavy_imports(self, args):
+        """Test help and argument errors don't import command code."""
+        _, modules = run_cli(*args)
+
+        assert "gam.cli" in modules
+        assert not modules & HEAVY
+
+    def test_only_dispatched_command(self, tmp_path):
+        """Test only the dispatched command's module is imported."""
+        result, modules = run_cli("tag", "ls", cwd=tmp_path)
+
+        assert result.returncode == 0
+        assert "gam.commands.tag" in modules
+        assert "gam.commands.up" not in modules
@@ -0,0 +1,156 @@
+"""Tests for the gam daemon and its client."""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from gam import client
+from gam.cli import build_parser
+from gam.daemon import Daemon, DaemonError
+from gam.stack_index import StackIndex
+from gam.stack_manager import StackManager
+from gam.status_cache import MemoryStatusCache
+
+STOPPED = {'status': 'stopped', 'containers': 0, 'running': 0}
+
+
+@pytest.fixture
+def manager(mock_manager, tmp_path):
+    """The mock manager rooted in a temporary directory."""
+    mock_manager.root_dir = tmp_path
+    mock_manager.index = StackIndex(tmp_path)
+    mock_manager.refresh = MagicMock(return_value=False)
+    return mock_manager
+
+
+@pytest.fixture
+def query():
+    """Stub out asking docker for statuses."""
+    with patch.object(
+        StackManager, '_query_statuses',
+        side_effect=lambda stacks: {s.name: STOPPED for s in stacks}
+    ) as query:
+        yield query
+
+
+@pytest.fixture
+def daemon(manager, query):
+    """A daemon serving on the temporary root, without docker events."""
+    with patch.object(Daemon, '_follow_events'):
+        daemon = Daemon(manager)
+        daemon.start()
+    thread = threading.Thread(target=daemon.serve_forever)
+    thread.start()
+    yield daemon
+    daemon.shutdown()
+    thread.join()
+
+
+class TestDaemon:
+    """Test cases for serving commands."""
+
+    def test_round_trip(self, daemon, manager, query):
+        """Test a command runs in the daemon and statuses are reused."""
+        reply = client.call(manager.root_dir, ["status"])
+
+        assert reply['code'] == 0
+        assert "test-stack" in reply['stdout']
+
+        reply = client.call(manager.root_dir, ["show", "test-stack"])
+        assert "Stack: test-stack" in reply['stdout']
+        assert query.call_count == 1
+
+    def test_exit_code(self, daemon, manager, capsys):
+        """Test a failing command's output and code are passed on."""
+        code = client.run_remote(manager.root_dir, ["show", "nope"])
+
+        assert code == 1
+        assert "Stack 'nope' not found" in capsys.readouterr().out
+
+    def test_unserved_command(self, daemon, manager):
+        """Test commands that change state are left to the client."""
+        assert client.call(manager.root_dir, ["up", "--all"]) is None
+
+    def test_already_running(self, daemon, manager):
+        """Test a second daemon for the same root refuses to start."""
+        with pytest.raises(DaemonError, match="already running"):
+            Daemon(manager).start()
+
+    def test_socket_removed(self, daemon, manager):
+        """Test the socket goes away when the daemon stops."""
+        daemon.shutdown()
+
+        assert not client.socket_path(manager.root_dir).exists()
+
+    def test_tracked_statuses(self, manager, query):
+        """Test statuses come from the tracker while it follows events."""
+        daemon = Daemon(manager)
+        daemon.tracker.reset([{
+            'Id': "a",
+            'State': "running",
+            'Labels': {
+                'com.docker.compose.project': "test-stack",
+                'com.docker.compose.project.working_dir':
+                    str(manager.stacks["test-stack"].path),
+            },
+        }])
+        daemon.tracker.live = True
+
+        statuses = manager.get_statuses()
+
+        query.assert_not_called()
+        assert statuses["test-stack"]['running'] == 1
+        assert statuses["autostart-stack"]['containers'] == 0
+
+    def test_other_options_not_served(self, daemon, manager):
+        """Test commands run with another status TTL or scan depth than
+        the daemon's are left to the client."""
+        root = manager.root_dir
+
+        assert client.call(root, ["--status-ttl", "0", "ls"]) is None
+        assert client.call(root, ["--max-depth", "1", "ls"]) is None
+        assert client.call(root, ["--status-ttl", "5", "ls"])
+
+    def test_own_status_ttl(self, manager, query, tmp_path):
+        """Test a daemon started with a status TTL serves clients using
+        the same one."""
+        daemon = Daemon(manager, path=tmp_path / "ttl.sock", status_ttl=30)
+        args = build_parser().parse_args(["--status-ttl", "30", "ls"])
+
+        assert daemon.statuses.ttl == 30
+        assert daemon._serves(args)
+        assert not daemon._serves(build_parser().parse_args(["ls"]))
+
+    def test_watch_not_served(self, daemon, manager):
+        """Test `status --watch` runs in the client, not the daemon."""
+        assert client.call(manager.root_dir, ["status", "--watch"]) is None
+
+
+class TestClient:
+    """Test cases for the client without a daemon."""
+
+    def test_no_daemon(self, tmp_path):
+        """Test the client falls back when nothing is listening."""
+        assert client.call(tmp_path, ["status"]) is None
+
+        path = client.socket_path(tmp_path)
+        path.parent.mkdir()
+        path.touch()
+        assert client.run_remote(tmp_path, ["status"]) is None
+
+
+class TestMemoryStatusCache:
+    """Test cases for MemoryStatusCache."""
+
+    def test_stale_read_not_stored(self):
+        """Test a status read before an invalidation is discarded."""
+        cache = MemoryStatusCache()
+        assert cache.get(["web"]) == {}
+
+        cache.invalidate(["web"])
+        cache.put({"web": STOPPED})
+        assert cache.get(["web"]) == {}
+
+        cache.put({"web": STOPPED})
+        assert cache.get(["web"]) == {"web": STOPPED}
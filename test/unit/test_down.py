@@ -1,6 +1,7 @@
 """Tests for down command."""
 
-from unittest.mock import MagicMock
+import subprocess
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -21,7 +22,7 @@ class TestDownCommand:
         captured = capsys.readouterr()
         assert "Stopping 1 stack(s)" in captured.out
         assert "✓" in captured.out
-        stack.down.assert_called_once()
+        stack.down.assert_called_once_with(quiet=False, timeout=None)
 
     def test_down_stack_not_found(self, mock_manager, mock_args):
         """Test down with non-existent stack."""
@@ -71,6 +72,7 @@ class TestDownCommand:
     def test_down_reverse_priority(self, mock_manager, mock_args, capsys):
         """Test stopping in reverse priority order."""
         mock_args.all = True
+        mock_args.jobs = 1
         for stack in mock_manager.stacks.values():
             stack.down = MagicMock(return_value=True)
 
@@ -81,3 +83,60 @@ class TestDownCommand:
         assert captured.out.index("test-stack") < captured.out.index(
             "autostart-stack"
         )
+
+    def test_down_dependents_first(self, mock_manager, mock_args, capsys):
+        """Test dependents are stopped before their dependencies."""
+        mock_args.all = True
+        order = []
+
+        def stopper(name):
+            def down(**kwargs):
+                order.append(name)
+                return True
+            return down
+
+        for stack in mock_manager.stacks.values():
+            stack.down = MagicMock(side_effect=stopper(stack.name))
+
+        cmd_down(mock_manager, mock_args)
+
+        # dependent-stack depends on test-stack
+        assert order.index("dependent-stack") < order.index("test-stack")
+
+    def test_down_failure_does_not_block(
+        self, mock_manager, mock_args, capsys
+    ):
+        """Test a failed dependent doesn't prevent stopping the rest."""
+        mock_args.all = True
+        for stack in mock_manager.stacks.values():
+            stack.down = MagicMock(
+                return_value=stack.name != "dependent-stack"
+            )
+
+        cmd_down(mock_manager, mock_args)
+
+        captured = capsys.readouterr()
+        assert "✗ FAILED dependent-stack" in captured.out
+        mock_manager.stacks["test-stack"].down.assert_called_once()
+
+    def test_down_passes_timeout(self, mock_manager, mock_args):
+        """Test the per-stack timeout reaches Stack.down."""
+        mock_args.target = "test-stack"
+        mock_args.timeout = 30.0
+        stack = mock_manager.stacks["test-stack"]
+        stack.down = MagicMock(return_value=True)
+
+        cmd_down(mock_manager, mock_args)
+
+        assert stack.down.call_args.kwargs['timeout'] == 30.0
+
+    def test_stack_down_timeout(self, mock_stack, capsys):
+        """Test a hung docker compose down is killed and reported."""
+        with patch('gam.stack.subprocess.run') as mock_run:
+            mock_run.side_effect = subprocess.TimeoutExpired("docker", 5)
+            assert mock_stack.down(timeout=5) is False
+            assert mock_run.call_args.kwargs['timeout'] == 5
+
+        captured = capsys.readouterr()
+        assert "[test-stack]" in captured.err
+        assert "timed out after 5s" in captured.err
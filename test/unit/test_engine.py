@@ -0,0 +1,431 @@
+"""Tests for the Docker Engine API client."""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from gam.commands.logs import cmd_logs
+from gam.engine import Engine, EngineError, LogDecoder, to_api_time
+from gam.stack import Stack
+
+from .fake_engine import frame
+
+
+def _container(cid, working_dir, state="running", service="web"):
+    return {
+        'Id': cid,
+        'Names': [f"/{cid}"],
+        'State': state,
+        'Labels': {
+            'com.docker.compose.project': Path(working_dir).name,
+            'com.docker.compose.project.working_dir': working_dir,
+            'com.docker.compose.oneoff': "False",
+            'com.docker.compose.service': service,
+            'com.docker.compose.container-number': "1",
+        },
+    }
+
+
+def _write_context(config_dir, name, host, tls=False):
+    digest = hashlib.sha256(name.encode()).hexdigest()
+    meta = config_dir / "contexts" / "meta" / digest
+    meta.mkdir(parents=True)
+    (meta / "meta.json").write_text(json.dumps({
+        'Name': name, 'Endpoints': {'docker': {'Host': host}},
+    }))
+    if tls:
+        (config_dir / "contexts" / "tls" / digest / "docker").mkdir(
+            parents=True
+        )
+
+
+class TestEngineClient:
+    """Test cases for requests against the fake engine."""
+
+    def test_ping(self, fake_engine):
+        """Test ping against a live socket."""
+        assert Engine(fake_engine.host).ping()
+
+    def test_unreachable(self):
+        """Test a missing socket raises EngineError and fails fast."""
+        engine = Engine("unix:///nonexistent/docker.sock")
+        assert not engine.ping()
+        with pytest.raises(EngineError):
+            engine.containers()
+
+    def test_reconnects_after_backoff(self, fake_engine, monkeypatch):
+        """Test a daemon that comes back is used again after the backoff."""
+        monkeypatch.setattr("gam.engine.RETRY_INTERVAL", 0.2)
+        engine = Engine(fake_engine.host)
+        moved = fake_engine.socket_path + ".away"
+        os.rename(fake_engine.socket_path, moved)
+        assert not engine.ping()
+
+        os.rename(moved, fake_engine.socket_path)
+        assert not engine.ping()
+        assert fake_engine.connections == 0
+
+        time.sleep(0.25)
+        assert engine.ping()
+        assert fake_engine.connections == 1
+
+    def test_unsupported_host(self):
+        """Test hosts the client can't speak to are left to the CLI."""
+        engine = Engine("ssh://user@remote")
+        with pytest.raises(EngineError):
+            engine.containers()
+
+    def test_context_endpoint(self, fake_engine, tmp_path, monkeypatch):
+        """Test the current Docker context's endpoint is used."""
+        _write_context(tmp_path, "remote", fake_engine.host)
+        (tmp_path / "config.json").write_text(
+            json.dumps({'currentContext': "remote"})
+        )
+        monkeypatch.delenv("DOCKER_HOST")
+        monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+
+        engine = Engine()
+        assert engine.host == fake_engine.host
+        assert engine.ping()
+
+    def test_context_left_to_cli(self, tmp_path, monkeypatch):
+        """Test unreadable and TLS contexts fall back to the CLI."""
+        _write_context(tmp_path, "tls", "tcp://remote:2376", tls=True)
+        monkeypatch.delenv("DOCKER_HOST")
+        monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+
+        for name in ("tls", "missing"):
+            monkeypatch.setenv("DOCKER_CONTEXT", name)
+            with pytest.raises(EngineError):
+                Engine().containers()
+
+        monkeypatch.setenv("DOCKER_CONTEXT", "default")
+        assert Engine().host == "unix:///var/run/docker.sock"
+
+    def test_connection_reused(self, fake_engine):
+        """Test keep-alive connections are pooled across requests."""
+        fake_engine.containers = [_container("abc", "/srv/web")]
+        engine = Engine(fake_engine.host)
+
+        for _ in range(5):
+            assert engine.containers()[0]['Id'] == "abc"
+
+        assert fake_engine.connections == 1
+
+    def test_containers_filters(self, fake_engine):
+        """Test label filters are passed to the API."""
+        fake_engine.containers = [
+            _container("abc", "/srv/web"),
+            _container("def", "/srv/db"),
+        ]
+        engine = Engine(fake_engine.host)
+
+        result = engine.containers(filters={
+            'label': ["com.docker.compose.project.working_dir=/srv/db"]
+        })
+
+        assert [c['Id'] for c in result] == ["def"]
+        assert fake_engine.requests[-1][2]['all'] == "1"
+
+    def test_inspect_not_found(self, fake_engine):
+        """Test API errors surface as EngineError."""
+        engine = Engine(fake_engine.host)
+        with pytest.raises(EngineError, match="No such container"):
+            engine.inspect("missing")
+
+    def test_logs_demultiplexed(self, fake_engine):
+        """Test multiplexed stdout/stderr frames are split into lines."""
+        fake_engine.logs["abc"] = (
+            frame(b"hello\nwor") + frame(b"oops\n", 2) + frame(b"ld\n")
+        )
+        engine = Engine(fake_engine.host)
+
+        lines = list(engine.logs("abc", tail="10"))
+
+        assert lines == [b"hello\n", b"oops\n", b"world\n"]
+        assert fake_engine.requests[-1][2]['tail'] == "10"
+
+    def test_logs_stream_returns_connection(self, fake_engine):
+        """Test a fully read log stream hands its connection back."""
+        fake_engine.logs["abc"] = frame(b"line\n")
+        engine = Engine(fake_engine.host)
+
+        list(engine.logs("abc"))
+        list(engine.logs("abc"))
+        engine.ping()
+
+        assert fake_engine.connections == 1
+
+    def test_logs_async(self, fake_engine):
+        """Test the asyncio log reader decodes chunked, framed streams."""
+        fake_engine.logs["abc"] = (
+            frame(b"one\ntw") + frame(b"o\n") + frame(b"err\n", stream=2)
+        )
+        engine = Engine(fake_engine.host)
+
+        async def collect():
+            return [line async for line in engine.logs_async("abc", tail="5")]
+
+        assert asyncio.run(collect()) == [b"one\n", b"two\n", b"err\n"]
+        assert fake_engine.requests[-1][2]['tail'] == "5"
+
+    def test_logs_async_error(self, fake_engine):
+        """Test API errors surface as EngineError."""
+        engine = Engine(fake_engine.host)
+
+        async def collect():
+            return [line async for line in engine.logs_async("missing")]
+
+        with pytest.raises(EngineError, match="404"):
+            asyncio.run(collect())
+
+    def test_events(self, fake_engine):
+        """Test events are decoded from the JSON stream."""
+        fake_engine.events = [
+            {'Type': "container", 'Action': "start"},
+            {'Type': "container", 'Action': "die"},
+        ]
+        engine = Engine(fake_engine.host)
+
+        events = list(engine.events(until="0"))
+
+        assert [e['Action'] for e in events] == ["start", "die"]
+
+
+class TestLogDecoder:
+    """Test cases for log stream decoding."""
+
+    def test_raw_stream(self):
+        """Test TTY streams are passed through as lines."""
+        decoder = LogDecoder("application/vnd.docker.raw-stream")
+        lines = list(decoder.feed(b"one\ntw")) + list(decoder.feed(b"o\n"))
+        assert lines == [b"one\n", b"two\n"]
+
+    def test_partial_line_flushed(self):
+        """Test a trailing line without newline is emitted at the end."""
+        decoder = LogDecoder()
+        lines = list(decoder.feed(frame(b"done")))
+        assert lines == []
+        assert list(decoder.flush()) == [b"done\n"]
+
+
+class TestToApiTime:
+    """Test cases for CLI time value conversion."""
+
+    def test_unix_timestamp(self):
+        assert to_api_time("1700000000") == "1700000000"
+
+    def test_relative_duration(self):
+        assert to_api_time("1h30m", now=10000.0) == "4600.000000000"
+
+    def test_rfc3339(self):
+        assert to_api_time("1970-01-01T00:01:40.123456789Z") == (
+            "100.123456000"
+        )
+
+    def test_invalid(self):
+        with pytest.raises(EngineError):
+            to_api_time("yesterday")
+
+
+class TestEngineReadPaths:
+    """Test cases for gam read paths going through the Engine API."""
+
+    def test_stack_status(self, fake_engine):
+        """Test Stack.get_status uses the API instead of the CLI."""
+        fake_engine.containers = [
+            _container("a", "/srv/web"),
+            _container("b", "/srv/web", state="exited"),
+            _container("c", "/srv/db"),
+        ]
+        stack = Stack(name="web", path=Path("/srv/web"))
+
+        with patch('gam.stack.subprocess.run') as mock_run:
+            status = stack.get_status()
+
+        mock_run.assert_not_called()
+        assert status == {
+            'status': 'running', 'containers': 2, 'running': 1,
+            'exited': 1, 'unhealthy': 0,
+        }
+
+    def test_manager_statuses(self, fake_engine, mock_manager):
+        """Test batched status is one API request instead of docker ps."""
+        fake_engine.containers = [
+            _container("a", "/fake/path/test-stack"),
+        ]
+
+        with patch('gam.stack_manager.subprocess.run') as mock_run:
+            statuses = mock_manager.get_statuses()
+
+        mock_run.assert_not_called()
+        assert statuses["test-stack"]['running'] == 1
+        assert statuses["autostart-stack"]['containers'] == 0
+
+    def test_logs_multiple_stacks(
+        self, fake_engine, mock_manager, mock_args, capsys
+    ):
+        """Test multi-stack logs are read from the API with prefixes."""
+        fake_engine.containers = [
+            _container("a", "/fake/path/test-stack"),
+            _container("b", "/fake/path/autostart-stack", service="db"),
+        ]
+        fake_engine.logs = {
+            "a": frame(b"from test\n"),
+            "b": frame(b"from autostart\n"),
+        }
+        mock_args.stacks = ["test-stack", "autostart-stack"]
+        mock_args.follow = False
+        mock_args.since = "10m"
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+
+        with patch('gam.commands.logs.subprocess.run') as mock_run:
+            cmd_logs(mock_manager, mock_args)
+
+        mock_run.assert_not_called()
+        captured = capsys.readouterr()
+        assert "[test-stack] web-1  | from test" in captured.out
+        assert "[autostart-stack] db-1  | from autostart" in captured.out
+        log_requests = [r for r in fake_engine.requests
+                        if r[1].endswith("/logs")]
+        assert all('.' in r[2]['since'] for r in log_requests)
+
+    def test_logs_follow_multiple_stacks(
+        self, fake_engine, mock_manager, mock_args, capsys
+    ):
+        """Test followed logs stream every container on one event loop."""
+        fake_engine.containers = [
+            _container("a", "/fake/path/test-stack"),
+            _container("b", "/fake/path/autostart-stack", service="db"),
+        ]
+        fake_engine.logs = {
+            "a": frame(b"first\n") + frame(b"second\n"),
+            "b": frame(b"from autostart\n"),
+        }
+        mock_args.stacks = ["test-stack", "autostart-stack"]
+        mock_args.follow = True
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+
+        cmd_logs(mock_manager, mock_args)
+
+        out = capsys.readouterr().out
+        assert "[test-stack] web-1  | first\n" in out
+        assert out.index("| first") < out.index("| second")
+        assert "[autostart-stack] db-1  | from autostart" in out
+        log_requests = [r for r in fake_engine.requests
+                        if r[1].endswith("/logs")]
+        assert all(r[2]['follow'] == "1" for r in log_requests)
+
+    def test_logs_merged(self, fake_engine, mock_manager, mock_args, capsys):
+        """Test --merge orders lines across stacks by timestamp."""
+        fake_engine.containers = [
+            _container("a", "/fake/path/test-stack"),
+            _container("b", "/fake/path/autostart-stack", service="db"),
+        ]
+        ts = "2024-01-01T00:00:0{}.000000000Z"
+        fake_engine.logs = {
+            "a": frame(f"{ts.format(1)} one\n{ts.format(3)} three\n".encode()),
+            "b": frame(f"{ts.format(2)} two\n".encode()),
+        }
+        mock_args.stacks = ["test-stack", "autostart-stack"]
+        mock_args.follow = False
+        mock_args.merge = True
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+
+        cmd_logs(mock_manager, mock_args)
+
+        lines = capsys.readouterr().out.splitlines()[2:]
+        assert lines == [
+            "[test-stack] web-1  | one",
+            "[autostart-stack] db-1  | two",
+            "[test-stack] web-1  | three",
+        ]
+        log_requests = [r for r in fake_engine.requests
+                        if r[1].endswith("/logs")]
+        assert all(r[2]['timestamps'] == "1" for r in log_requests)
+
+    def test_logs_since_last(
+        self, fake_engine, mock_manager, mock_args, capsys, tmp_path
+    ):
+        """Test --since-last keeps a cursor per container."""
+        mock_manager.root_dir = tmp_path
+        fake_engine.containers = [
+            _container("a", "/fake/path/test-stack"),
+            _container("b", "/fake/path/test-stack", service="db"),
+        ]
+        ts = "2024-01-01T00:00:0{}.000000000Z"
+        fake_engine.logs = {
+            "a": frame(f"{ts.format(5)} a\n".encode()),
+            "b": frame(f"{ts.format(3)} b\n".encode()),
+        }
+        mock_args.stacks = ["test-stack"]
+        mock_args.follow = False
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+        mock_args.since_last = True
+
+        cmd_logs(mock_manager, mock_args)
+        assert "web-1  | a" in capsys.readouterr().out
+        fake_engine.requests.clear()
+        cmd_logs(mock_manager, mock_args)
+
+        since = {
+            r[1].split("/")[-2]: r[2]['since'] for r in fake_engine.requests
+            if r[1].endswith("/logs")
+        }
+        start = 1704067200
+        assert since == {
+            "a": f"{start + 5}.000000001", "b": f"{start + 3}.000000001"
+        }
+
+    def test_logs_single_stack(
+        self, fake_engine, mock_manager, mock_args, capsys
+    ):
+        """Test single-stack logs skip the stack name prefix."""
+        fake_engine.containers = [_container("a", "/fake/path/test-stack")]
+        fake_engine.logs = {"a": frame(b"only\n")}
+        mock_args.stacks = ["test-stack"]
+        mock_args.follow = False
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+
+        with patch('gam.commands.logs.subprocess.run') as mock_run:
+            cmd_logs(mock_manager, mock_args)
+
+        mock_run.assert_not_called()
+        captured = capsys.readouterr()
+        assert "web-1  | only" in captured.out
+        assert "[test-stack]" not in captured.out
+
+    def test_logs_cli_fallback(self, mock_manager, mock_args):
+        """Test logs fall back to docker compose without a daemon."""
+        mock_args.stacks = ["test-stack"]
+        mock_args.follow = False
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+
+        with patch('gam.commands.logs.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout="", stderr="")
+            cmd_logs(mock_manager, mock_args)
+
+        mock_run.assert_called_once()
@@ -0,0 +1,55 @@
+"""Tests for gitignore-style discovery patterns."""
+
+from gam.ignore import IgnoreRules, is_ignored, parse_patterns
+
+
+class TestParsePatterns:
+    """Test cases for reading ignore files."""
+
+    def test_skips_comments_and_blanks(self):
+        """Test comments and blank lines are dropped."""
+        text = "# data\n\ndata/\n  \nlogs  \n"
+        assert parse_patterns(text) == ["data/", "logs"]
+
+
+class TestIgnoreRules:
+    """Test cases for matching directories."""
+
+    def test_name_matches_at_any_depth(self):
+        """Test a slash-less pattern matches in any subdirectory."""
+        rules = IgnoreRules("", ["data/"])
+        assert rules.match("data")
+        assert rules.match("web/blog/data")
+        assert rules.match("web/database") is None
+
+    def test_anchored(self):
+        """Test patterns with a slash are relative to their file."""
+        rules = IgnoreRules("web", ["/archive", "blog/cache"])
+        assert rules.match("web/archive")
+        assert rules.match("web/blog/cache")
+        assert rules.match("web/old/archive") is None
+
+    def test_wildcards(self):
+        """Test *, ? and ** globs."""
+        rules = IgnoreRules("", ["vol-*", "tmp?", "**/build", "backups/**"])
+        assert rules.match("a/vol-1")
+        assert rules.match("tmp1")
+        assert rules.match("a/b/build")
+        assert rules.match("backups/2024/01")
+        assert rules.match("a/vol/x") is None
+
+    def test_negation_last_match_wins(self):
+        """Test '!' re-includes a directory excluded earlier."""
+        rules = IgnoreRules("", ["/*", "!/web"])
+        assert rules.match("data")
+        assert rules.match("web") is False
+
+    def test_deeper_files_take_precedence(self):
+        """Test a nested ignore file overrides its parent's."""
+        chain = [
+            IgnoreRules("", ["data"]),
+            IgnoreRules("web", ["!data"]),
+        ]
+        assert is_ignored(chain, "db/data")
+        assert not is_ignored(chain, "web/data")
+        assert not is_ignored(chain, "web/blog")
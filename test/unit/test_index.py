@@ -0,0 +1,21 @@
+"""Tests for index command."""
+
+from unittest.mock import MagicMock
+
+from gam.commands.index import cmd_index
+
+
+class TestIndexCommand:
+    """Test cases for the index command."""
+
+    def test_index_rebuild(self, mock_manager, mock_args, capsys):
+        """Test rebuilding the stack index."""
+        mock_args.index_action = "rebuild"
+        mock_manager.rebuild_index = MagicMock(return_value=3)
+        mock_manager.index = MagicMock(path="/fake/path/.gam/index.json")
+
+        cmd_index(mock_manager, mock_args)
+
+        captured = capsys.readouterr()
+        mock_manager.rebuild_index.assert_called_once()
+        assert "Rebuilt stack index: 3 stacks found" in captured.out
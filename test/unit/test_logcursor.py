@@ -0,0 +1,97 @@
+"""Tests for --since-last log cursors."""
+
+import asyncio
+
+from gam.logcursor import LogCursors, api_time_after, rfc3339_after
+
+
+def _lines(*lines):
+    async def gen():
+        for line in lines:
+            yield line
+    return gen
+
+
+async def _collect(open_lines):
+    return [line async for line in open_lines()]
+
+
+class TestTimes:
+    """Test cases for formatting the moment after a cursor."""
+
+    def test_one_nanosecond_later(self):
+        """Test the cursor's own line is excluded."""
+        last = "1970-01-01T00:01:40.123456789Z"
+
+        assert rfc3339_after(last) == "1970-01-01T00:01:40.123456790Z"
+        assert api_time_after(last) == "100.123456790"
+
+    def test_carry(self):
+        """Test nanoseconds carry into the next second."""
+        last = "2023-12-31T23:59:59.999999999Z"
+
+        assert rfc3339_after(last) == "2024-01-01T00:00:00.000000000Z"
+
+
+class TestLogCursors:
+    """Test cases for reading, advancing and saving cursors."""
+
+    def test_track_and_save(self, tmp_path):
+        """Test the newest timestamp per source is saved."""
+        cursors = LogCursors(tmp_path)
+        opener = cursors.track("web", "abc", _lines(
+            b"2024-01-01T00:00:01.000000000Z one\n",
+            b"  continued\n",
+            b"2024-01-01T00:00:02.000000000Z two\n",
+        ))
+
+        lines = asyncio.run(_collect(opener))
+        cursors.save()
+
+        assert lines == [b"one\n", b"  continued\n", b"two\n"]
+        assert LogCursors(tmp_path).last("web", "abc") == (
+            "2024-01-01T00:00:02.000000000Z"
+        )
+
+    def test_keep_timestamps(self, tmp_path):
+        """Test timestamps can be left on the lines."""
+        cursors = LogCursors(tmp_path, keep_timestamps=True)
+        line = b"2024-01-01T00:00:01.000000000Z one\n"
+
+        assert asyncio.run(_collect(cursors.track("web", "", _lines(line)))) \
+            == [line]
+
+    def test_interleaved_sources(self, tmp_path):
+        """Test a stack-wide stream keeps its newest timestamp."""
+        cursors = LogCursors(tmp_path)
+        asyncio.run(_collect(cursors.track("web", "", _lines(
+            b"db-1 | 2024-01-01T00:00:05.000000000Z late\n",
+            b"app-1 | 2024-01-01T00:00:03.000000000Z early\n",
+        ))))
+        cursors.save()
+
+        assert LogCursors(tmp_path).last("web") == (
+            "2024-01-01T00:00:05.000000000Z"
+        )
+
+    def test_new_source_falls_back(self, tmp_path):
+        """Test unknown sources start after the stack's newest line."""
+        cursors = LogCursors(tmp_path)
+        for source, second in (("a", 1), ("b", 4)):
+            asyncio.run(_collect(cursors.track("web", source, _lines(
+                f"2024-01-01T00:00:0{second}.000000000Z x\n".encode()
+            ))))
+        cursors.save()
+
+        loaded = LogCursors(tmp_path)
+        assert loaded.last("web", "a") == "2024-01-01T00:00:01.000000000Z"
+        assert loaded.last("web", "new") == "2024-01-01T00:00:04.000000000Z"
+        assert loaded.last("other") is None
+
+    def test_quiet_stack_not_written(self, tmp_path):
+        """Test stacks without new lines keep their cursor file as is."""
+        cursors = LogCursors(tmp_path)
+        asyncio.run(_collect(cursors.track("web", "", _lines(b"no time\n"))))
+        cursors.save()
+
+        assert not cursors.path("web").exists()
@@ -0,0 +1,100 @@
+"""Tests for exporting logs to files."""
+
+import builtins
+import gzip
+from unittest.mock import patch
+
+import pytest
+
+from gam.logexport import RotatingFile, check_compression, parse_size
+
+
+class TestParseSize:
+    """Test cases for size arguments."""
+
+    @pytest.mark.parametrize("text, size", [
+        ("512", 512),
+        ("10K", 10 << 10),
+        ("1.5M", 3 << 19),
+        ("2gb", 2 << 30),
+    ])
+    def test_valid(self, text, size):
+        """Test plain and suffixed sizes."""
+        assert parse_size(text) == size
+
+    @pytest.mark.parametrize("text", ["", "M", "ten", "-1K", "0"])
+    def test_invalid(self, text):
+        """Test nonsense sizes are rejected."""
+        with pytest.raises(ValueError):
+            parse_size(text)
+
+
+class TestRotatingFile:
+    """Test cases for compressed, rotated output files."""
+
+    def test_gzip(self, tmp_path):
+        """Test output is gzip compressed into one file."""
+        output = RotatingFile(tmp_path, "web-blog")
+        output.write(b"line 1\n")
+        output.write(b"line 2\n")
+        output.close()
+
+        assert output.paths == [tmp_path / "web-blog.log.gz"]
+        assert gzip.decompress(output.paths[0].read_bytes()) == (
+            b"line 1\nline 2\n"
+        )
+
+    def test_rotation(self, tmp_path):
+        """Test parts are started at the size limit, never mid-write."""
+        output = RotatingFile(tmp_path, "web-blog", 'none', max_bytes=10)
+        for chunk in (b"aaaa\n", b"bbbbbbbb\n", b"cc\n", b"dd\n"):
+            output.write(chunk)
+        output.close()
+
+        assert [p.name for p in output.paths] == [
+            "web-blog.000.log", "web-blog.001.log"
+        ]
+        assert output.paths[0].read_bytes() == b"aaaa\nbbbbbbbb\n"
+        assert output.paths[1].read_bytes() == b"cc\ndd\n"
+
+    def test_no_empty_trailing_part(self, tmp_path):
+        """Test a part that fills up exactly isn't followed by an empty one."""
+        output = RotatingFile(tmp_path, "a", 'none', max_bytes=4)
+        output.write(b"abcd")
+        output.close()
+
+        assert [p.name for p in output.paths] == ["a.000.log"]
+
+    def test_zstd(self, tmp_path):
+        """Test zstd output decompresses to what was written."""
+        zstandard = pytest.importorskip("zstandard")
+        output = RotatingFile(tmp_path, "a", 'zstd')
+        output.write(b"hello\n")
+        output.close()
+
+        reader = zstandard.ZstdDecompressor().stream_reader(
+            output.paths[0].read_bytes()
+        )
+        assert reader.read() == b"hello\n"
+
+
+class TestCheckCompression:
+    """Test cases for checking compression support up front."""
+
+    def test_zstd_missing(self):
+        """Test a missing zstd library is explained."""
+        real_import = builtins.__import__
+
+        def no_zstd(name, *args, **kwargs):
+            if name in ("zstandard", "compression"):
+                raise ImportError(name)
+            return real_import(name, *args, **kwargs)
+
+        with patch('builtins.__import__', no_zstd):
+            with pytest.raises(ValueError, match="zstandard"):
+                check_compression('zstd')
+
+    def test_unknown(self):
+        """Test unknown methods are rejected."""
+        with pytest.raises(ValueError):
+            check_compression('lzma')
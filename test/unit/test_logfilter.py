@@ -0,0 +1,70 @@
+"""Tests for log line filters."""
+
+import re
+
+import pytest
+
+from gam.logfilter import level_pattern, line_filter
+
+
+class TestLineFilter:
+    """Test cases for building line predicates."""
+
+    def test_no_filters(self):
+        """Test nothing to filter gives no predicate."""
+        assert line_filter() is None
+
+    def test_substring(self):
+        """Test a plain pattern matches as a substring."""
+        match = line_filter("timed out")
+
+        assert match(b"db | connection timed out\n")
+        assert not match(b"db | connection Timed Out\n")
+
+    def test_regex(self):
+        """Test patterns with regex characters match as regexes."""
+        match = line_filter(r"status=5\d\d")
+
+        assert match(b"GET / status=503\n")
+        assert not match(b"GET / status=200\n")
+
+    def test_ignore_case(self):
+        """Test substrings can match case-insensitively."""
+        assert line_filter("timeout", ignore_case=True)(b"TIMEOUT\n")
+
+    def test_invalid_regex(self):
+        """Test an invalid pattern raises re.error."""
+        with pytest.raises(re.error):
+            line_filter("(unclosed")
+
+    def test_grep_and_level(self):
+        """Test every filter has to match."""
+        match = line_filter("db", level="error")
+
+        assert match(b"ERROR db down\n")
+        assert not match(b"ERROR cache down\n")
+        assert not match(b"INFO db up\n")
+
+
+class TestLevelPattern:
+    """Test cases for severity matching."""
+
+    @pytest.mark.parametrize("line", [
+        b"2024/01/01 [error] 12#12: upstream failed\n",
+        b'{"level":"warn","msg":"slow"}\n',
+        b"level=WARNING msg=slow\n",
+        b"FATAL: could not start\n",
+    ])
+    def test_at_or_above(self, line):
+        """Test lines at or above the level match."""
+        assert level_pattern("warn").search(line)
+
+    @pytest.mark.parametrize("line", [
+        b"level=info msg=ready\n",
+        b"DEBUG cache hit\n",
+        b"no level here\n",
+        b"errors_total 0\n",
+    ])
+    def test_below(self, line):
+        """Test lower levels, unlabelled lines and partial words don't."""
+        assert not level_pattern("warn").search(line)
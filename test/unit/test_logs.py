@@ -1,5 +1,6 @@
 """Tests for logs command."""
 
+import gzip
 from unittest.mock import MagicMock, call, patch
 
 import pytest
@@ -7,6 +8,19 @@ import pytest
 from gam.commands.logs import cmd_logs
 
 
+def fake_command_lines(output: bytes = b""):
+    """Stand-in for logstream.command_lines yielding canned output."""
+    calls = []
+
+    async def command_lines(cmd, cwd):
+        calls.append((cmd, cwd))
+        for line in output.splitlines(keepends=True):
+            yield line
+
+    command_lines.calls = calls
+    return command_lines
+
+
 class TestLogsCommand:
     """Test cases for the logs command."""
 
@@ -46,10 +60,8 @@ class TestLogsCommand:
         mock_args.timestamps = False
         mock_args.until = None
 
-        with patch('gam.commands.logs.subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(
-                stdout="log line 1\nlog line 2\n", stderr=""
-            )
+        fake = fake_command_lines(b"log line 1\nlog line 2\n")
+        with patch('gam.commands.logs.command_lines', fake):
             cmd_logs(mock_manager, mock_args)
 
         captured = capsys.readouterr()
@@ -72,12 +84,13 @@ class TestLogsCommand:
         mock_args.timestamps = False
         mock_args.until = None
 
-        with patch('gam.commands.logs.subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(stdout="", stderr="")
+        fake = fake_command_lines()
+        with patch('gam.commands.logs.command_lines', fake):
             cmd_logs(mock_manager, mock_args)
 
         captured = capsys.readouterr()
         assert "Showing logs from 3 stack(s)" in captured.out
+        assert len(fake.calls) == 3
 
     def test_logs_no_args_shows_all(self, mock_manager, mock_args, capsys):
         """Test that logs with no args defaults to showing all stacks."""
@@ -91,12 +104,13 @@ class TestLogsCommand:
         mock_args.timestamps = False
         mock_args.until = None
 
-        with patch('gam.commands.logs.subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(stdout="", stderr="")
+        fake = fake_command_lines()
+        with patch('gam.commands.logs.command_lines', fake):
             cmd_logs(mock_manager, mock_args)
 
         captured = capsys.readouterr()
         assert "Showing logs from 3 stack(s)" in captured.out
+        assert len(fake.calls) == 3
 
     def test_logs_by_category(self, mock_manager, mock_args, capsys):
         """Test showing logs filtered by category."""
@@ -252,10 +266,8 @@ class TestLogsCommand:
         mock_args.timestamps = False
         mock_args.until = None
 
-        with patch('gam.commands.logs.subprocess.run') as mock_run:
-            mock_run.return_value = MagicMock(
-                stdout="test log line\n", stderr=""
-            )
+        fake = fake_command_lines(b"test log line\n")
+        with patch('gam.commands.logs.command_lines', fake):
             cmd_logs(mock_manager, mock_args)
 
         captured = capsys.readouterr()
@@ -309,3 +321,122 @@ class TestLogsCommand:
             assert "--timestamps" in called_cmd
             assert "--until" in called_cmd
             assert "2024-12-31" in called_cmd
+
+    def test_logs_grep_single_stack(self, mock_manager, mock_args, capsys):
+        """Test filtering a single stack reads it through the pipeline."""
+        mock_args.stacks = ["test-stack"]
+        mock_args.follow = False
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+        mock_args.grep = "error"
+
+        fake = fake_command_lines(b"web | ready\nweb | error: boom\n")
+        with patch('gam.commands.logs.command_lines', fake), \
+                patch('gam.commands.logs.subprocess.run') as mock_run:
+            cmd_logs(mock_manager, mock_args)
+
+        mock_run.assert_not_called()
+        captured = capsys.readouterr()
+        assert captured.out.splitlines()[1:] == ["web | error: boom"]
+
+    def test_logs_level_multiple_stacks(self, mock_manager, mock_args, capsys):
+        """Test --level drops lower-severity lines from every stack."""
+        mock_args.stacks = ["test-stack", "autostart-stack"]
+        mock_args.follow = False
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+        mock_args.level = "warn"
+
+        fake = fake_command_lines(b"INFO up\nWARN slow\n")
+        with patch('gam.commands.logs.command_lines', fake):
+            cmd_logs(mock_manager, mock_args)
+
+        captured = capsys.readouterr()
+        assert "INFO" not in captured.out
+        assert "[test-stack] WARN slow" in captured.out
+        assert "[autostart-stack] WARN slow" in captured.out
+
+    def test_logs_invalid_grep(self, mock_manager, mock_args, capsys):
+        """Test an invalid --grep regex is reported."""
+        mock_args.stacks = ["test-stack"]
+        mock_args.grep = "(oops"
+
+        with pytest.raises(SystemExit) as exc_info:
+            cmd_logs(mock_manager, mock_args)
+
+        assert exc_info.value.code == 1
+        assert "Invalid --grep pattern" in capsys.readouterr().out
+
+    def test_logs_output_dir(self, mock_manager, mock_args, capsys, tmp_path):
+        """Test --output-dir writes a compressed file per stack."""
+        mock_args.stacks = ["test-stack", "autostart-stack"]
+        mock_args.follow = False
+        mock_args.since = None
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+        mock_args.output_dir = str(tmp_path / "export")
+
+        fake = fake_command_lines(b"web-1  | line 1\nweb-1  | line 2\n")
+        with patch('gam.commands.logs.command_lines', fake):
+            cmd_logs(mock_manager, mock_args)
+
+        files = sorted((tmp_path / "export").iterdir())
+        assert [f.name for f in files] == [
+            "autostart-stack.log.gz", "test-stack.log.gz"
+        ]
+        assert gzip.decompress(files[1].read_bytes()) == (
+            b"web-1  | line 1\nweb-1  | line 2\n"
+        )
+        captured = capsys.readouterr()
+        assert "line 1" not in captured.out
+        assert "Wrote 2 file(s)" in captured.out
+
+    def test_logs_output_dir_bad_size(self, mock_manager, mock_args, capsys):
+        """Test an invalid --max-size is reported before streaming."""
+        mock_args.stacks = ["test-stack"]
+        mock_args.output_dir = "/nonexistent"
+        mock_args.max_size = "lots"
+
+        with pytest.raises(SystemExit) as exc_info:
+            cmd_logs(mock_manager, mock_args)
+
+        assert exc_info.value.code == 1
+        assert "Invalid size 'lots'" in capsys.readouterr().out
+
+    def test_logs_since_last(self, mock_manager, mock_args, capsys, tmp_path):
+        """Test --since-last resumes after the previous run's last line."""
+        mock_manager.root_dir = tmp_path
+        mock_args.stacks = ["test-stack", "autostart-stack"]
+        mock_args.follow = False
+        mock_args.since = "24h"
+        mock_args.tail = None
+        mock_args.timestamps = False
+        mock_args.until = None
+        mock_args.since_last = True
+
+        fake = fake_command_lines(
+            b"web-1  | 2024-01-01T00:00:01.000000000Z first\n"
+            b"web-1  | 2024-01-01T00:00:02.000000000Z second\n"
+        )
+        with patch('gam.commands.logs.command_lines', fake):
+            cmd_logs(mock_manager, mock_args)
+            cmd_logs(mock_manager, mock_args)
+
+        first_run, second_run = fake.calls[:2], fake.calls[2:]
+        assert all(
+            cmd[-3:] == ["--since", "24h", "--timestamps"]
+            for cmd, _ in first_run
+        )
+        assert all(
+            cmd[-3:] == [
+                "--timestamps", "--since", "2024-01-01T00:00:02.000000001Z"
+            ]
+            for cmd, _ in second_run
+        )
+        captured = capsys.readouterr()
+        assert "[test-stack] web-1  | second" in captured.out
@@ -0,0 +1,463 @@
+"""Tests for asynchronous log streaming."""
+
+import asyncio
+import io
+import os
+import signal
+import sys
+import threading
+import time
+from unittest.mock import patch
+
+from gam.engine import EngineError
+from gam.logstream import (
+    LogStream,
+    OutputWriter,
+    RateLimit,
+    command_lines,
+    export_logs,
+    follow_logs,
+    merge_logs,
+    run,
+    split_timestamp,
+    stream_logs,
+)
+
+
+def _lines(*lines):
+    """A LogStream opener yielding the given lines."""
+    async def gen():
+        for line in lines:
+            yield line
+    return gen
+
+
+async def _collect(agen):
+    return [line async for line in agen]
+
+
+class TestCommandLines:
+    """Test cases for reading process output."""
+
+    def test_lines(self):
+        """Test stdout and stderr lines are yielded, newline-terminated."""
+        cmd = [sys.executable, "-c",
+               "import sys; print('out'); sys.stdout.flush(); "
+               "print('err', file=sys.stderr); sys.stderr.flush(); "
+               "print('last', end='')"]
+
+        lines = asyncio.run(_collect(command_lines(cmd, None)))
+
+        assert lines == [b"out\n", b"err\n", b"last\n"]
+
+    def test_long_line_split(self, monkeypatch):
+        """Test lines over the pipe limit come through in pieces."""
+        monkeypatch.setattr('gam.logstream.PIPE_LINE_LIMIT', 1024)
+        cmd = [sys.executable, "-c", "print('x' * 5000)"]
+
+        lines = asyncio.run(_collect(command_lines(cmd, None)))
+
+        assert b"".join(lines).replace(b"\n", b"") == b"x" * 5000
+        assert all(line.endswith(b"\n") for line in lines)
+
+    def test_exited_process_not_signalled(self):
+        """Test a process that ended its output is waited for, not
+        terminated."""
+        cmd = [sys.executable, "-c", "print('done')"]
+
+        with patch('gam.logstream._stop') as stop:
+            lines = asyncio.run(_collect(command_lines(cmd, None)))
+
+        assert lines == [b"done\n"]
+        stop.assert_not_called()
+
+
+class TestStreamLogs:
+    """Test cases for merging streams into one writer."""
+
+    def test_prefixes_and_order(self):
+        """Test every line is written once, with its stream's prefix."""
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", _lines(b"1\n", b"2\n")),
+            LogStream("[b] ", _lines(b"3\n")),
+        ]
+
+        asyncio.run(stream_logs(streams, out))
+
+        lines = out.getvalue().splitlines()
+        assert sorted(lines) == ["[a] 1", "[a] 2", "[b] 3"]
+        assert lines.index("[a] 1") < lines.index("[a] 2")
+
+    def test_match(self):
+        """Test only lines the filter accepts are written."""
+        out = io.StringIO()
+        streams = [LogStream("[a] ", _lines(b"ok\n", b"boom\n", b"ok\n"))]
+
+        asyncio.run(stream_logs(streams, out, match=lambda l: b"b" in l))
+
+        assert out.getvalue() == "[a] boom\n"
+
+    def test_jobs_bound_open_streams(self):
+        """Test no more than `jobs` streams are read at once."""
+        open_now = max_open = 0
+
+        async def slow():
+            nonlocal open_now, max_open
+            open_now += 1
+            max_open = max(max_open, open_now)
+            try:
+                await asyncio.sleep(0.01)
+                yield b"x\n"
+            finally:
+                open_now -= 1
+
+        out = io.StringIO()
+        streams = [LogStream(f"[{i}] ", slow) for i in range(6)]
+
+        asyncio.run(stream_logs(streams, out, jobs=2))
+
+        assert max_open == 2
+        assert len(out.getvalue().splitlines()) == 6
+
+    def test_stream_error(self):
+        """Test a failing stream reports its error and others continue."""
+        async def broken():
+            raise EngineError("gone")
+            yield
+
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", broken),
+            LogStream("[b] ", _lines(b"ok\n")),
+        ]
+
+        asyncio.run(stream_logs(streams, out))
+
+        assert "[a] Error streaming logs: gone" in out.getvalue()
+        assert "[b] ok" in out.getvalue()
+
+    def test_bytes_written_in_chunks(self):
+        """Test lines reach a binary output untouched, in few writes."""
+        writes = []
+
+        class Out(io.BytesIO):
+            def write(self, data):
+                writes.append(len(data))
+                return super().write(data)
+
+        out = Out()
+        streams = [LogStream("[a] ", _lines(*[b"\xff raw\n"] * 1000))]
+
+        asyncio.run(stream_logs(streams, out))
+
+        assert out.getvalue() == b"[a] \xff raw\n" * 1000
+        assert len(writes) < 10
+
+    def test_backpressure(self):
+        """Test readers stall while the output is blocked."""
+        produced = 0
+        release = threading.Event()
+
+        class SlowOut(io.StringIO):
+            def write(self, text):
+                release.wait(5)
+                return super().write(text)
+
+        async def many():
+            nonlocal produced
+            for i in range(10_000):
+                produced += 1
+                yield b"x\n"
+
+        async def fill(writer, lines):
+            async for line in lines:
+                await writer.put(line)
+
+        async def main():
+            writer = OutputWriter(SlowOut(), queue_size=10)
+            task = asyncio.create_task(writer.run())
+            pump = asyncio.create_task(fill(writer, many()))
+            await asyncio.sleep(0.2)
+            stalled_at = produced
+            release.set()
+            await pump
+            await writer.put(None)
+            await task
+            return stalled_at
+
+        # Queue bound + one batch in flight + the line being put
+        assert asyncio.run(main()) <= 10 + 10 + 2
+
+
+class TestExportLogs:
+    """Test cases for writing each stack to its own output."""
+
+    def test_outputs_per_stack(self):
+        """Test streams of a stack share its output, which is closed."""
+        outputs = {}
+
+        def open_output(stack):
+            outputs[stack] = io.BytesIO()
+            outputs[stack].close = lambda: None
+            return outputs[stack]
+
+        streams = [
+            LogStream("web-1 | ", _lines(b"a\n", b"b\n"), "blog"),
+            LogStream("db-1 | ", _lines(b"c\n"), "blog"),
+            LogStream("", _lines(b"d\n"), "redis"),
+        ]
+
+        asyncio.run(export_logs(streams, open_output, jobs=2))
+
+        assert sorted(outputs) == ["blog", "redis"]
+        assert sorted(outputs["blog"].getvalue().splitlines()) == [
+            b"db-1 | c", b"web-1 | a", b"web-1 | b"
+        ]
+        assert outputs["redis"].getvalue() == b"d\n"
+
+    def test_closed_when_interrupted(self):
+        """Test outputs are closed when the export is cancelled."""
+        closed = []
+
+        class Output(io.BytesIO):
+            def close(self):
+                closed.append(self)
+
+        async def endless():
+            while True:
+                yield b"x\n"
+                await asyncio.sleep(0.01)
+
+        async def main():
+            task = asyncio.create_task(export_logs(
+                [LogStream("", endless, "a")], lambda stack: Output()
+            ))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+        asyncio.run(main())
+
+        assert len(closed) == 1
+
+
+class TestRateLimit:
+    """Test cases for the follow mode line budget."""
+
+    def test_budget(self):
+        """Test a second's worth passes, then lines refill over time."""
+        with patch('gam.logstream.time.monotonic', return_value=100.0):
+            limit = RateLimit(3)
+            assert [limit.take() for _ in range(4)] == [
+                True, True, True, False
+            ]
+        with patch('gam.logstream.time.monotonic', return_value=100.5):
+            assert limit.take()
+            assert not limit.take()
+
+
+class TestFollowLogs:
+    """Test cases for fair, lossy following."""
+
+    def test_rate_drops_and_reports(self):
+        """Test lines over a stack's budget are dropped and counted."""
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", _lines(*[b"x\n"] * 5), "a"),
+            LogStream("[b] ", _lines(b"y\n"), "b"),
+        ]
+
+        asyncio.run(follow_logs(streams, out, rate=2))
+
+        assert out.getvalue().splitlines() == [
+            "[a] x", "[a] x", "[b] y", "[a] 3 lines dropped",
+        ]
+
+    def test_round_robin(self):
+        """Test a busy stream doesn't keep others waiting."""
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", _lines(*[b"x\n"] * 500), "a"),
+            LogStream("[b] ", _lines(b"y\n"), "b"),
+        ]
+
+        asyncio.run(follow_logs(streams, out))
+
+        lines = out.getvalue().splitlines()
+        assert len(lines) == 501
+        assert lines.index("[b] y") < 100
+
+    def test_full_queue_drops(self):
+        """Test a stalled terminal makes noisy streams drop, not block."""
+        release = threading.Event()
+
+        class SlowOut(io.StringIO):
+            def write(self, text):
+                release.wait(5)
+                return super().write(text)
+
+        async def noisy():
+            for _ in range(5000):
+                yield b"x\n"
+                await asyncio.sleep(0)
+
+        async def main():
+            task = asyncio.create_task(follow_logs(
+                [LogStream("[a] ", noisy, "a")], out, queue_size=10
+            ))
+            await asyncio.sleep(0.2)
+            release.set()
+            await task
+
+        out = SlowOut()
+        asyncio.run(main())
+
+        lines = out.getvalue().splitlines()
+        assert lines[-1].startswith("[a] ")
+        assert lines[-1].endswith(" lines dropped")
+        shown = lines.count("[a] x")
+        assert shown + int(lines[-1].split()[1]) == 5000
+        assert shown < 1000
+
+
+def _timed(*pairs, delay=0.0):
+    """A LogStream opener yielding (seconds, text) lines as timestamps."""
+    async def gen():
+        if delay:
+            await asyncio.sleep(delay)
+        for second, text in pairs:
+            yield f"2024-01-01T00:00:{second:02d}.000000000Z {text}\n".encode()
+    return gen
+
+
+class TestSplitTimestamp:
+    """Test cases for finding log line timestamps."""
+
+    def test_docker_format(self):
+        """Test Docker's fixed-width timestamps are used as is."""
+        line = b"2024-01-01T12:00:00.123456789Z hello\n"
+        assert split_timestamp(line) == (line[:30], line)
+        assert split_timestamp(line, keep=False) == (line[:30], b"hello\n")
+
+    def test_normalised(self):
+        """Test other RFC 3339 forms sort as UTC nanoseconds."""
+        key, line = split_timestamp(
+            b"web-1  | 2024-01-01T14:00:00.5+02:00 hi\n", keep=False
+        )
+        assert key == b"2024-01-01T12:00:00.500000000Z"
+        assert line == b"web-1  | hi\n"
+
+    def test_missing(self):
+        """Test lines without a timestamp get an empty key."""
+        assert split_timestamp(b"plain\n") == (b"", b"plain\n")
+
+
+class TestMergeLogs:
+    """Test cases for chronological merging."""
+
+    def test_interleaved(self):
+        """Test lines from all streams come out in timestamp order."""
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", _timed((1, "a1"), (4, "a4"))),
+            LogStream("[b] ", _timed((2, "b2"), (3, "b3"), (5, "b5"))),
+        ]
+
+        asyncio.run(merge_logs(streams, out, keep_timestamps=False))
+
+        assert out.getvalue().splitlines() == [
+            "[a] a1", "[b] b2", "[b] b3", "[a] a4", "[b] b5",
+        ]
+
+    def test_waits_for_slow_stream(self):
+        """Test finite logs wait for every stream's next line."""
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", _timed((2, "late"))),
+            LogStream("[b] ", _timed((1, "early"), delay=0.1)),
+        ]
+
+        asyncio.run(merge_logs(streams, out, keep_timestamps=False))
+
+        assert out.getvalue().splitlines() == ["[b] early", "[a] late"]
+
+    def test_window_releases_quiet_streams(self):
+        """Test a quiet stream only holds others back for the window."""
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", _timed((2, "now"))),
+            LogStream("[b] ", _timed((1, "too late"), delay=0.3)),
+        ]
+
+        asyncio.run(merge_logs(
+            streams, out, window=0.05, keep_timestamps=False
+        ))
+
+        assert out.getvalue().splitlines() == ["[a] now", "[b] too late"]
+
+    def test_match(self):
+        """Test filtered lines are dropped before merging."""
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", _timed((1, "keep"), (3, "drop"))),
+            LogStream("[b] ", _timed((2, "keep"))),
+        ]
+
+        asyncio.run(merge_logs(
+            streams, out, keep_timestamps=False, match=lambda l: b"keep" in l
+        ))
+
+        assert out.getvalue().splitlines() == ["[a] keep", "[b] keep"]
+
+    def test_untimestamped_lines_follow_predecessor(self):
+        """Test continuation lines stay with the line before them."""
+        async def traceback():
+            yield b"2024-01-01T00:00:01.000000000Z Traceback:\n"
+            yield b"  frame\n"
+            yield b"2024-01-01T00:00:03.000000000Z after\n"
+
+        out = io.StringIO()
+        streams = [
+            LogStream("[a] ", traceback),
+            LogStream("[b] ", _timed((2, "b2"))),
+        ]
+
+        asyncio.run(merge_logs(streams, out, keep_timestamps=False))
+
+        assert out.getvalue().splitlines() == [
+            "[a] Traceback:", "[a]   frame", "[b] b2", "[a] after",
+        ]
+
+
+class TestRun:
+    """Test cases for running and interrupting streams."""
+
+    def test_completed(self):
+        """Test run reports a stream that finished by itself."""
+        assert run(stream_logs([], io.StringIO()))
+
+    def test_ctrl_c_stops_processes(self):
+        """Test SIGINT cancels streaming and stops log processes."""
+        pids = []
+
+        async def lines():
+            cmd = ["sh", "-c", "echo $$; exec sleep 30"]
+            async for line in command_lines(cmd, None):
+                pids.append(int(line))
+                asyncio.get_running_loop().call_later(
+                    0.1, os.kill, os.getpid(), signal.SIGINT
+                )
+                yield line
+
+        start = time.monotonic()
+        finished = run(stream_logs([LogStream("", lines)], io.StringIO()))
+
+        assert not finished
+        assert time.monotonic() - start < 5
+        try:
+            os.kill(pids[0], 0)
+        except ProcessLookupError:
+            pass
+        else:
+            raise AssertionError("log process still running")
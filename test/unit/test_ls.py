@@ -25,15 +25,14 @@ class TestLsCommand:
         stacks = list(mock_manager.stacks.values())
         mock_manager.list_stacks = MagicMock(return_value=stacks)
 
-        # Mock get_status for each stack
-        for stack in stacks:
-            stack.get_status = MagicMock(
-                return_value={
-                    'status': 'running',
-                    'containers': 2,
-                    'running': 2
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                stack.name: {
+                    'status': 'running', 'containers': 2, 'running': 2
                 }
-            )
+                for stack in stacks
+            }
+        )
 
         cmd_ls(mock_manager, mock_args)
 
@@ -48,8 +47,12 @@ class TestLsCommand:
         filtered = [mock_manager.stacks["autostart-stack"]]
         mock_manager.list_stacks = MagicMock(return_value=filtered)
 
-        filtered[0].get_status = MagicMock(
-            return_value={'status': 'stopped', 'containers': 0, 'running': 0}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                filtered[0].name: {
+                    'status': 'stopped', 'containers': 0, 'running': 0
+                }
+            }
         )
 
         cmd_ls(mock_manager, mock_args)
@@ -64,8 +67,12 @@ class TestLsCommand:
         filtered = [mock_manager.stacks["autostart-stack"]]
         mock_manager.list_stacks = MagicMock(return_value=filtered)
 
-        filtered[0].get_status = MagicMock(
-            return_value={'status': 'running', 'containers': 1, 'running': 1}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                filtered[0].name: {
+                    'status': 'running', 'containers': 1, 'running': 1
+                }
+            }
         )
 
         cmd_ls(mock_manager, mock_args)
@@ -78,8 +85,12 @@ class TestLsCommand:
         stacks = [mock_manager.stacks["test-stack"]]
         mock_manager.list_stacks = MagicMock(return_value=stacks)
 
-        stacks[0].get_status = MagicMock(
-            return_value={'status': 'running', 'containers': 2, 'running': 2}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                stacks[0].name: {
+                    'status': 'running', 'containers': 2, 'running': 2
+                }
+            }
         )
 
         cmd_ls(mock_manager, mock_args)
@@ -94,8 +105,12 @@ class TestLsCommand:
         stacks = [mock_manager.stacks["autostart-stack"]]
         mock_manager.list_stacks = MagicMock(return_value=stacks)
 
-        stacks[0].get_status = MagicMock(
-            return_value={'status': 'stopped', 'containers': 0, 'running': 0}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                stacks[0].name: {
+                    'status': 'stopped', 'containers': 0, 'running': 0
+                }
+            }
         )
 
         cmd_ls(mock_manager, mock_args)
@@ -0,0 +1,51 @@
+"""Tests for the metadata inverted indexes."""
+
+from pathlib import Path
+
+from gam.metadata_index import MetadataIndex
+from gam.stack import Stack
+
+
+def _stack(name, **meta):
+    return Stack(name=name, path=Path(f"/fake/{name}"), **meta)
+
+
+class TestMetadataIndex:
+    """Test cases for MetadataIndex."""
+
+    def test_postings(self):
+        """Test every indexed value maps to its stacks."""
+        index = MetadataIndex([
+            _stack("a", category="data", subcategory="sql",
+                   tags=["prod", "db", "prod"], owner="ops"),
+            _stack("b", category="data", tags=["prod"]),
+        ])
+
+        assert index.tags == {"prod": {"a", "b"}, "db": {"a"}}
+        assert index.categories == {"data": {"a", "b"}}
+        assert index.subcategories == {
+            ("data", "sql"): {"a"}, ("data", ""): {"b"}
+        }
+        assert index.owners == {"ops": {"a"}}
+
+    def test_update_after_change(self):
+        """Test a stack changed in place is re-indexed."""
+        stack = _stack("a", category="data", tags=["prod"])
+        index = MetadataIndex([stack, _stack("b", tags=["prod"])])
+
+        stack.tags.remove("prod")
+        stack.tags.append("staging")
+        stack.category = "web"
+        index.update(stack)
+
+        assert index.tags == {"prod": {"b"}, "staging": {"a"}}
+        assert index.categories == {"web": {"a"}, "uncategorized": {"b"}}
+
+    def test_remove_drops_empty_keys(self):
+        """Test values no stack has any more disappear."""
+        index = MetadataIndex([_stack("a", tags=["x"], owner="ops")])
+
+        index.remove("a")
+        index.remove("missing")
+
+        assert not (index.tags or index.categories or index.owners)
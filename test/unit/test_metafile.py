@@ -0,0 +1,126 @@
+"""Tests for round-trip metadata file edits."""
+
+import yaml
+
+from gam.metafile import update_metadata
+
+TEXT = """\
+# Media server
+description: Jellyfin   # shown in gam show
+category: media
+tags: [video, streaming]
+
+# Start late, it's heavy.
+priority: 8
+critical: false
+team: media-ops
+"""
+
+FIELDS = {
+    'description': "Jellyfin",
+    'category': "media",
+    'tags': ["video", "streaming"],
+    'priority': 8,
+    'critical': False,
+    'owner': "",
+}
+
+
+def _values(fields):
+    values = {k: v for k, v in fields.items() if k != 'owner' or v}
+    values.pop('critical')
+    return values
+
+
+class TestUpdateMetadata:
+    """Test cases for update_metadata."""
+
+    def test_unchanged(self):
+        """Test unchanged values give back the text as it was."""
+        assert update_metadata(TEXT, _values(FIELDS), FIELDS) == TEXT
+
+    def test_changed_entry_only(self):
+        """Test only changed entries are rewritten."""
+        fields = FIELDS | {'tags': ["video"], 'description': "Movies"}
+
+        text = update_metadata(TEXT, _values(fields), fields)
+
+        assert text == TEXT.replace(
+            "tags: [video, streaming]", "tags:\n- video"
+        ).replace("description: Jellyfin", "description: Movies")
+
+    def test_removed_and_added(self):
+        """Test entries left out are dropped and new ones appended."""
+        fields = FIELDS | {'critical': True, 'owner': "ops"}
+        values = _values(fields) | {'critical': True}
+        text = update_metadata(TEXT, values, fields)
+        assert text.endswith("team: media-ops\nowner: ops\n")
+        assert "critical: true\n" in text
+
+        fields = FIELDS | {'priority': 5}
+        values = _values(fields)
+        del values['priority']
+        text = update_metadata(TEXT, values, fields)
+        assert "priority" not in text
+        assert "# Start late, it's heavy.\ncritical: false\n" in text
+
+    def test_block_sequence(self):
+        """Test a multi-line entry is replaced up to its last item."""
+        text = "tags:\n  - a\n  - b\n\n# owner\nowner: x\n"
+        fields = {'tags': ["c"], 'owner': "x"}
+
+        assert update_metadata(text, fields, fields) == (
+            "tags:\n  - c\n\n# owner\nowner: x\n"
+        )
+
+    def test_sequence_items_kept(self):
+        """Test editing a block sequence keeps its indentation and the
+        comments of its items."""
+        text = "tags:\n  - prod  # live\n  # staging soon\n  - web  # x\n"
+        fields = {'tags': ["production", "web", "new"]}
+
+        assert update_metadata(text, fields, fields) == (
+            "tags:\n  - production  # live\n  # staging soon\n"
+            "  - web  # x\n  - new\n"
+        )
+
+        fields = {'tags': ["web"]}
+        assert update_metadata(text, fields, fields) == (
+            "tags:\n  # staging soon\n  - web  # x\n"
+        )
+
+    def test_default_not_appended(self):
+        """Test a missing key at its default isn't added."""
+        values = {'category': "data", 'auto_start': False}
+        defaults = {'auto_start': False, 'category': "uncategorized"}
+
+        assert update_metadata(
+            "category: data\n", values, values, defaults
+        ) == "category: data\n"
+        values['auto_start'] = True
+        assert update_metadata(
+            "category: data\n", values, values, defaults
+        ) == "category: data\nauto_start: true\n"
+
+    def test_new_or_unusual_file(self):
+        """Test text that isn't a block mapping is written afresh."""
+        values = {'category': "data", 'tags': []}
+        fresh = "category: data\ntags: []\n"
+
+        assert update_metadata(None, values, values) == fresh
+        assert update_metadata("{category: web}", values, values) == fresh
+        assert update_metadata("- a\n", values, values) == fresh
+        assert yaml.safe_load(update_metadata("", values, values)) == values
+
+    def test_document_end_marker(self):
+        """Test new entries go before a `...` ending the document."""
+        values = {'category': "b", 'description': "New"}
+        fields = values | {'tags': []}
+
+        text = update_metadata("category: a\n...\n", values, fields)
+
+        assert text == "category: b\ndescription: New\n...\n"
+        assert yaml.safe_load(text) == values
+        assert update_metadata("---\n...\n", values, fields) == (
+            "category: b\ndescription: New\n"
+        )
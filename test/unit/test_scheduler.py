@@ -0,0 +1,146 @@
+"""Tests for the dependency-aware stack scheduler."""
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from gam.scheduler import DependencyCycleError, build_graph, run_graph
+from gam.stack import Stack
+
+
+def _stack(name, priority=5, depends_on=()):
+    return Stack(
+        name=name,
+        path=Path(f"/fake/path/{name}"),
+        priority=priority,
+        depends_on=list(depends_on),
+    )
+
+
+class TestBuildGraph:
+    """Test cases for dependency graph construction."""
+
+    def test_edges_from_depends_on(self):
+        """Test stacks wait on their selected dependencies only."""
+        stacks = [
+            _stack("db"),
+            _stack("app", depends_on=["db", "not-selected"]),
+        ]
+        assert build_graph(stacks) == {"db": set(), "app": {"db"}}
+
+    def test_reverse(self):
+        """Test reversed graphs make dependencies wait on dependents."""
+        stacks = [_stack("db"), _stack("app", depends_on=["db"])]
+        assert build_graph(stacks, reverse=True) == {
+            "db": {"app"}, "app": set()
+        }
+
+    def test_cycle(self):
+        """Test dependency cycles are reported."""
+        stacks = [
+            _stack("a", depends_on=["b"]),
+            _stack("b", depends_on=["a"]),
+            _stack("c"),
+        ]
+        with pytest.raises(DependencyCycleError) as exc:
+            build_graph(stacks)
+        assert exc.value.names == ["a", "b"]
+
+
+class TestRunGraph:
+    """Test cases for running operations across the graph."""
+
+    def test_dependencies_first(self):
+        """Test a stack only starts after its dependencies finished."""
+        stacks = [
+            _stack("app", depends_on=["cache", "db"]),
+            _stack("db"),
+            _stack("cache"),
+        ]
+        finished = []
+
+        def action(stack):
+            assert all(dep in finished for dep in stack.depends_on)
+            finished.append(stack.name)
+            return True
+
+        report = run_graph(stacks, action, jobs=4)
+
+        assert finished[-1] == "app"
+        assert not report.failed
+
+    def test_independent_stacks_run_concurrently(self):
+        """Test independent stacks are in flight at the same time."""
+        stacks = [_stack("a"), _stack("b")]
+        barrier = threading.Barrier(2, timeout=5)
+
+        def action(stack):
+            barrier.wait()
+            return True
+
+        report = run_graph(stacks, action, jobs=2)
+
+        assert all(r.ok for r in report.results)
+
+    def test_priority_breaks_ties(self):
+        """Test ready stacks are dispatched by priority."""
+        stacks = [_stack("low", 5), _stack("high", 1), _stack("mid", 3)]
+        started = []
+
+        run_graph(stacks, lambda s: True, jobs=1,
+                  on_start=lambda s: started.append(s.name))
+
+        assert started == ["high", "mid", "low"]
+
+    def test_reverse_order(self):
+        """Test dependents are handled before their dependencies."""
+        stacks = [
+            _stack("db", 1),
+            _stack("app", 3, depends_on=["db"]),
+            _stack("web", 5),
+        ]
+        started = []
+
+        run_graph(stacks, lambda s: True, jobs=1, reverse=True,
+                  on_start=lambda s: started.append(s.name))
+
+        assert started.index("app") < started.index("db")
+        assert started[0] == "web"
+
+    def test_failure_skips_dependents(self):
+        """Test stacks depending on a failed stack are skipped."""
+        stacks = [
+            _stack("db"),
+            _stack("app", depends_on=["db"]),
+            _stack("web", depends_on=["app"]),
+            _stack("other"),
+        ]
+        ran = []
+
+        def action(stack):
+            ran.append(stack.name)
+            return stack.name != "db"
+
+        report = run_graph(stacks, action, jobs=2)
+
+        assert sorted(ran) == ["db", "other"]
+        results = {r.stack.name: r for r in report.results}
+        assert results["app"].skipped_for == "db"
+        assert results["web"].skipped_for == "app"
+        assert "SKIPPED" in results["web"].describe()
+
+    def test_exception_is_failure(self):
+        """Test an exception in the action counts as a failure."""
+        report = run_graph([_stack("a")], lambda s: 1 / 0)
+
+        assert report.failed[0].error == "division by zero"
+
+    def test_timings(self):
+        """Test the report carries elapsed and critical path times."""
+        stacks = [_stack("db"), _stack("app", depends_on=["db"])]
+
+        report = run_graph(stacks, lambda s: True)
+
+        assert report.critical_path <= report.elapsed
+        assert "2/2 stack(s) done" in report.summary()
@@ -0,0 +1,139 @@
+"""Tests for the full-text search index."""
+
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from gam.search_index import SearchIndex, tokenize
+from gam.stack import Stack
+
+
+def _stacks():
+    return [
+        Stack(name="media-jellyfin", path=Path("/s/media-jellyfin"),
+              category="media", tags=["video", "streaming"],
+              description="Media server for movies"),
+        Stack(name="media-transcoder", path=Path("/s/media-transcoder"),
+              category="media", tags=["video"],
+              description="Transcodes uploaded video with ffmpeg"),
+        Stack(name="data-postgres", path=Path("/s/data-postgres"),
+              category="data", tags=["database"], owner="dba-team",
+              description="Primary database",
+              extra={"backup": {"schedule": "nightly"}}),
+    ]
+
+
+def _index(stacks=None):
+    index = SearchIndex("/nonexistent")
+    index.refresh(stacks or _stacks())
+    return index
+
+
+def _names(results):
+    return [name for name, _ in results]
+
+
+class TestSearchIndex:
+    """Test cases for SearchIndex."""
+
+    def test_tokenize(self):
+        """Test text splits into lower-case words."""
+        assert tokenize("Media-Server v2, FFmpeg!") == [
+            "media", "server", "v2", "ffmpeg"
+        ]
+
+    def test_ranked(self):
+        """Test stacks where a word weighs more rank first."""
+        assert _names(_index().search("video")) == [
+            "media-transcoder", "media-jellyfin"
+        ]
+        assert _names(_index().search("jellyfin video")) == [
+            "media-jellyfin", "media-transcoder"
+        ]
+
+    def test_fields(self):
+        """Test owner and custom metadata keys are searchable."""
+        index = _index()
+        assert _names(index.search("dba")) == ["data-postgres"]
+        assert _names(index.search("nightly")) == ["data-postgres"]
+
+    def test_prefix_and_fuzzy(self):
+        """Test words match by prefix, substring and similar spelling."""
+        index = _index()
+        assert _names(index.search("transc")) == ["media-transcoder"]
+        assert _names(index.search("gres")) == ["data-postgres"]
+        assert _names(index.search("jelyfin")) == ["media-jellyfin"]
+        assert index.search("kubernetes") == []
+        assert index.search("--") == []
+
+    def test_exact_beats_prefix(self):
+        """Test an exact word outranks a word it is a prefix of."""
+        stacks = [
+            Stack(name="web", path=Path("/s/web")),
+            Stack(name="webhooks", path=Path("/s/webhooks")),
+        ]
+        assert _names(_index(stacks).search("web")) == ["web", "webhooks"]
+
+    def test_update(self):
+        """Test a stack re-indexed after an in-memory change."""
+        stacks = _stacks()
+        index = _index(stacks)
+        stacks[2].tags.append("sql")
+
+        index.update(stacks[2])
+
+        assert _names(index.search("sql")) == ["data-postgres"]
+
+
+class TestSearchIndexPersistence:
+    """Test cases for saving and revalidating the search index."""
+
+    @pytest.fixture
+    def root(self, tmp_path):
+        for name, description in [("web", "blog engine"), ("db", "sql")]:
+            path = tmp_path / name
+            path.mkdir()
+            meta = path / ".stack-meta.yaml"
+            meta.write_text(f"description: {description}\n")
+            os.utime(meta, (1_000_000, 1_000_000))
+        return tmp_path
+
+    def _refresh(self, root):
+        stacks = [Stack.lazy(n, root / n) for n in ("web", "db")]
+        index = SearchIndex(root)
+        index.load()
+        with patch.object(
+            Stack, 'load_metadata', autospec=True,
+            side_effect=Stack.load_metadata
+        ) as load:
+            index.refresh(stacks)
+        index.save()
+        return index, [call.args[0].name for call in load.call_args_list]
+
+    def test_only_changed_reread(self, root):
+        """Test a saved index only re-reads changed metadata files."""
+        index, read = self._refresh(root)
+        assert sorted(read) == ["db", "web"]
+        assert (root / ".gam" / "search.json").exists()
+
+        index, read = self._refresh(root)
+        assert read == []
+        assert _names(index.search("blog")) == ["web"]
+
+        meta = root / "db" / ".stack-meta.yaml"
+        meta.write_text("description: blog database\n")
+        os.utime(meta, (2_000_000, 2_000_000))
+        index, read = self._refresh(root)
+        assert read == ["db"]
+        assert sorted(_names(index.search("blog"))) == ["db", "web"]
+
+    def test_removed_stack_dropped(self, root):
+        """Test stacks no longer present leave the index."""
+        index, _ = self._refresh(root)
+
+        index.refresh([Stack.lazy("web", root / "web")])
+
+        assert index.changed
+        assert list(index.docs) == ["web"]
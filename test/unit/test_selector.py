@@ -0,0 +1,75 @@
+"""Tests for selector expressions."""
+
+import pytest
+
+from gam.selector import Selector, SelectorError, Term
+
+
+class TestParse:
+    """Test cases for parsing selectors."""
+
+    def test_terms(self):
+        """Test each kind of term is parsed."""
+        selector = Selector(
+            "category=data/sql, tag!=staging, !critical, priority<=2, name=web-*"
+        )
+
+        assert selector.terms == [
+            Term('subcategory', '=', ('data', 'sql')),
+            Term('tag', '=', 'staging', negate=True),
+            Term('critical', '=', True, negate=True),
+            Term('priority', '<=', 2),
+            Term('name', '=', 'web-*'),
+        ]
+
+    def test_boolean_values(self):
+        """Test boolean terms take explicit values."""
+        assert Selector("auto_start=no").terms == [
+            Term('auto_start', '=', False)
+        ]
+        assert Selector("autostart").terms == [Term('auto_start', '=', True)]
+
+    @pytest.mark.parametrize("text", [
+        "", "colour=red", "tag", "tag<prod", "priority=high", "priority",
+        "critical=maybe", "tag=prod,,critical",
+    ])
+    def test_invalid(self, text):
+        """Test invalid expressions raise SelectorError."""
+        with pytest.raises(SelectorError):
+            Selector(text)
+
+
+class TestMatch:
+    """Test cases for matching stacks."""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("tag=prod", {"autostart-stack"}),
+        ("!tag=prod", {"test-stack", "dependent-stack"}),
+        ("category=test,tag=dev", {"test-stack"}),
+        ("category=test,tag=prod", set()),
+        ("priority<3", {"autostart-stack", "dependent-stack"}),
+        ("priority>=2,!auto_start", {"test-stack", "dependent-stack"}),
+        ("auto_start", {"autostart-stack"}),
+        ("name=*-stack,tag!=backend", {"test-stack", "autostart-stack"}),
+        ("tag=missing", set()),
+    ])
+    def test_match(self, mock_manager, text, expected):
+        """Test selectors combine index lookups and predicates."""
+        assert Selector(text).match(mock_manager) == expected
+
+    def test_subcategory(self, mock_manager):
+        """Test category=CAT/SUB matches the subcategory."""
+        mock_manager.stacks["test-stack"].subcategory = "unit"
+
+        assert Selector("category=test/unit").match(mock_manager) == {
+            "test-stack"
+        }
+        assert Selector("category=test/other").match(mock_manager) == set()
+
+    def test_manager_select(self, mock_manager):
+        """Test StackManager.select returns stacks sorted by name."""
+        stacks = mock_manager.select("priority<=3")
+
+        assert [s.name for s in stacks] == [
+            "autostart-stack", "dependent-stack", "test-stack"
+        ]
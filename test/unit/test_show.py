@@ -14,8 +14,12 @@ class TestShowCommand:
         """Test showing stack details."""
         mock_args.stack = "test-stack"
         stack = mock_manager.stacks["test-stack"]
-        stack.get_status = MagicMock(
-            return_value={'status': 'running', 'containers': 2, 'running': 2}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                stack.name: {
+                    'status': 'running', 'containers': 2, 'running': 2
+                }
+            }
         )
 
         cmd_show(mock_manager, mock_args)
@@ -34,8 +38,12 @@ class TestShowCommand:
         mock_args.stack = "test-stack"
         stack = mock_manager.stacks["test-stack"]
         stack.subcategory = "unit"
-        stack.get_status = MagicMock(
-            return_value={'status': 'stopped', 'containers': 0, 'running': 0}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                stack.name: {
+                    'status': 'stopped', 'containers': 0, 'running': 0
+                }
+            }
         )
 
         cmd_show(mock_manager, mock_args)
@@ -56,8 +64,12 @@ class TestShowCommand:
         """Test showing stack with dependencies."""
         mock_args.stack = "dependent-stack"
         stack = mock_manager.stacks["dependent-stack"]
-        stack.get_status = MagicMock(
-            return_value={'status': 'stopped', 'containers': 0, 'running': 0}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                stack.name: {
+                    'status': 'stopped', 'containers': 0, 'running': 0
+                }
+            }
         )
 
         cmd_show(mock_manager, mock_args)
@@ -69,8 +81,12 @@ class TestShowCommand:
         """Test showing auto-start stack."""
         mock_args.stack = "autostart-stack"
         stack = mock_manager.stacks["autostart-stack"]
-        stack.get_status = MagicMock(
-            return_value={'status': 'running', 'containers': 1, 'running': 1}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                stack.name: {
+                    'status': 'running', 'containers': 1, 'running': 1
+                }
+            }
         )
 
         cmd_show(mock_manager, mock_args)
@@ -0,0 +1,115 @@
+"""Tests for Stack."""
+
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from gam.stack import Stack
+
+
+@pytest.fixture
+def meta_dir(tmp_path):
+    """A stack directory with a metadata file."""
+    (tmp_path / "docker-compose.yml").write_text("services: {}\n")
+    (tmp_path / ".stack-meta.yaml").write_text(
+        "category: data\ntags: [prod]\npriority: 2\nname: ignored\n"
+    )
+    return tmp_path
+
+
+class TestLazyMetadata:
+    """Test cases for lazily loaded metadata."""
+
+    def test_not_loaded_until_used(self, meta_dir):
+        """Test creating a lazy stack doesn't read its metadata."""
+        with patch.object(Stack, 'load_metadata') as mock_load:
+            stack = Stack.lazy("db", meta_dir)
+            assert stack.name == "db"
+            assert stack.path == meta_dir
+            _ = stack.compose_file
+
+        mock_load.assert_not_called()
+        assert not stack.meta_loaded
+
+    def test_loaded_on_first_access(self, meta_dir):
+        """Test reading a metadata field loads the file once."""
+        stack = Stack.lazy("db", meta_dir)
+
+        with patch('gam.stack.yaml.load', wraps=yaml.load) as load:
+            assert stack.category == "data"
+            assert stack.tags == ["prod"]
+            assert stack.priority == 2
+
+        load.assert_called_once()
+        assert stack.name == "db"
+
+    def test_assignment_before_load(self, meta_dir):
+        """Test an assigned field isn't overwritten by a later load."""
+        stack = Stack.lazy("db", meta_dir)
+
+        stack.priority = 1
+
+        assert stack.priority == 1
+        assert stack.category == "data"
+
+    def test_eager_stack(self, meta_dir):
+        """Test stacks built directly keep their given values."""
+        stack = Stack(name="db", path=meta_dir, category="web")
+
+        assert stack.meta_loaded
+        assert stack.category == "web"
+
+    def test_unknown_keys_kept(self, meta_dir):
+        """Test keys that aren't Stack fields are kept in extra."""
+        (meta_dir / ".stack-meta.yaml").write_text(
+            "category: data\nteam: storage\nup: nope\n"
+        )
+        stack = Stack.lazy("db", meta_dir)
+
+        assert stack.category == "data"
+        assert stack.extra == {"team": "storage", "up": "nope"}
+
+
+class TestSaveMetadata:
+    """Test cases for saving metadata."""
+
+    def test_keeps_comments_and_unknown_keys(self, meta_dir):
+        """Test saving rewrites only the changed entries."""
+        meta_file = meta_dir / ".stack-meta.yaml"
+        meta_file.write_text(
+            "# Database\ncategory: data\ntags: [prod]\nteam: storage\n"
+        )
+        stack = Stack.lazy("db", meta_dir)
+
+        stack.tags.append("sql")
+        assert stack.save_metadata()
+
+        assert meta_file.read_text() == (
+            "# Database\ncategory: data\ntags:\n- prod\n- sql\n"
+            "team: storage\n"
+        )
+
+    def test_defaults_not_appended(self, meta_dir):
+        """Test a file leaving out keys at their default isn't rewritten."""
+        meta_file = meta_dir / ".stack-meta.yaml"
+        meta_file.write_text("category: data\ntags: [prod]\n")
+        stack = Stack.lazy("db", meta_dir)
+        stack.load_metadata()
+
+        with patch('gam.stack.write_atomic') as write:
+            assert not stack.save_metadata()
+
+        write.assert_not_called()
+
+    def test_unchanged_not_written(self, meta_dir):
+        """Test saving unchanged metadata leaves the file alone."""
+        stack = Stack.lazy("db", meta_dir)
+        stack.save_metadata()
+        mtime = stack.meta_file.stat().st_mtime_ns
+
+        with patch('gam.stack.write_atomic') as write:
+            assert not stack.save_metadata()
+
+        write.assert_not_called()
+        assert stack.meta_file.stat().st_mtime_ns == mtime
@@ -0,0 +1,318 @@
+"""Tests for the persistent stack index."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from gam.stack_index import StackIndex
+from gam.stack_manager import StackManager
+
+
+def _make_stack(root, rel, compose_file="docker-compose.yml"):
+    path = root / rel
+    path.mkdir(parents=True, exist_ok=True)
+    (path / compose_file).write_text("services: {}\n")
+    return path
+
+
+def _age(root):
+    """Backdate every directory so its mtime is outside the racy window."""
+    for dirpath, dirnames, _ in os.walk(root):
+        os.utime(dirpath, (1_000_000, 1_000_000))
+
+
+@pytest.fixture
+def tree(tmp_path):
+    """A small stacks root with nested, hidden and data directories."""
+    _make_stack(tmp_path, "web/blog")
+    _make_stack(tmp_path, "data/redis")
+    _make_stack(tmp_path, ".git/hooks")
+    (tmp_path / "data/redis/volume/a/b").mkdir(parents=True)
+    _age(tmp_path)
+    return tmp_path
+
+
+class TestStackIndex:
+    """Test cases for StackIndex."""
+
+    def test_refresh_finds_stacks(self, tree):
+        """Test stack directories are found and hidden ones skipped."""
+        index = StackIndex(tree)
+        assert index.refresh() == [tree / "data/redis", tree / "web/blog"]
+        assert not any(rel.startswith(".git") for rel in index.dirs)
+
+    def test_round_trip(self, tree):
+        """Test a saved index loads back unchanged."""
+        index = StackIndex(tree)
+        index.refresh()
+        assert index.save()
+        assert (tree / ".gam" / "index.json").exists()
+
+        loaded = StackIndex(tree)
+        assert loaded.load()
+        assert loaded.dirs == index.dirs
+
+    def test_unchanged_tree_not_listed(self, tree):
+        """Test revalidating an unchanged tree only stats directories."""
+        index = StackIndex(tree)
+        index.refresh()
+        index.save()
+
+        loaded = StackIndex(tree)
+        loaded.load()
+        with patch('gam.stack_index.os.scandir') as mock_scandir:
+            stacks = loaded.refresh()
+
+        mock_scandir.assert_not_called()
+        assert len(stacks) == 2
+        assert not loaded.changed
+
+    def test_only_changed_subtree_rescanned(self, tree):
+        """Test a new stack is found by re-listing just its parent."""
+        index = StackIndex(tree)
+        index.refresh()
+        _make_stack(tree, "web/shop")
+
+        scanned = []
+        real_scandir = os.scandir
+
+        def tracking_scandir(path):
+            scanned.append(os.path.relpath(path, tree))
+            return real_scandir(path)
+
+        with patch('gam.stack_index.os.scandir', tracking_scandir):
+            stacks = index.refresh()
+
+        assert tree / "web/shop" in stacks
+        assert sorted(scanned) == ["web", "web/shop"]
+
+    def test_removed_stack(self, tree):
+        """Test a deleted stack directory drops out of the index."""
+        index = StackIndex(tree)
+        index.refresh()
+        (tree / "web/blog/docker-compose.yml").unlink()
+        (tree / "web/blog").rmdir()
+
+        assert index.refresh() == [tree / "data/redis"]
+        assert "web/blog" not in index.dirs
+
+    def test_stale_root_ignored(self, tree, tmp_path_factory):
+        """Test an index written for another root is not used."""
+        index = StackIndex(tree)
+        index.refresh()
+        index.save()
+        other = tmp_path_factory.mktemp("other")
+        (other / ".gam").mkdir()
+        (other / ".gam/index.json").write_bytes(
+            (tree / ".gam/index.json").read_bytes()
+        )
+
+        assert not StackIndex(other).load()
+
+    def test_unwritable_root(self, tree):
+        """Test a failed save doesn't raise."""
+        index = StackIndex(tree)
+        index.refresh()
+        with patch('gam.cache.tempfile.mkstemp', side_effect=OSError):
+            assert not index.save()
+
+
+class TestPruning:
+    """Test cases for pruning the walk."""
+
+    def test_ignore_files_prune(self, tree):
+        """Test directories matched by ignore files are not walked."""
+        _make_stack(tree, "data/redis/volume/nested")
+        _make_stack(tree, "archive/old")
+        (tree / "data/redis/.gitignore").write_text("volume/\n")
+        (tree / ".gamignore").write_text("/archive\n")
+        _age(tree)
+
+        index = StackIndex(tree)
+        assert index.refresh() == [tree / "data/redis", tree / "web/blog"]
+        assert not any(
+            rel.startswith(("archive", "data/redis/volume"))
+            for rel in index.dirs
+        )
+
+    def test_gamignore_overrides_gitignore(self, tree):
+        """Test .gamignore can re-include what .gitignore excludes."""
+        (tree / ".gitignore").write_text("web/\n")
+        (tree / ".gamignore").write_text("!web/\n")
+
+        assert tree / "web/blog" in StackIndex(tree).refresh()
+
+    def test_edited_ignore_file(self, tree):
+        """Test editing an ignore file in place is picked up."""
+        ignore = tree / ".gamignore"
+        ignore.write_text("# nothing yet\n")
+        _age(tree)
+        index = StackIndex(tree)
+        index.refresh()
+
+        ignore.write_text("web\n")
+
+        assert index.refresh() == [tree / "data/redis"]
+
+    def test_max_depth(self, tree):
+        """Test nothing deeper than max_depth is visited."""
+        _make_stack(tree, "top")
+        index = StackIndex(tree, max_depth=1)
+
+        assert index.refresh() == [tree / "top"]
+        assert max(rel.count(os.sep) for rel in index.dirs) == 0
+
+    def test_compose_variants(self, tree):
+        """Test every compose file name marks a stack."""
+        for i, name in enumerate(
+            ("compose.yaml", "compose.yml", "docker-compose.yaml")
+        ):
+            _make_stack(tree, f"variants/v{i}", name)
+        (tree / "variants/other").mkdir()
+        (tree / "variants/other/compose.json").write_text("{}")
+
+        stacks = StackIndex(tree).refresh()
+
+        assert len(stacks) == 5
+        assert tree / "variants/other" not in stacks
+
+
+class TestLookup:
+    """Test cases for resolving one stack by name."""
+
+    def test_dashed_components(self, tree):
+        """Test every dash split is tried."""
+        _make_stack(tree, "web/my-shop")
+        _make_stack(tree, "my-apps/api")
+        index = StackIndex(tree)
+
+        assert index.lookup("web-my-shop") == tree / "web/my-shop"
+        assert index.lookup("my-apps-api") == tree / "my-apps/api"
+        assert index.lookup("web-blog") == tree / "web/blog"
+
+    def test_not_a_stack(self, tree):
+        """Test names without a compose file resolve to nothing."""
+        index = StackIndex(tree)
+
+        assert index.lookup("web") is None
+        assert index.lookup("web-nope") is None
+        assert index.lookup("data-redis-volume") is None
+
+    def test_excluded_like_discovery(self, tree):
+        """Test hidden, ignored and too-deep stacks aren't resolved."""
+        (tree / ".gamignore").write_text("data\n")
+
+        assert StackIndex(tree).lookup("data-redis") is None
+        assert StackIndex(tree).lookup(".git-hooks") is None
+        assert StackIndex(tree, max_depth=1).lookup("web-blog") is None
+
+    def test_outside_root(self, tree, tmp_path_factory):
+        """Test names that are paths never resolve, inside the root or
+        out of it."""
+        outside = _make_stack(tmp_path_factory.mktemp("elsewhere"), "app")
+        index = StackIndex(tree)
+
+        assert index.lookup(str(outside)) is None
+        assert index.lookup("web/blog") is None
+        assert index.lookup("web-blog/") is None
+        assert index.lookup("..-" + tree.name + "-web-blog") is None
+        assert StackManager(root_dir=tree).get_stack(str(outside)) is None
+
+    def test_ignored_single_stack(self, tree):
+        """Test a stack ignored below the top level isn't resolved."""
+        (tree / "web/.gamignore").write_text("blog\n")
+
+        assert StackIndex(tree).lookup("web-blog") is None
+
+    def test_no_listing(self, tree):
+        """Test lookup never lists a directory."""
+        with patch('gam.stack_index.os.scandir') as mock_scandir:
+            StackIndex(tree).lookup("web-blog")
+
+        mock_scandir.assert_not_called()
+
+
+class TestManagerDiscovery:
+    """Test cases for discovery through the index."""
+
+    def test_discover_uses_index(self, tree):
+        """Test StackManager discovers stacks and writes the index."""
+        manager = StackManager(root_dir=tree)
+
+        assert sorted(manager.stacks) == ["data-redis", "web-blog"]
+        assert manager.index.path.exists()
+
+    def test_rebuild_index(self, tree):
+        """Test rebuilding picks up stacks and rewrites the index."""
+        manager = StackManager(root_dir=tree)
+        _make_stack(tree, "web/shop")
+        _age(tree)
+
+        assert manager.rebuild_index() == 3
+        assert "web-shop" in manager.stacks
+
+    def test_discovery_deferred(self, tree):
+        """Test nothing is discovered until stacks are needed."""
+        with patch.object(StackIndex, 'refresh') as mock_refresh:
+            StackManager(root_dir=tree)
+
+        mock_refresh.assert_not_called()
+
+    def test_get_stack_without_discovery(self, tree):
+        """Test a single stack is resolved by path, not discovery."""
+        manager = StackManager(root_dir=tree)
+
+        with patch.object(StackIndex, 'refresh') as mock_refresh:
+            stack = manager.get_stack("web-blog")
+            assert manager.get_stack("web-nope") is None
+
+        mock_refresh.assert_not_called()
+        assert stack.path == tree / "web/blog"
+        assert manager.get_stack("web-blog") is stack
+
+        # Discovery later reuses the resolved object
+        assert manager.stacks["web-blog"] is stack
+
+    def test_single_stack_parses_one_file(self, tree):
+        """Test looking up one stack only loads that stack's metadata."""
+        for name in ("web/blog", "data/redis"):
+            (tree / name / ".stack-meta.yaml").write_text("priority: 1\n")
+        manager = StackManager(root_dir=tree)
+
+        assert manager.get_stack("web-blog").priority == 1
+        assert not manager.stacks["data-redis"].meta_loaded
+
+    def test_filters_load_all(self, tree):
+        """Test filtering by metadata materialises every stack."""
+        manager = StackManager(root_dir=tree)
+
+        manager.list_stacks(tag="prod")
+
+        assert all(s.meta_loaded for s in manager.stacks.values())
+
+    def test_compose_file_variant(self, tree):
+        """Test a stack's compose file is whichever variant exists."""
+        _make_stack(tree, "web/shop", "compose.yaml")
+        manager = StackManager(root_dir=tree)
+
+        stack = manager.get_stack("web-shop")
+        assert stack.compose_file == tree / "web/shop/compose.yaml"
+        assert stack.exists()
+
+    def test_refresh(self, tree):
+        """Test a long-lived manager picks up new stacks and edits."""
+        manager = StackManager(root_dir=tree)
+        assert manager.refresh()
+        blog = manager.stacks["web-blog"]
+        redis = manager.stacks["data-redis"]
+        assert not manager.refresh()
+
+        (tree / "web/blog/.stack-meta.yaml").write_text("category: web\n")
+        _make_stack(tree, "web/shop")
+
+        assert manager.refresh()
+        assert sorted(manager.stacks) == ["data-redis", "web-blog", "web-shop"]
+        assert manager.stacks["web-blog"] is not blog
+        assert manager.stacks["web-blog"].category == "web"
+        assert manager.stacks["data-redis"] is redis
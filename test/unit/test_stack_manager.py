@@ -0,0 +1,186 @@
+"""Tests for StackManager."""
+
+import json
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from gam.stack_manager import StackManager
+from gam.transaction import MetadataTransaction
+
+
+def _ps_line(project, working_dir, state):
+    """Render one `docker ps --format '{{json .}}'` line."""
+    labels = (
+        f"com.docker.compose.project={project},"
+        f"com.docker.compose.project.working_dir={working_dir},"
+        f"com.docker.compose.service=web"
+    )
+    return json.dumps({'Labels': labels, 'State': state})
+
+
+class TestGetStatuses:
+    """Test cases for batched status collection."""
+
+    def test_single_docker_call(self, mock_manager):
+        """Test all stacks are resolved from one docker ps call."""
+        output = "\n".join([
+            _ps_line("test-stack", "/fake/path/test-stack", "running"),
+            _ps_line("test-stack", "/fake/path/test-stack", "exited"),
+            _ps_line("autostart-stack", "/fake/path/autostart-stack",
+                     "running"),
+        ])
+
+        with patch('gam.stack_manager.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout=output)
+            statuses = mock_manager.get_statuses()
+
+        mock_run.assert_called_once()
+        assert mock_run.call_args[0][0][:3] == ["docker", "ps", "-a"]
+        assert statuses["test-stack"] == {
+            'status': 'running', 'containers': 2, 'running': 1,
+            'exited': 1, 'unhealthy': 0,
+        }
+        assert statuses["autostart-stack"] == {
+            'status': 'running', 'containers': 1, 'running': 1,
+            'exited': 0, 'unhealthy': 0,
+        }
+        assert statuses["dependent-stack"] == {
+            'status': 'stopped', 'containers': 0, 'running': 0,
+            'exited': 0, 'unhealthy': 0,
+        }
+
+    def test_only_requested_stacks(self, mock_manager):
+        """Test containers of unrequested stacks are ignored."""
+        output = _ps_line(
+            "autostart-stack", "/fake/path/autostart-stack", "running"
+        )
+        stack = mock_manager.stacks["test-stack"]
+
+        with patch('gam.stack_manager.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout=output)
+            statuses = mock_manager.get_statuses([stack])
+
+        assert statuses == {
+            "test-stack": {
+                'status': 'stopped', 'containers': 0, 'running': 0,
+                'exited': 0, 'unhealthy': 0,
+            }
+        }
+
+    def test_project_name_fallback(self, mock_manager):
+        """Test containers without a working_dir label match by project."""
+        output = json.dumps({
+            'Labels': "com.docker.compose.project=dependent-stack",
+            'State': "running",
+        })
+
+        with patch('gam.stack_manager.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout=output)
+            statuses = mock_manager.get_statuses()
+
+        assert statuses["dependent-stack"]['running'] == 1
+
+    def test_foreign_projects_ignored(self, mock_manager):
+        """Test containers from unknown compose projects are ignored."""
+        output = _ps_line("other", "/elsewhere/other", "running")
+
+        with patch('gam.stack_manager.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout=output)
+            statuses = mock_manager.get_statuses()
+
+        assert all(s['containers'] == 0 for s in statuses.values())
+
+    def test_empty_output(self):
+        """Test no containers reports every stack stopped."""
+        manager = StackManager.__new__(StackManager)
+        manager.stacks = {}
+
+        with patch('gam.stack_manager.subprocess.run') as mock_run:
+            mock_run.return_value = MagicMock(stdout="")
+            assert manager.get_statuses() == {}
+
+
+class TestMetadataQueries:
+    """Test cases for lookups through the metadata indexes."""
+
+    @pytest.fixture(autouse=True)
+    def no_saving(self, mock_manager):
+        for stack in mock_manager.stacks.values():
+            stack.save_metadata = MagicMock()
+        with patch.object(MetadataTransaction, '_write') as write:
+            self.written = write
+            yield
+
+    def test_lookups(self, mock_manager):
+        """Test selections come from the indexes."""
+        mock_manager.stacks["test-stack"].owner = "ops"
+
+        assert [s.name for s in mock_manager.get_tag_stacks("dev")] == [
+            "test-stack"
+        ]
+        assert [s.name for s in mock_manager.get_owner_stacks("ops")] == [
+            "test-stack"
+        ]
+        assert mock_manager.list_stacks(category="test", tag="prod") == []
+        assert mock_manager.get_tag_counts() == {
+            "dev": 1, "testing": 1, "prod": 1, "backend": 1
+        }
+
+    def test_tag_mutations(self, mock_manager):
+        """Test adding, removing and renaming tags keep counts current."""
+        stack = mock_manager.stacks["autostart-stack"]
+        mock_manager.get_all_tags()
+
+        assert mock_manager.add_tags(stack, ["dev", "prod"]) == ["dev"]
+        assert mock_manager.get_tag_counts()["dev"] == 2
+        assert mock_manager.rename_tag("dev", "development") == 2
+        assert "dev" not in mock_manager.get_all_tags()
+        assert mock_manager.remove_tags(stack, ["development"]) == [
+            "development"
+        ]
+        assert [s.name for s in mock_manager.get_tag_stacks("development")] \
+            == ["test-stack"]
+
+    def test_rename_only_touches_matches(self, mock_manager):
+        """Test renaming saves just the stacks that had the value."""
+        assert mock_manager.rename_category("test", "qa") == 1
+
+        (stacks,), _ = self.written.call_args
+        assert [s.name for s in stacks] == ["test-stack"]
+        assert ("qa", "") in mock_manager.get_all_categories()
+        assert ("test", "") not in mock_manager.get_all_categories()
+
+    def test_set_category(self, mock_manager):
+        """Test moving a stack updates category lookups."""
+        stack = mock_manager.stacks["test-stack"]
+        mock_manager.get_category_stacks("test")
+
+        mock_manager.set_category(stack, "app", "api")
+
+        assert mock_manager.get_category_stacks("test") == []
+        assert [s.name for s in mock_manager.get_category_stacks("app")] == [
+            "dependent-stack", "test-stack"
+        ]
+        assert mock_manager.get_category_counts()[("app", "api")] == 1
+
+
+class TestSearch:
+    """Test cases for StackManager.search."""
+
+    def test_ranked_stacks(self, mock_manager):
+        """Test search returns stacks, best match first."""
+        results = mock_manager.search("stack dependencies")
+
+        assert results[0].name == "dependent-stack"
+        assert len(results) == 3
+
+    def test_reindexed_after_tagging(self, mock_manager):
+        """Test search sees tags added through the manager."""
+        stack = mock_manager.stacks["test-stack"]
+        assert mock_manager.search("frontend") == []
+
+        with patch.object(stack, 'save_metadata'):
+            mock_manager.add_tags(stack, ["frontend"])
+
+        assert mock_manager.search("frontend") == [stack]
@@ -0,0 +1,133 @@
+"""Tests for event-driven container state tracking."""
+
+import threading
+from pathlib import Path
+
+from gam.stack import container_health, summarize_containers
+from gam.state_tracker import StateTracker
+
+WEB = "/srv/web"
+
+
+def _labels(working_dir=WEB):
+    return {
+        'com.docker.compose.project': Path(working_dir).name,
+        'com.docker.compose.project.working_dir': working_dir,
+        'com.docker.compose.oneoff': "False",
+    }
+
+
+def _container(cid, state="running", status="Up 1 minute"):
+    return {'Id': cid, 'State': state, 'Status': status, 'Labels': _labels()}
+
+
+def _event(cid, action):
+    return {
+        'Type': "container",
+        'Action': action,
+        'Actor': {'ID': cid, 'Attributes': {**_labels(), 'name': cid}},
+    }
+
+
+def _match(labels):
+    if labels.get('com.docker.compose.project.working_dir') == WEB:
+        return "web"
+    return None
+
+
+class TestContainerHealth:
+    """Test cases for reading health check status."""
+
+    def test_from_status(self):
+        """Test health is parsed from docker ps style Status."""
+        assert container_health(
+            {'Status': "Up 5 minutes (unhealthy)"}
+        ) == "unhealthy"
+        assert container_health(
+            {'Status': "Up 2 seconds (health: starting)"}
+        ) == "starting"
+        assert container_health({'Status': "Up 5 minutes"}) is None
+
+    def test_from_health(self):
+        """Test compose ps and Engine API Health fields are used."""
+        assert container_health({'Health': "healthy"}) == "healthy"
+        assert container_health(
+            {'Health': {'Status': "unhealthy"}}
+        ) == "unhealthy"
+
+    def test_summary_counts(self):
+        """Test exited and unhealthy containers are counted."""
+        status = summarize_containers([
+            _container("a", status="Up 1 minute (unhealthy)"),
+            _container("b"),
+            _container("c", state="exited", status="Exited (1)"),
+        ])
+
+        assert status == {
+            'status': 'running', 'containers': 3, 'running': 2,
+            'exited': 1, 'unhealthy': 1,
+        }
+
+
+class TestStateTracker:
+    """Test cases for StateTracker."""
+
+    def test_events_update_counts(self):
+        """Test start, die and health events change the summary."""
+        tracker = StateTracker()
+        tracker.reset([_container("a"), _container("b", state="exited")])
+
+        assert tracker.apply(_event("b", "start"))
+        assert tracker.apply(_event("a", "health_status: unhealthy"))
+        status = tracker.statuses(_match, ["web"])["web"]
+        assert (status['running'], status['unhealthy']) == (2, 1)
+
+        assert tracker.apply(_event("a", "die"))
+        status = tracker.statuses(_match, ["web"])["web"]
+        assert (status['running'], status['exited']) == (1, 1)
+        assert status['unhealthy'] == 0
+
+    def test_unchanged_and_ignored(self):
+        """Test events that change nothing are reported as such."""
+        tracker = StateTracker()
+        tracker.reset([_container("a")])
+
+        assert not tracker.apply(_event("a", "start"))
+        assert not tracker.apply(_event("a", "exec_start: sh"))
+        assert not tracker.apply(_event("z", "destroy"))
+
+    def test_created_and_destroyed(self):
+        """Test containers come and go with create and destroy."""
+        tracker = StateTracker()
+
+        assert tracker.apply(_event("a", "create"))
+        assert tracker.statuses(_match, ["web"])["web"]['containers'] == 1
+
+        tracker.apply(_event("a", "destroy"))
+        assert tracker.statuses(_match, ["web", "db"]) == {
+            name: summarize_containers([]) for name in ("web", "db")
+        }
+
+    def test_follow(self, fake_engine):
+        """Test following seeds from a listing and replays events."""
+        fake_engine.containers = [_container("a")]
+        fake_engine.events = [
+            _event("b", "start"), _event("a", "health_status: unhealthy"),
+        ]
+        tracker = StateTracker()
+        stop = threading.Event()
+        seen = []
+
+        def on_change():
+            seen.append(tracker.statuses(_match, ["web"])["web"])
+            if len(seen) == 3:
+                stop.set()
+
+        tracker.follow(stop, on_change)
+
+        assert [s['running'] for s in seen] == [1, 2, 2]
+        assert seen[-1]['unhealthy'] == 1
+        assert not tracker.live
+        path, params = fake_engine.requests[-1][1:]
+        assert path == "/events"
+        assert "container" in params['filters']
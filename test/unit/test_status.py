@@ -1,6 +1,6 @@
 """Tests for status command."""
 
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 from gam.commands.status import cmd_status
 
@@ -13,14 +13,14 @@ class TestStatusCommand:
         mock_manager.list_stacks = MagicMock(
             return_value=list(mock_manager.stacks.values())
         )
-        for stack in mock_manager.stacks.values():
-            stack.get_status = MagicMock(
-                return_value={
-                    'status': 'running',
-                    'containers': 2,
-                    'running': 1
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                name: {
+                    'status': 'running', 'containers': 2, 'running': 1
                 }
-            )
+                for name in mock_manager.stacks
+            }
+        )
 
         cmd_status(mock_manager, mock_args)
 
@@ -39,8 +39,12 @@ class TestStatusCommand:
         mock_manager.list_stacks = MagicMock(
             return_value=[mock_manager.stacks["autostart-stack"]]
         )
-        mock_manager.stacks["autostart-stack"].get_status = MagicMock(
-            return_value={'status': 'stopped', 'containers': 0, 'running': 0}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                "autostart-stack": {
+                    'status': 'stopped', 'containers': 0, 'running': 0
+                }
+            }
         )
 
         cmd_status(mock_manager, mock_args)
@@ -54,8 +58,12 @@ class TestStatusCommand:
         mock_manager.list_stacks = MagicMock(
             return_value=[mock_manager.stacks["test-stack"]]
         )
-        mock_manager.stacks["test-stack"].get_status = MagicMock(
-            return_value={'status': 'running', 'containers': 1, 'running': 1}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                "test-stack": {
+                    'status': 'running', 'containers': 1, 'running': 1
+                }
+            }
         )
 
         cmd_status(mock_manager, mock_args)
@@ -68,8 +76,12 @@ class TestStatusCommand:
         mock_manager.list_stacks = MagicMock(
             return_value=[mock_manager.stacks["test-stack"]]
         )
-        mock_manager.stacks["test-stack"].get_status = MagicMock(
-            return_value={'status': 'stopped', 'containers': 0, 'running': 0}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                "test-stack": {
+                    'status': 'stopped', 'containers': 0, 'running': 0
+                }
+            }
         )
 
         cmd_status(mock_manager, mock_args)
@@ -83,15 +95,59 @@ class TestStatusCommand:
         mock_manager.list_stacks = MagicMock(
             return_value=[mock_manager.stacks["test-stack"]]
         )
-        mock_manager.stacks["test-stack"].get_status = MagicMock(
-            return_value={'status': 'running', 'containers': 1, 'running': 1}
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                "test-stack": {
+                    'status': 'running', 'containers': 1, 'running': 1
+                }
+            }
         )
 
         cmd_status(mock_manager, mock_args)
 
         # Verify list_stacks was called with tag parameter
         mock_manager.list_stacks.assert_called_once_with(
-            category=None, tag="dev"
+            category=None, tag="dev", selector=None
         )
         captured = capsys.readouterr()
         assert "test-stack" in captured.out
+
+    def test_status_unhealthy(self, mock_manager, mock_args, capsys):
+        """Test unhealthy containers are called out."""
+        mock_manager.list_stacks = MagicMock(
+            return_value=[mock_manager.stacks["test-stack"]]
+        )
+        mock_manager.get_statuses = MagicMock(
+            return_value={
+                "test-stack": {
+                    'status': 'running', 'containers': 2, 'running': 2,
+                    'exited': 0, 'unhealthy': 1,
+                }
+            }
+        )
+
+        cmd_status(mock_manager, mock_args)
+
+        assert "2/2 (1 unhealthy)" in capsys.readouterr().out
+
+    def test_status_watch(self, mock_manager, mock_args, capsys):
+        """Test --watch redraws until interrupted, polling without
+        docker events."""
+        mock_args.watch = True
+        mock_manager.list_stacks = MagicMock(
+            return_value=[mock_manager.stacks["test-stack"]]
+        )
+        status = {'status': 'stopped', 'containers': 0, 'running': 0}
+        mock_manager.get_statuses = MagicMock(side_effect=[
+            {"test-stack": status}, {"test-stack": status},
+            KeyboardInterrupt,
+        ])
+
+        with patch('gam.commands.status.StateTracker.follow'), \
+                patch('gam.commands.status.WATCH_INTERVAL', 0):
+            cmd_status(mock_manager, mock_args)
+
+        out = capsys.readouterr().out
+        assert out.count("test-stack") == 2
+        assert "from polling" in out
+        assert mock_manager.state_tracker is not None
@@ -0,0 +1,82 @@
+"""Tests for the shared status cache."""
+
+from unittest.mock import patch
+
+from gam.stack_manager import StackManager
+from gam.status_cache import StatusCache
+
+RUNNING = {'status': 'running', 'containers': 1, 'running': 1}
+STOPPED = {'status': 'stopped', 'containers': 0, 'running': 0}
+
+
+class TestStatusCache:
+    """Test cases for StatusCache."""
+
+    def test_fresh_entries_returned(self, tmp_path):
+        """Test statuses are reused by another instance within the TTL."""
+        StatusCache(tmp_path, 5).put({"web": RUNNING, "db": STOPPED})
+
+        assert StatusCache(tmp_path, 5).get(["web", "other"]) == {
+            "web": RUNNING
+        }
+
+    def test_expired(self, tmp_path):
+        """Test statuses older than the TTL are not used."""
+        cache = StatusCache(tmp_path, 5)
+        with patch('gam.status_cache.time.time', return_value=1000.0):
+            cache.put({"web": RUNNING})
+        with patch('gam.status_cache.time.time', return_value=1004.0):
+            assert cache.get(["web"]) == {"web": RUNNING}
+        with patch('gam.status_cache.time.time', return_value=1005.0):
+            assert cache.get(["web"]) == {}
+
+    def test_invalidate(self, tmp_path):
+        """Test invalidated stacks are queried again."""
+        cache = StatusCache(tmp_path, 5)
+        cache.put({"web": RUNNING, "db": STOPPED})
+
+        cache.invalidate(["web"])
+
+        assert cache.get(["web", "db"]) == {"db": STOPPED}
+
+
+class TestCachedStatuses:
+    """Test cases for StackManager.get_statuses with a cache."""
+
+    def _manager(self, tmp_path, mock_manager):
+        manager = StackManager(root_dir=tmp_path, status_ttl=5)
+        manager.stacks = dict(mock_manager.stacks)
+        return manager
+
+    def test_only_missing_queried(self, tmp_path, mock_manager):
+        """Test cached stacks aren't asked about again."""
+        manager = self._manager(tmp_path, mock_manager)
+        stacks = list(manager.stacks.values())
+        with patch.object(
+            StackManager, '_query_statuses',
+            side_effect=lambda stacks: {s.name: STOPPED for s in stacks}
+        ) as query:
+            manager.get_statuses(stacks[:1])
+            statuses = self._manager(
+                tmp_path, mock_manager
+            ).get_statuses(stacks)
+
+        assert statuses == {s.name: STOPPED for s in stacks}
+        assert [s.name for s in query.call_args.args[0]] == [
+            s.name for s in stacks[1:]
+        ]
+
+    def test_changing_state_invalidates(self, tmp_path, mock_manager):
+        """Test stacks gam starts or stops are queried afresh."""
+        manager = self._manager(tmp_path, mock_manager)
+        stack = manager.stacks["test-stack"]
+        with patch.object(
+            StackManager, '_query_statuses',
+            return_value={"test-stack": STOPPED}
+        ):
+            manager.get_statuses([stack])
+
+        with manager.changing_state([stack]):
+            pass
+
+        assert manager.status_cache.get(["test-stack"]) == {}
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 import pytest
 
 from gam.commands.tag import cmd_tag
+from gam.transaction import TransactionError
 
 
 class TestTagCommand:
@@ -137,3 +138,20 @@ class TestTagCommand:
 
         captured = capsys.readouterr()
         assert "Tag 'nonexistent' not found on any stacks" in captured.out
+
+    def test_tag_rename_failed(self, mock_manager, mock_args, capsys):
+        """Test a rename that couldn't be saved exits with an error."""
+        mock_args.tag_action = 'rename'
+        mock_args.old_tag = 'dev'
+        mock_args.new_tag = 'development'
+        mock_manager.rename_tag = MagicMock(
+            side_effect=TransactionError("Couldn't write x: disk full")
+        )
+
+        with pytest.raises(SystemExit) as exc_info:
+            cmd_tag(mock_manager, mock_args)
+
+        assert exc_info.value.code == 1
+        captured = capsys.readouterr()
+        assert "Error: Couldn't write x: disk full" in captured.out
+        assert "No stacks were changed" in captured.out
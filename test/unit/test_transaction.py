@@ -0,0 +1,195 @@
+"""Tests for atomic metadata transactions."""
+
+import os
+from unittest.mock import patch
+
+import pytest
+
+from gam import transaction
+from gam.stack import Stack
+from gam.transaction import (
+    MetadataTransaction,
+    TransactionError,
+    write_atomic,
+)
+
+
+@pytest.fixture
+def stacks(tmp_path):
+    """Three lazy stacks with metadata files on disk."""
+    result = []
+    for name in ("a", "b", "c"):
+        path = tmp_path / name
+        path.mkdir()
+        (path / ".stack-meta.yaml").write_text(
+            f"category: old\ntags: [{name}]\n"
+        )
+        result.append(Stack.lazy(name, path))
+    return result
+
+
+def _contents(stacks):
+    return [s.meta_file.read_text() for s in stacks]
+
+
+def _leftovers(stacks):
+    return [
+        p.name for s in stacks for p in s.path.iterdir()
+        if p.name != ".stack-meta.yaml"
+    ]
+
+
+def _rename(stacks):
+    with MetadataTransaction(workers=2) as txn:
+        for stack in stacks:
+            txn.stage(stack)
+            stack.category = "new"
+
+
+class TestWriteAtomic:
+    """Test cases for write_atomic."""
+
+    def test_replaces_and_keeps_mode(self, tmp_path):
+        """Test a file is replaced with its permissions unchanged."""
+        path = tmp_path / "meta.yaml"
+        path.write_text("old\n")
+        os.chmod(path, 0o640)
+
+        write_atomic(path, b"new\n")
+
+        assert path.read_bytes() == b"new\n"
+        assert os.stat(path).st_mode & 0o777 == 0o640
+        assert os.listdir(tmp_path) == ["meta.yaml"]
+
+    def test_keeps_owner(self, tmp_path):
+        """Test the new file is given the old file's owner and group."""
+        path = tmp_path / "meta.yaml"
+        path.write_text("old\n")
+        st = os.stat(path)
+
+        with patch.object(transaction.os, "geteuid", return_value=12345), \
+                patch.object(transaction.os, "fchown") as fchown:
+            write_atomic(path, b"new\n")
+
+        assert fchown.call_args.args[1:] == (st.st_uid, st.st_gid)
+
+    def test_group_when_owner_not_allowed(self, tmp_path):
+        """Test only the group is kept when changing owner is refused."""
+        path = tmp_path / "meta.yaml"
+        path.write_text("old\n")
+        st = os.stat(path)
+        calls = []
+
+        def fchown(fd, uid, gid):
+            calls.append((uid, gid))
+            if uid != -1:
+                raise PermissionError
+
+        with patch.object(transaction.os, "geteuid", return_value=12345), \
+                patch.object(transaction.os, "fchown", fchown):
+            write_atomic(path, b"new\n")
+
+        assert calls == [(st.st_uid, st.st_gid), (-1, st.st_gid)]
+        assert path.read_bytes() == b"new\n"
+
+    def test_symlink_kept(self, tmp_path):
+        """Test a symlinked file is written through, not replaced."""
+        target = tmp_path / "shared" / "meta.yaml"
+        target.parent.mkdir()
+        target.write_text("old\n")
+        link = tmp_path / "meta.yaml"
+        link.symlink_to(target)
+
+        write_atomic(link, b"new\n")
+
+        assert link.is_symlink()
+        assert target.read_bytes() == b"new\n"
+        assert os.listdir(target.parent) == ["meta.yaml"]
+
+
+class TestMetadataTransaction:
+    """Test cases for MetadataTransaction."""
+
+    def test_commit(self, stacks):
+        """Test every staged stack is saved."""
+        _rename(stacks)
+
+        assert all("category: new" in text for text in _contents(stacks))
+        assert _leftovers(stacks) == []
+
+    def test_unchanged_skipped(self, stacks):
+        """Test files already holding the staged values aren't written."""
+        stacks[0].category = "new"
+        stacks[0].save_metadata()
+
+        with MetadataTransaction() as txn:
+            for stack in stacks:
+                txn.stage(stack)
+                stack.category = "new"
+            with patch('gam.transaction._write_temp',
+                       wraps=transaction._write_temp) as write_temp:
+                assert txn.commit() == 2
+
+        assert write_temp.call_count == 2
+
+    def test_prepare_failure_changes_nothing(self, stacks):
+        """Test a file that can't be written leaves every file alone."""
+        before = _contents(stacks)
+        write_temp = transaction._write_temp
+
+        def failing(path, data):
+            if path.parent.name == "b":
+                raise OSError("disk full")
+            return write_temp(path, data)
+
+        with patch('gam.transaction._write_temp', side_effect=failing):
+            with pytest.raises(TransactionError, match="disk full"):
+                _rename(stacks)
+
+        assert _contents(stacks) == before
+        assert _leftovers(stacks) == []
+        assert [s.category for s in stacks] == ["old"] * 3
+
+    def test_replace_failure_rolls_back(self, stacks):
+        """Test files already replaced get their old contents back."""
+        before = _contents(stacks)
+        replace = os.replace
+        calls = []
+
+        def failing(src, dst):
+            calls.append(dst)
+            if len(calls) == 2:
+                raise OSError("gone")
+            return replace(src, dst)
+
+        with patch('gam.transaction.os.replace', side_effect=failing):
+            with pytest.raises(TransactionError, match="gone"):
+                _rename(stacks)
+
+        assert _contents(stacks) == before
+        assert _leftovers(stacks) == []
+        assert [s.category for s in stacks] == ["old"] * 3
+
+    def test_symlinked_metadata(self, stacks, tmp_path):
+        """Test a symlinked metadata file stays a symlink."""
+        shared = tmp_path / "shared.yaml"
+        stacks[0].meta_file.rename(shared)
+        stacks[0].meta_file.symlink_to(shared)
+
+        _rename(stacks[:1])
+
+        assert stacks[0].meta_file.is_symlink()
+        assert "category: new" in shared.read_text()
+
+    def test_error_in_block_discards(self, stacks):
+        """Test an exception while staging writes nothing."""
+        before = _contents(stacks)
+
+        with pytest.raises(RuntimeError):
+            with MetadataTransaction() as txn:
+                txn.stage(stacks[0])
+                stacks[0].tags.append("x")
+                raise RuntimeError
+
+        assert stacks[0].tags == ["a"]
+        assert _contents(stacks) == before
@@ -22,7 +22,8 @@ class TestUpCommand:
         assert "Starting 1 stack(s)" in captured.out
         assert "test-stack" in captured.out
         assert "✓" in captured.out
-        stack.up.assert_called_once()
+        # A lone stack shows docker compose's output, e.g. pull progress.
+        stack.up.assert_called_once_with(quiet=False)
 
     def test_up_stack_not_found(self, mock_manager, mock_args):
         """Test up with non-existent stack."""
@@ -46,6 +47,8 @@ class TestUpCommand:
 
         captured = capsys.readouterr()
         assert "Starting 3 stack(s)" in captured.out
+        for stack in mock_manager.stacks.values():
+            stack.up.assert_called_once_with(quiet=True)
 
     def test_up_by_category(self, mock_manager, mock_args, capsys):
         """Test starting stacks by category."""
@@ -72,6 +75,20 @@ class TestUpCommand:
         captured = capsys.readouterr()
         assert "Starting 1 stack(s)" in captured.out
 
+    def test_up_by_selector(self, mock_manager, mock_args, capsys):
+        """Test starting the stacks a selector matches."""
+        from gam.selector import Selector
+        mock_args.select = Selector("priority<=2,!auto_start")
+        for stack in mock_manager.stacks.values():
+            stack.up = MagicMock(return_value=True)
+
+        cmd_up(mock_manager, mock_args)
+
+        captured = capsys.readouterr()
+        assert "Starting 1 stack(s)" in captured.out
+        mock_manager.stacks["dependent-stack"].up.assert_called_once()
+        mock_manager.stacks["test-stack"].up.assert_not_called()
+
     def test_up_with_priority(self, mock_manager, mock_args, capsys):
         """Test starting stacks with priority ordering."""
         mock_args.all = True